@@ -0,0 +1,145 @@
+"""
+Benchmark: bytes on the wire per client per second for identity vs gzip vs deflate
+
+Starts one server, starts a match with several players that keep moving, and
+attaches a group of long-polling observers per Accept-Encoding value. Every
+observer counts the raw bytes (headers included) it receives from GET /game_state.
+Also times compressing one snapshot at each level, the cost the server pays once
+per state version.
+
+    python -m benchmarks.bench_compression [--mode selectors] [--players 4] [--clients 10] [--duration 5]
+"""
+
+import argparse
+import gzip
+import socket
+import threading
+import time
+import zlib
+
+from benchmarks.bench_server_modes import free_port, start_server
+from benchmarks.common import ResponseCounter, build_request, http_call, report, start_match
+
+ENCODINGS = ["identity", "gzip", "deflate"]
+
+
+class Observer(threading.Thread):
+    """Long-polls /game_state with one Accept-Encoding value and counts the bytes it receives"""
+
+    def __init__(self, address, accept_encoding):
+        super().__init__(daemon=True)
+        self.address = address
+        self.accept_encoding = accept_encoding
+        self.running = True
+        self.responses = 0
+        self.bytes_received = 0
+        self.encoded = 0
+
+    def run(self):
+        sock = socket.create_connection(self.address)
+        headers = {"Accept-Encoding": self.accept_encoding}
+        version = None
+        try:
+            while self.running:
+                path = "/game_state" if version is None else f"/game_state?since={version}"
+                sock.sendall(build_request("GET", path, headers=headers))
+                counter = ResponseCounter()
+                raw = bytearray()
+                while counter.count == 0:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    raw += data
+                    counter.feed(data)
+                self.responses += 1
+                self.bytes_received += counter.bytes_received
+                head, _, body = bytes(raw).partition(b"\r\n\r\n")
+                head = head.lower()
+                if b"content-encoding: gzip" in head:
+                    body = gzip.decompress(body)
+                    self.encoded += 1
+                elif b"content-encoding: deflate" in head:
+                    body = zlib.decompress(body)
+                    self.encoded += 1
+                version = int(body[body.find(b'"version": ') + 11:].split(b",")[0].split(b"}")[0])
+        except (ConnectionError, OSError, ValueError):
+            pass  # the server is stopped at the end of the run
+        finally:
+            sock.close()
+
+
+def keep_moving(players, running):
+    """Every player sends one move per 50 ms frame as a POST /actions batch"""
+    seq = 0
+    directions = ["UP", "RIGHT", "DOWN", "LEFT"]
+    while running.is_set():
+        seq += 1
+        for sock, client_id in players:
+            http_call(sock, "POST", "/actions", {"client_id": client_id, "actions": [
+                {"seq": seq, "action": "move", "direction": directions[(seq // 10) % 4]}]})
+        time.sleep(0.05)
+
+
+def compression_cost(body, repeat=200):
+    rows = []
+    for level in (1, 6, 9):
+        for name, compress in (("gzip", lambda b: gzip.compress(b, level, mtime=0)),
+                               ("deflate", lambda b: zlib.compress(b, level))):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                out = compress(body)
+            per_call = (time.perf_counter() - start) / repeat
+            rows.append((f"{name} level {level}", f"{len(body):6d} -> {len(out):6d} bytes  "
+                                                  f"{per_call * 1e6:7.1f} us per snapshot"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="selectors", help="server front end to run")
+    parser.add_argument("--players", type=int, default=4, help="players in the match (state size grows with them)")
+    parser.add_argument("--clients", type=int, default=10, help="observers per encoding")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = start_server(args.mode, port, ["--push-port", "0"])
+    address = ("127.0.0.1", port)
+    running = threading.Event()
+    running.set()
+    try:
+        players = start_match(address, players=args.players)
+        mover = threading.Thread(target=keep_moving, args=(players, running), daemon=True)
+        mover.start()
+        observers = {encoding: [Observer(address, encoding) for _ in range(args.clients)] for encoding in ENCODINGS}
+        for group in observers.values():
+            for observer in group:
+                observer.start()
+        time.sleep(0.5)
+        start = {encoding: [(o.responses, o.bytes_received) for o in group] for encoding, group in observers.items()}
+        time.sleep(args.duration)
+        end = {encoding: [(o.responses, o.bytes_received) for o in group] for encoding, group in observers.items()}
+        _, _, body = http_call(players[0][0], "GET", "/game_state")
+    finally:
+        running.clear()
+        proc.terminate()
+        proc.wait(timeout=5)
+
+    rows = []
+    baseline = None
+    for encoding in ENCODINGS:
+        responses = sum(e[0] - s[0] for s, e in zip(start[encoding], end[encoding]))
+        received = sum(e[1] - s[1] for s, e in zip(start[encoding], end[encoding]))
+        per_client = received / args.clients / args.duration
+        baseline = baseline or per_client
+        compressed = sum(o.encoded for o in observers[encoding])
+        rows.append((encoding, f"{per_client / 1024:7.2f} KiB/s per client  "
+                               f"{responses / args.clients / args.duration:6.1f} responses/s  "
+                               f"{received / max(responses, 1):7.0f} bytes/response  "
+                               f"{per_client / baseline:5.0%} of identity  ({compressed} compressed)"))
+    report(f"{args.clients} long-polling clients per encoding, {args.players} players, {args.mode} server", rows)
+    report(f"Compressing one {len(body)}-byte snapshot", compression_cost(body))
+
+
+if __name__ == "__main__":
+    main()
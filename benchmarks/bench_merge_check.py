@@ -0,0 +1,99 @@
+"""
+Benchmark: per-tick merge and doorprize checks, full player scan vs occupancy index
+
+Builds a GameState directly with N players, stations, a few open orders and an
+active doorprize station, then times the per-tick checks while a given fraction
+of the players moves between ticks. The "full scan" rows run the checks as they
+were before the occupancy index (rebuild a tile -> players dict from every
+player each tick, test every tile against every fusion station, scan every
+player for the doorprize); the "index" rows run GameState.check_for_merge and
+check_doorprize_interaction, which only look at dirty fusion tiles and the
+doorprize station's tiles.
+
+    python -m benchmarks.bench_merge_check [--players 4 16 64 256] [--moving 0 0.1 1] [--ticks 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import report
+from src.shared import config
+from src.shared.game_state import GameState
+
+DIRECTIONS = ["UP", "RIGHT", "DOWN", "LEFT"]
+
+
+def full_scan_merge(gs):
+    """Tile grouping and fusion-tile tests the old check_for_merge ran every tick"""
+    with gs._lock:
+        positions_on_grid = {}
+        for p in gs.players.values():
+            positions_on_grid.setdefault((int(p.pos[0]), int(p.pos[1])), []).append(p)
+        candidates = 0
+        for pos_key, plist in positions_on_grid.items():
+            if len(plist) > 1 and any(gs._is_player_on_station(pos_key, s) for s in gs.fusion_stations):
+                candidates += 1
+        return candidates
+
+
+def full_scan_doorprize(gs):
+    """Player scan the old check_doorprize_interaction ran every tick"""
+    with gs._lock:
+        return [pid for pid, p in gs.players.items()
+                if pid not in gs.players_collected_doorprize and gs._is_player_on_station(p.pos, gs.doorprize_station)]
+
+
+def build_state(players):
+    gs = GameState()
+    for i in range(players):
+        gs.add_player(f"p{i}", random.choice(gs.all_possible_ingredients),
+                      (float(random.randint(0, config.GRID_WIDTH - 1)), float(random.randint(0, config.GRID_HEIGHT - 1))))
+    gs.initialize_stations()
+    for _ in range(3):
+        gs.generate_orders(players)
+    gs.spawn_doorprize_station(time.time())
+    gs.doorprize_spawn_time = time.time() + 3600  # keep it from expiring mid-run
+    gs.players_collected_doorprize.update(gs.players)  # measure the scan, not the score updates
+    return gs
+
+
+def per_tick(gs, moving, ticks, checks):
+    movers = random.sample(sorted(gs.players), int(len(gs.players) * moving))
+    total = 0.0
+    for tick in range(ticks):
+        for pid in movers:
+            gs.move_player(pid, DIRECTIONS[(tick // 20) % 4])
+        start = time.perf_counter()
+        for check in checks:
+            check()
+        total += time.perf_counter() - start
+        gs._fusion_event_queue.clear()  # a detected merge would otherwise repeat on the full scan
+    return total / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--moving", type=float, nargs="+", default=[0.0, 0.1, 1.0], help="fraction moving per tick")
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):  # GameState prints its events
+        for players in args.players:
+            for moving in args.moving:
+                gs = build_state(players)
+                old = per_tick(gs, moving, args.ticks, [lambda: full_scan_merge(gs), lambda: full_scan_doorprize(gs)])
+                gs = build_state(players)
+                new = per_tick(gs, moving, args.ticks, [gs.check_for_merge, gs.check_doorprize_interaction])
+                rows.append((f"{players:4d} players, {moving:4.0%} moving",
+                             f"full scan {old:8.2f} us/tick   index {new:8.2f} us/tick   {old / new:5.1f}x"))
+    report("Merge + doorprize checks per tick", rows)
+
+
+if __name__ == "__main__":
+    main()
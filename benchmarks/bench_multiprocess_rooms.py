@@ -0,0 +1,48 @@
+"""
+Benchmark: concurrent matches served by 1..N room worker processes
+
+Starts the server in multiprocess mode, begins a match in every room and
+drives keep-alive pollers spread across the rooms. Throughput should grow
+with the number of worker processes while rooms >= processes.
+
+    python -m benchmarks.bench_multiprocess_rooms [--rooms 8] [--pollers 32] [--processes 1 2 4]
+"""
+
+import argparse
+import os
+
+from benchmarks.bench_server_modes import free_port, start_server
+from benchmarks.common import build_request, report, start_match
+from benchmarks.load import run_load
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=8)
+    parser.add_argument("--pollers", type=int, default=32, help="keep-alive pollers per room")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--processes", type=int, nargs="+",
+                        default=sorted({1, 2, max(1, min(4, os.cpu_count() or 1))}))
+    args = parser.parse_args()
+
+    rooms = [f"room-{i}" for i in range(args.rooms)]
+    requests = [build_request("GET", "/game_state", headers={"X-Room": room}) for room in rooms]
+    rows = []
+    for processes in args.processes:
+        port = free_port()
+        proc = start_server("multiprocess", port, ["--processes", str(processes)])
+        try:
+            matches = [start_match(("127.0.0.1", port), room) for room in rooms]
+            stats = run_load(("127.0.0.1", port), requests, connections=args.rooms * args.pollers, duration=args.duration)
+            for clients in matches:
+                for sock, _ in clients:
+                    sock.close()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+        rows.append((f"{processes} process(es)", f"{stats['rps']:9.0f} req/s  p50 {stats['p50_ms']:6.2f} ms  p99 {stats['p99_ms']:7.2f} ms"))
+    report(f"{args.rooms} running matches x {args.pollers} pollers, {args.duration:.0f}s", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: matching a crowded fusion tile against open orders, per-order scan vs order index
+
+Puts --players players on one fusion tile of a GameState with --orders open
+orders and times one merge check of that tile. "per-order scan" is the loop
+check_for_merge ran before the order index (for every open order, rebuild an
+ingredient -> players map, pop players per required ingredient, re-verify via
+RecipeManager.check_merge); "index" is GameState.check_for_merge, which ORs the
+tile's ingredients into one bitmask and tests it against one mask per distinct
+recipe with open orders. Two cases: no order can be made on the tile (every
+order needs an ingredient nobody there holds), and only the newest order can.
+
+    python -m benchmarks.bench_order_matching [--players 12 24 48] [--orders 10 100 500] [--repeat 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import report
+from src.shared.game_state import GameState
+
+MISSING = "Fish Roe"  # nobody on the tile holds it
+
+
+def order_scan(gs, pos_key):
+    """The per-order matching loop of the old check_for_merge, for one tile (no side effects)"""
+    with gs._lock:
+        available = {pid: gs.players[pid] for pid in gs.occupancy.get(pos_key, ())}
+        for order in list(gs.orders):
+            if order.get('fulfilled', False):
+                continue
+            players_by_ingredient = {}
+            for p_id, p_obj in available.items():
+                players_by_ingredient.setdefault(p_obj.ingredient, []).append(p_id)
+            names = []
+            for required_ing in order['ingredients']:
+                if not players_by_ingredient.get(required_ing):
+                    break
+                players_by_ingredient[required_ing].pop(0)
+                names.append(required_ing)
+            else:
+                recipe = gs.recipe_manager.check_merge(frozenset(names))
+                if recipe and recipe['name'] == order['name']:
+                    return order
+        return None
+
+
+def build_state(players, orders, last_matches):
+    gs = GameState()
+    gs.initialize_stations()
+    pos_key = gs.fusion_stations[0]
+    recipes = gs.recipe_manager.get_all_recipes()
+    blocked = [r for r in recipes if MISSING in r['ingredients']]
+    makeable = [r for r in recipes if MISSING not in r['ingredients']]
+    for i in range(orders):
+        recipe = random.choice(makeable if last_matches and i == orders - 1 else blocked)
+        gs.orders.append({"name": recipe['name'], "price": recipe['price'],
+                          "ingredients": recipe['ingredients'], "fulfilled": False})
+        gs._index_order(gs.orders[-1])
+    held = sorted({ing for r in makeable for ing in r['ingredients']})
+    for i in range(players):
+        gs.add_player(f"p{i}", held[i % len(held)], (pos_key[0] + 0.5, pos_key[1] + 0.5))
+    return gs, pos_key
+
+
+def time_index(gs, pos_key, repeat):
+    total = 0.0
+    for _ in range(repeat):
+        gs.dirty_tiles.add(pos_key)
+        start = time.perf_counter()
+        gs.check_for_merge()
+        total += time.perf_counter() - start
+        for event in gs._fusion_event_queue:  # reopen the order so every round does the same work
+            order = gs.orders[-1]
+            order['fulfilled'] = False
+            gs._index_order(order)
+        gs._fusion_event_queue.clear()
+    return total / repeat * 1e6
+
+
+def time_scan(gs, pos_key, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        order_scan(gs, pos_key)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[12, 24, 48])
+    parser.add_argument("--orders", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    for last_matches in (False, True):
+        rows = []
+        with contextlib.redirect_stdout(io.StringIO()):  # GameState prints detected fusions
+            for players in args.players:
+                for orders in args.orders:
+                    gs, pos_key = build_state(players, orders, last_matches)
+                    scan = time_scan(gs, pos_key, args.repeat)
+                    index = time_index(gs, pos_key, args.repeat)
+                    rows.append((f"{players:3d} players, {orders:4d} orders",
+                                 f"per-order scan {scan:9.2f} us   index {index:7.2f} us   {scan / index:6.1f}x"))
+        report("Only the newest order can be made" if last_matches else "No order can be made on the tile", rows)
+
+
+if __name__ == "__main__":
+    main()
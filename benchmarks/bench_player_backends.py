@@ -0,0 +1,82 @@
+"""
+Benchmark: GameState player backends at bot scale, PlayerState objects vs NumPy arrays
+
+Builds a GameState with N bots under each PLAYER_BACKEND and runs game ticks in
+which every bot moves once (GameState.move_players), followed by the per-tick
+checks (check_for_merge, check_doorprize_interaction) and the snapshot
+(to_dict). Reports milliseconds per tick for each phase. The "arrays" rows need
+numpy and are skipped without it.
+
+    python -m benchmarks.bench_player_backends [--players 100 1000 5000] [--ticks 100]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import report
+from src.shared import config
+from src.shared.game_state import GameState
+from src.shared.player_arrays import np
+
+DIRECTIONS = ["UP", "RIGHT", "DOWN", "LEFT"]
+
+
+def build_state(backend, players):
+    gs = GameState(backend=backend)
+    for i in range(players):
+        gs.add_player(f"bot{i}", random.choice(gs.all_possible_ingredients),
+                      (random.uniform(0, config.GRID_WIDTH - 1), random.uniform(0, config.GRID_HEIGHT - 1)))
+    gs.initialize_stations()
+    for _ in range(3):
+        gs.generate_orders(4)
+    gs.spawn_doorprize_station(time.time())
+    gs.doorprize_spawn_time = time.time() + 3600  # keep it from expiring mid-run
+    return gs
+
+
+def run_ticks(gs, ticks):
+    phases = {"move": 0.0, "checks": 0.0, "to_dict": 0.0}
+    ids = list(gs.players)
+    for _ in range(ticks):
+        moves = [(pid, random.choice(DIRECTIONS)) for pid in ids]
+        start = time.perf_counter()
+        gs.move_players(moves)
+        moved = time.perf_counter()
+        gs.check_for_merge()
+        gs.process_fusion_events()
+        gs.check_doorprize_interaction()
+        checked = time.perf_counter()
+        gs.to_dict()
+        done = time.perf_counter()
+        phases["move"] += moved - start
+        phases["checks"] += checked - moved
+        phases["to_dict"] += done - checked
+    return {phase: total / ticks * 1000 for phase, total in phases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--ticks", type=int, default=100)
+    args = parser.parse_args()
+
+    backends = ["objects", "arrays"] if np is not None else ["objects"]
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):  # GameState prints its events
+        for players in args.players:
+            for backend in backends:
+                random.seed(7)
+                ms = run_ticks(build_state(backend, players), args.ticks)
+                rows.append((f"{players:5d} bots, {backend:7s}",
+                             f"move {ms['move']:7.3f} ms  checks {ms['checks']:7.3f} ms  "
+                             f"to_dict {ms['to_dict']:7.3f} ms  total {sum(ms.values()):7.3f} ms/tick"))
+    report("Every bot moves once per tick", rows)
+    if np is None:
+        print("  numpy is not installed: arrays backend skipped")
+
+
+if __name__ == "__main__":
+    main()
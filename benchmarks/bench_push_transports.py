@@ -0,0 +1,212 @@
+"""
+Benchmark: HTTP polling vs long-polling, SSE, WebSocket and the TCP push transport
+
+Starts one server (HTTP port plus TCP_PUSH_PORT-style push port), starts a match,
+and attaches one observer per transport to the same GameState. A mover player
+walks left/right through POST /action; every observer reports state updates and
+bytes received per second, and the latency from the POST that moved the player
+until the observer first saw the new position.
+
+    python -m benchmarks.bench_push_transports [--mode selectors] [--duration 5]
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import socket
+import statistics
+import struct
+import threading
+import time
+
+from benchmarks.bench_server_modes import free_port, start_server
+from benchmarks.common import build_request, http_call, report, start_match
+from src.shared import websocket
+
+TRANSPORTS = ["poll", "longpoll", "sse", "websocket", "tcp"]
+
+
+class Observer(threading.Thread):
+    """Receives snapshots over one transport and times when the mover's moves become visible"""
+
+    def __init__(self, transport, address, push_address, mover_id, moves, poll_interval):
+        super().__init__(daemon=True)
+        self.transport = transport
+        self.address = address
+        self.push_address = push_address
+        self.mover_id = mover_id
+        self.moves = moves
+        self.poll_interval = poll_interval
+        self.running = True
+        self.updates = 0
+        self.bytes_received = 0
+        self.latencies = []
+        self._last_x = None
+        self._last_counted_move = -1
+
+    def run(self):
+        try:
+            getattr(self, f"_run_{self.transport}")()
+        except (ConnectionError, OSError):
+            pass  # the server is stopped at the end of the run
+
+    def on_state(self, state):
+        now = time.perf_counter()
+        self.updates += 1
+        player = state.get("players", {}).get(self.mover_id)
+        if player is None:
+            return
+        x = player["pos"][0]
+        if self._last_x is not None and x != self._last_x and self.moves:
+            index = len(self.moves) - 1
+            if index > self._last_counted_move:
+                self.latencies.append(now - self.moves[index])
+                self._last_counted_move = index
+        self._last_x = x
+
+    def _run_poll(self, long_poll=False):
+        sock = socket.create_connection(self.address)
+        version = None
+        while self.running:
+            path = "/game_state" if version is None or not long_poll else f"/game_state?since={version}"
+            _, headers, body = http_call(sock, "GET", path)
+            # status line + "Name: value\r\n" per header + blank line
+            self.bytes_received += 17 + sum(len(k) + len(v) + 4 for k, v in headers.items()) + 2 + len(body)
+            state = json.loads(body)
+            version = state.get("version")
+            self.on_state(state)
+            if not long_poll:
+                time.sleep(self.poll_interval)
+        sock.close()
+
+    def _run_longpoll(self):
+        self._run_poll(long_poll=True)
+
+    def _run_sse(self):
+        sock = socket.create_connection(self.address)
+        sock.settimeout(1.0)
+        sock.sendall(build_request("GET", "/stream"))
+        buffer = b""
+        while self.running:
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            self.bytes_received += len(data)
+            buffer += data
+            while True:
+                start = buffer.find(b"data: ")
+                end = buffer.find(b"\n\n", start)
+                if start == -1 or end == -1:
+                    break
+                self.on_state(json.loads(buffer[start + 6:end]))
+                buffer = buffer[end + 2:]
+        sock.close()
+
+    def _run_websocket(self):
+        sock = socket.create_connection(self.address)
+        sock.settimeout(1.0)
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock.sendall(build_request("GET", "/ws", headers={
+            "Upgrade": "websocket", "Sec-WebSocket-Key": key, "Sec-WebSocket-Version": "13"}))
+        response = b""
+        while b"\r\n\r\n" not in response:
+            response += sock.recv(65536)
+        _, _, rest = response.partition(b"\r\n\r\n")
+        parser = websocket.FrameParser(max_message_size=1 << 24, require_mask=False)
+        data = rest
+        while self.running:
+            self.bytes_received += len(data)
+            for opcode, payload in parser.feed(data):
+                if opcode == websocket.OP_TEXT:
+                    self.on_state(json.loads(payload))
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                data = b""
+                continue
+            if not data:
+                break
+        sock.close()
+
+    def _run_tcp(self):
+        sock = socket.create_connection(self.push_address)
+        sock.settimeout(1.0)
+        buffer = b""
+        while self.running:
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            self.bytes_received += len(data)
+            buffer += data
+            while len(buffer) >= 4:
+                length = struct.unpack_from(">I", buffer)[0]
+                if len(buffer) < 4 + length:
+                    break
+                self.on_state(json.loads(buffer[4:4 + length]))
+                buffer = buffer[4 + length:]
+        sock.close()
+
+
+def move_player(sock, client_id, moves, duration):
+    """Walk the mover left and right with 150-250 ms between moves so at most one is in flight"""
+    direction = "RIGHT"
+    steps = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        moves.append(time.perf_counter())
+        http_call(sock, "POST", "/action", {"action": "move", "direction": direction, "client_id": client_id})
+        steps += 1
+        if steps % 20 == 0:
+            direction = "LEFT" if direction == "RIGHT" else "RIGHT"
+        time.sleep(random.uniform(0.15, 0.25))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="selectors", help="server front end to run")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="sleep between plain polls (client default)")
+    parser.add_argument("--transports", nargs="+", default=TRANSPORTS)
+    args = parser.parse_args()
+
+    port, push_port = free_port(), free_port()
+    proc = start_server(args.mode, port, ["--push-port", str(push_port)])
+    address, push_address = ("127.0.0.1", port), ("127.0.0.1", push_port)
+    try:
+        (mover_sock, mover_id), _ = start_match(address)
+        moves = []
+        observers = [Observer(t, address, push_address, mover_id, moves, args.poll_interval) for t in args.transports]
+        for observer in observers:
+            observer.start()
+        time.sleep(0.5)  # let every transport deliver its first snapshot
+        start_counts = [(o.updates, o.bytes_received) for o in observers]
+        move_player(mover_sock, mover_id, moves, args.duration)
+        elapsed = args.duration
+        for observer in observers:
+            observer.running = False
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+    rows = []
+    for observer, (updates0, bytes0) in zip(observers, start_counts):
+        lat = sorted(observer.latencies)
+        p50 = statistics.median(lat) * 1000 if lat else float('nan')
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000 if lat else float('nan')
+        rows.append((observer.transport,
+                     f"{(observer.updates - updates0) / elapsed:7.1f} updates/s  "
+                     f"{(observer.bytes_received - bytes0) / elapsed / 1024:8.1f} KiB/s  "
+                     f"move->visible p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  ({len(lat)} moves)"))
+    report(f"One observer per transport, {args.mode} server, {args.duration:.0f}s", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: recipe lookups, frozenset-keyed cache vs the ingredient-bitmask table
+
+Times RecipeManager lookups over every recipe plus some ingredient combinations
+that make no recipe: the old frozenset(names) -> recipe dict lookup,
+check_merge(names) (names folded into a mask) and check_merge_mask(mask) for a
+mask the caller already has. Also times the superset query
+get_reachable_recipes(mask) against filtering all recipes by subset test.
+
+    python -m benchmarks.bench_recipe_lookup [--repeat 20000]
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import time
+
+from benchmarks.common import report
+from src.shared.recipe_manager import RecipeManager
+
+
+def per_lookup(fn, keys, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for key in keys:
+            fn(key)
+    return (time.perf_counter() - start) / (repeat * len(keys)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rm = RecipeManager()
+    recipes = rm.get_all_recipes()
+    names = [r['ingredients'] for r in recipes]
+    names += [list(c) for c in itertools.islice(itertools.combinations(sorted({i for n in names for i in n}), 2), 20)]
+    masks = [rm.ingredient_mask(n) for n in names]
+    by_frozenset = {frozenset(r['ingredients']): r for r in recipes}
+    partial = [rm.ingredient_mask(n[:1]) for n in names]
+
+    report(f"Merge lookups ({len(names)} ingredient lists)", [
+        ("frozenset cache", f"{per_lookup(lambda n: by_frozenset.get(frozenset(n)), names, args.repeat):7.1f} ns/lookup"),
+        ("check_merge", f"{per_lookup(rm.check_merge, names, args.repeat):7.1f} ns/lookup"),
+        ("check_merge_mask", f"{per_lookup(rm.check_merge_mask, masks, args.repeat):7.1f} ns/lookup"),
+    ])
+    report("Recipes reachable from one ingredient", [
+        ("scan all recipes", f"{per_lookup(lambda m: [r for r in recipes if r['mask'] & m == m], partial, args.repeat // 10):7.1f} ns/query"),
+        ("get_reachable_recipes", f"{per_lookup(rm.get_reachable_recipes, partial, args.repeat // 10):7.1f} ns/query"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
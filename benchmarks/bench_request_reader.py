@@ -0,0 +1,103 @@
+"""
+Benchmark: byte-per-byte header reading vs the buffered RequestReader
+
+Runs the legacy ProcessTheClient read loop and the current one over a
+socketpair, with both sequential keep-alive and pipelined clients, and
+reports recv calls per request and requests/sec.
+
+    python -m benchmarks.bench_request_reader
+"""
+
+import socket
+import threading
+
+from src.shared import config
+from src.server.http import HttpServer, ProcessTheClient
+from benchmarks.common import CountingSocket, ResponseCounter, build_request, quiet_logging, report, timed
+
+REQUESTS = 5000
+PIPELINE_DEPTH = 16
+
+
+def legacy_process_client(connection, server):
+    """The original read loop: recv(1) per header byte and a single recv for the body"""
+    try:
+        while True:
+            header_data = b""
+            while True:
+                chunk = connection.recv(1)
+                if not chunk:
+                    raise ConnectionAbortedError("Client disconnected")
+                header_data += chunk
+                if b"\r\n\r\n" in header_data:
+                    break
+            headers_str = header_data.decode('utf-8', errors='ignore')
+            headers_dict = {}
+            for line in headers_str.split('\r\n')[1:]:
+                if ': ' in line:
+                    k, v = line.split(': ', 1)
+                    headers_dict[k.lower()] = v
+            content_length = int(headers_dict.get('content-length', 0))
+            body_data = b""
+            if content_length > 0:
+                body_data = connection.recv(content_length)
+            hasil = server.proses((header_data + body_data).decode('utf-8', errors='ignore'))
+            connection.sendall(b"".join(hasil))
+    except (ConnectionAbortedError, ConnectionResetError, OSError):
+        pass
+    finally:
+        connection.close()
+
+
+def run_client(sock, request, total, depth):
+    """Send `total` requests keeping up to `depth` in flight, return once all responses arrive"""
+    counter = ResponseCounter()
+    sent = 0
+    while counter.count < total:
+        batch = min(depth - (sent - counter.count), total - sent)
+        if batch > 0:
+            sock.sendall(request * batch)
+            sent += batch
+        data = sock.recv(65536)
+        if not data:
+            break
+        counter.feed(data)
+    return counter.count
+
+
+def measure(handler, request, depth):
+    server = HttpServer()
+    server_side, client_side = socket.socketpair()
+    counting = CountingSocket(server_side)
+    worker = threading.Thread(target=handler, args=(counting, server), daemon=True)
+    worker.start()
+    completed, elapsed = timed(run_client, client_side, request, REQUESTS, depth)
+    client_side.close()
+    worker.join(timeout=2.0)
+    return completed, elapsed, counting.recv_calls
+
+
+def main():
+    quiet_logging()
+    config.KEEP_ALIVE_MAX_REQUESTS = REQUESTS * 2
+
+    handlers = {
+        "legacy (recv(1))": lambda conn, srv: legacy_process_client(conn, srv),
+        "buffered reader": lambda conn, srv: ProcessTheClient(conn, ("bench", 0), srv),
+    }
+    workloads = {
+        "GET /health": build_request("GET", "/health"),
+        "POST /action": build_request("POST", "/action", {"action": "move", "client_id": "bench", "direction": "UP"}),
+    }
+
+    for workload, request in workloads.items():
+        for depth, mode in ((1, "sequential"), (PIPELINE_DEPTH, f"pipelined x{PIPELINE_DEPTH}")):
+            rows = []
+            for name, handler in handlers.items():
+                completed, elapsed, recv_calls = measure(handler, request, depth)
+                rows.append((name, f"{completed / elapsed:10.0f} req/s   {recv_calls / max(completed, 1):7.2f} recv/request"))
+            report(f"{workload} ({mode}, {REQUESTS} requests)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: per-call header formatting + concatenation vs cached header
+templates + scatter-gather sendmsg, for a typical /game_state payload
+
+    python -m benchmarks.bench_response_builder [--players 8]
+"""
+
+import argparse
+import json
+import socket
+import threading
+from datetime import datetime
+
+from src.shared import config
+from src.server.http import HttpServer, send_response
+from benchmarks.common import quiet_logging, report, timed
+
+ITERATIONS = 50000
+
+
+def legacy_response(kode=200, message='OK', messagebody=bytes(), headers={}):
+    """The original HttpServer.response: rebuilds every header line and copies the body"""
+    tanggal = datetime.now().strftime('%c')
+    resp = []
+    resp.append(f"HTTP/1.1 {kode} {message}\r\n")
+    resp.append(f"Date: {tanggal}\r\n")
+    resp.append("Server: WeAreCooked/1.0\r\n")
+    resp.append(f"Content-Length: {len(messagebody)}\r\n")
+    resp.append("Connection: keep-alive\r\n")
+    resp.append(f"Keep-Alive: timeout={config.KEEP_ALIVE_TIMEOUT}, max={config.KEEP_ALIVE_MAX_REQUESTS}\r\n")
+    resp.append("Access-Control-Allow-Origin: *\r\n")
+    resp.append("Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n")
+    resp.append("Access-Control-Allow-Headers: Content-Type\r\n")
+    for kk in headers:
+        resp.append(f"{kk}: {headers[kk]}\r\n")
+    resp.append("\r\n")
+    response_headers = ''.join(resp)
+    if not isinstance(messagebody, bytes):
+        messagebody = messagebody.encode()
+    return response_headers.encode() + messagebody
+
+
+def game_state_payload(server, players):
+    """Start a match with `players` chefs and return the encoded /game_state body"""
+    for i in range(players):
+        server.register_client(f"bench-{i:02d}-0000-0000-0000-000000000000")
+    server.restart_game()
+    server._stop_game_timer()
+    state = server.game_state.to_dict()
+    state["clients_info"] = server.clients_info
+    state["game_started"] = True
+    return json.dumps(state).encode()
+
+
+def drain(sock):
+    while sock.recv(1 << 20):
+        pass
+
+
+def send_loop(build, send, payload):
+    server_side, client_side = socket.socketpair()
+    reader = threading.Thread(target=drain, args=(client_side,), daemon=True)
+    reader.start()
+    _, elapsed = timed(lambda: [send(server_side, build(payload)) for _ in range(ITERATIONS)])
+    server_side.close()
+    reader.join()
+    client_side.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=8)
+    args = parser.parse_args()
+    quiet_logging()
+
+    server = HttpServer()
+    payload = game_state_payload(server, args.players)
+    headers = {'Content-Type': 'application/json'}
+
+    build_legacy = lambda body: legacy_response(200, 'OK', body, headers)
+    build_cached = lambda body: server.response(200, 'OK', body, headers)
+
+    _, legacy_build = timed(lambda: [build_legacy(payload) for _ in range(ITERATIONS)])
+    _, cached_build = timed(lambda: [build_cached(payload) for _ in range(ITERATIONS)])
+    report(f"build only ({len(payload)} byte body, {ITERATIONS} responses)", [
+        ("legacy format + concat", f"{ITERATIONS / legacy_build:10.0f} responses/s"),
+        ("cached header template", f"{ITERATIONS / cached_build:10.0f} responses/s"),
+    ])
+
+    legacy_send = send_loop(build_legacy, lambda sock, data: sock.sendall(data), payload)
+    cached_send = send_loop(build_cached, send_response, payload)
+    report("build + send over a socketpair", [
+        ("legacy + sendall(concat)", f"{ITERATIONS / legacy_send:10.0f} responses/s"),
+        ("cached + sendmsg(header, body)", f"{ITERATIONS / cached_send:10.0f} responses/s"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
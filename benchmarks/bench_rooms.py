@@ -0,0 +1,88 @@
+"""
+Benchmark: concurrent rooms one process sustains at the target tick rate
+
+For each room count, builds an in-process HttpServer (no sockets) hosting that
+many rooms through its RoomManager, starts a match with --players players in
+every room and lets the shared TickScheduler drive them all for --duration
+seconds while a mover thread applies one move per player per 50 ms frame.
+Reports the achieved tick rate, time spent per tick slot (all rooms), overruns,
+skipped ticks and process CPU. A room count is sustained when the achieved rate
+stays at TICK_RATE without skipped ticks.
+
+    python -m benchmarks.bench_rooms [--rooms 1 10 50 100 200] [--players 4] [--duration 3]
+"""
+
+import argparse
+import threading
+import time
+import uuid
+
+from benchmarks.common import quiet_logging, report
+from src.server.http import HttpServer
+from src.shared import config
+
+
+def host_rooms(rooms, players):
+    """HttpServer hosting `rooms` rooms (the default one included) with a running match each"""
+    server = HttpServer()
+    server.rooms.max_rooms = max(server.rooms.max_rooms, rooms)
+    matches = [server] + [server.rooms.create() for _ in range(rooms - 1)]
+    for room in matches:
+        for _ in range(players):
+            room.register_client(str(uuid.uuid4()))
+        room.restart_game()  # adds the room's tick to the shared scheduler
+    return server, matches
+
+
+def keep_moving(matches, running):
+    """One move per player per 50 ms frame, in every room"""
+    directions = ["UP", "RIGHT", "DOWN", "LEFT"]
+    frame = 0
+    while running.is_set():
+        frame += 1
+        for room in matches:
+            for client_id in list(room.clients_info):
+                room.apply_action({"action": "move", "client_id": client_id, "direction": directions[(frame // 10) % 4]})
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--players", type=int, default=4, help="players per room")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    quiet_logging()
+
+    rows = []
+    sustained = 0
+    for count in args.rooms:
+        server, matches = host_rooms(count, args.players)
+        running = threading.Event()
+        running.set()
+        threading.Thread(target=keep_moving, args=(matches, running), daemon=True).start()
+        time.sleep(0.5)  # let the first ticks publish the initial snapshots
+        before = server.tick_scheduler.stats.stats()
+        wall, cpu = time.perf_counter(), time.process_time()
+        time.sleep(args.duration)
+        stats = server.tick_scheduler.stats.stats()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        running.clear()
+        server.rooms.close()
+
+        rate = (stats["ticks"] - before["ticks"]) / wall
+        skipped = stats["skipped"] - before["skipped"]
+        if rate >= config.TICK_RATE * 0.98 and not skipped:
+            sustained = max(sustained, count)
+        rows.append((f"{count} rooms", f"{rate:5.1f} ticks/s  slot avg {stats['avg_duration_ms']:7.3f} ms  "
+                                       f"max {stats['max_duration_ms']:7.3f} ms  "
+                                       f"{stats['overruns'] - before['overruns']:4d} overruns  {skipped:4d} skipped  "
+                                       f"{cpu / wall:6.1%} CPU"))
+        time.sleep(0.2)
+
+    report(f"{args.players} moving players per room, one shared scheduler at {config.TICK_RATE} ticks/s", rows)
+    print(f"  sustained at the target rate: {sustained} rooms")
+
+
+if __name__ == "__main__":
+    main()
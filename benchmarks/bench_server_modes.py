@@ -0,0 +1,102 @@
+"""
+Benchmark: thread-per-connection vs the selectors and asyncio front ends
+
+Starts the server in a subprocess for every mode and drives it with many
+keep-alive pollers hitting GET /game_state.
+
+    python -m benchmarks.bench_server_modes [--connections 200] [--duration 5]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import build_request, report
+from benchmarks.load import run_load
+
+MODES = ["threaded", "selectors", "asyncio", "pool"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, extra_args=()):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.server.server", "--mode", mode, "--host", "127.0.0.1", "--port", str(port), *extra_args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f"server in {mode} mode did not start")
+
+
+def thread_count(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class ThreadSampler(threading.Thread):
+    """Records the peak thread count of a process while the load runs"""
+
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak = None
+        self.running = True
+
+    def run(self):
+        while self.running:
+            count = thread_count(self.pid)
+            if count is not None:
+                self.peak = max(self.peak or 0, count)
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--modes", nargs="+", default=MODES)
+    args = parser.parse_args()
+
+    request = build_request("GET", "/game_state")
+    rows = []
+    for mode in args.modes:
+        port = free_port()
+        proc = start_server(mode, port)
+        try:
+            sampler = ThreadSampler(proc.pid)
+            sampler.start()
+            stats = run_load(("127.0.0.1", port), request, connections=args.connections, duration=args.duration)
+            sampler.running = False
+            threads = sampler.peak
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+        rows.append((mode, f"{stats['rps']:9.0f} req/s  p50 {stats['p50_ms']:6.2f} ms  p99 {stats['p99_ms']:7.2f} ms  "
+                           f"peak server threads {threads if threads is not None else '?'}  "
+                           f"503s {stats['statuses'].get(503, 0)}"))
+    report(f"GET /game_state, {args.connections} keep-alive pollers, {args.duration:.0f}s", rows)
+
+
+if __name__ == "__main__":
+    main()
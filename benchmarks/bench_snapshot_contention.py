@@ -0,0 +1,117 @@
+"""
+Benchmark: reader/writer contention, locked to_dict reads vs published snapshot reads
+
+Runs a started --players match in-process (HttpServer, no sockets) with its tick
+scheduler, --movers threads sending moves (apply_action, one every 5 ms each) and
+--pollers threads reading the state once every --poll-interval seconds each.
+"locked to_dict" readers copy the state under GameState._lock and serialize it
+on every poll, as /game_state did
+before snapshots; "snapshot" readers go through the real GET /game_state route
+(gzip accepted), which serves the snapshot the tick published and never takes
+GameState._lock or the publisher's lock. Reports polls/s, move latency and tick
+duration/overruns. Pollers are paced like clients: flat-out reader threads would
+only measure the GIL.
+
+    python -m benchmarks.bench_snapshot_contention [--players 200] [--pollers 4 16 64] [--movers 8]
+                                                   [--poll-interval 0.005] [--duration 3]
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+
+from benchmarks.common import build_request, quiet_logging, report
+from src.server.http import HttpServer
+
+DIRECTIONS = ["UP", "RIGHT", "DOWN", "LEFT"]
+
+
+def start_server(players):
+    server = HttpServer()
+    for _ in range(players):
+        server.register_client(str(uuid.uuid4()))
+    server.restart_game()  # the tick scheduler starts driving the match
+    return server
+
+
+def locked_reader(server):
+    return lambda: json.dumps(server.game_state.to_dict()).encode()
+
+
+def snapshot_reader(server):
+    request = build_request("GET", "/game_state", headers={"Accept-Encoding": "gzip"}).decode()
+    return lambda: server.proses(request)
+
+
+def poller(read, interval, running, counts, index):
+    while running.is_set():
+        read()
+        counts[index] += 1
+        time.sleep(interval)
+
+
+def mover(server, client_id, running, latencies):
+    frame = 0
+    while running.is_set():
+        frame += 1
+        start = time.perf_counter()
+        server.apply_action({"action": "move", "client_id": client_id, "direction": DIRECTIONS[(frame // 10) % 4]})
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.005)
+
+
+def run(make_reader, players, pollers, movers, interval, duration):
+    server = start_server(players)
+    running = threading.Event()
+    running.set()
+    counts = [0] * pollers
+    latencies = []
+    read = make_reader(server)
+    threads = [threading.Thread(target=poller, args=(read, interval, running, counts, i), daemon=True)
+               for i in range(pollers)]
+    threads += [threading.Thread(target=mover, args=(server, client_id, running, latencies), daemon=True)
+                for client_id in list(server.clients_info)[:movers]]
+    time.sleep(0.2)
+    before = server.tick_scheduler.stats.stats()
+    wall = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    running.clear()
+    for thread in threads:
+        thread.join()
+    stats = server.tick_scheduler.stats.stats()
+    wall = time.perf_counter() - wall
+    server.close()
+
+    latencies.sort()
+    ticks = stats["ticks"] - before["ticks"]
+    return (f"{sum(counts) / wall:8.0f} polls/s  move avg {sum(latencies) / len(latencies) * 1000:6.3f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.3f} ms  "
+            f"{ticks / wall:5.1f} ticks/s  tick max {stats['max_duration_ms']:6.2f} ms  "
+            f"{stats['overruns'] - before['overruns']:3d} overruns")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=200, help="players in the match (sets the state size)")
+    parser.add_argument("--pollers", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--movers", type=int, default=8, help="players moving (one thread each)")
+    parser.add_argument("--poll-interval", type=float, default=0.005, help="seconds between one poller's reads")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    quiet_logging()
+
+    rows = []
+    for pollers in args.pollers:
+        for name, make_reader in (("locked to_dict", locked_reader), ("snapshot", snapshot_reader)):
+            rows.append((f"{pollers:3d} pollers, {name}",
+                         run(make_reader, args.players, pollers, args.movers, args.poll_interval, args.duration)))
+    report(f"{args.players} players, {args.movers} moving, each poller reading every "
+           f"{args.poll_interval * 1000:.0f} ms", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: full /game_state snapshots vs ?base=<version> deltas in steady play
+
+Starts one server and a match whose players keep moving, then attaches long-polling
+observers that either fetch the full state every time or send the version they hold
+as ?base=. Reports bytes per response and the client-side cost of json.loads plus
+GameManager.update_state (which applies the delta).
+
+    python -m benchmarks.bench_state_deltas [--mode selectors] [--players 4] [--movers 1] [--clients 5] [--duration 5]
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+
+from benchmarks.bench_compression import keep_moving
+from benchmarks.bench_server_modes import free_port, start_server
+from benchmarks.common import http_call, report, start_match
+from src.client.game_manager import GameManager
+
+
+class Observer(threading.Thread):
+    """Long-polls /game_state, with or without ?base=, and times parsing + applying each response"""
+
+    def __init__(self, address, deltas, client_id):
+        super().__init__(daemon=True)
+        self.address = address
+        self.deltas = deltas
+        self.running = True
+        self.game_manager = GameManager()
+        self.game_manager.client_id = client_id  # a player id, so update_state has nothing to warn about
+        self.responses = 0
+        self.bytes_received = 0
+        self.apply_time = 0.0
+
+    def run(self):
+        sock = socket.create_connection(self.address)
+        version = None
+        try:
+            while self.running:
+                path = "/game_state"
+                if version is not None:
+                    path += f"?since={version}" + (f"&base={version}" if self.deltas else "")
+                status, _, body = http_call(sock, "GET", path)
+                if status != 200:
+                    continue
+                start = time.perf_counter()
+                state = json.loads(body)
+                self.game_manager.update_state(state)
+                self.apply_time += time.perf_counter() - start
+                self.responses += 1
+                self.bytes_received += len(body)
+                version = self.game_manager.current_state["version"]
+        except (ConnectionError, OSError):
+            pass  # the server is stopped at the end of the run
+        finally:
+            sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="selectors", help="server front end to run")
+    parser.add_argument("--players", type=int, default=4, help="players in the match (state size grows with them)")
+    parser.add_argument("--movers", type=int, default=1, help="players that keep moving")
+    parser.add_argument("--clients", type=int, default=5, help="observers per variant")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = start_server(args.mode, port, ["--push-port", "0"])
+    address = ("127.0.0.1", port)
+    running = threading.Event()
+    running.set()
+    try:
+        players = start_match(address, players=args.players)
+        threading.Thread(target=keep_moving, args=(players[:args.movers], running), daemon=True).start()
+        observers = {variant: [Observer(address, variant == "delta", players[0][1]) for _ in range(args.clients)]
+                     for variant in ("full", "delta")}
+        for group in observers.values():
+            for observer in group:
+                observer.start()
+        time.sleep(args.duration)
+        for group in observers.values():
+            for observer in group:
+                observer.running = False
+    finally:
+        running.clear()
+        proc.terminate()
+        proc.wait(timeout=5)
+
+    rows = []
+    for variant, group in observers.items():
+        responses = sum(o.responses for o in group) or 1
+        rows.append((variant, f"{sum(o.bytes_received for o in group) / responses:7.0f} bytes/response  "
+                              f"{sum(o.apply_time for o in group) / responses * 1e6:6.1f} us parse+apply  "
+                              f"{responses / args.clients / args.duration:6.1f} responses/s per client"))
+    report(f"{args.clients} long-polling clients per variant, {args.players} players "
+           f"({args.movers} moving), {args.mode} server", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: JSON vs the binary application/x-cooked-state snapshot encoding
+
+Builds a running match in-process (HttpServer, no sockets) with N players, takes
+its snapshot dict and compares body size and encode/decode time of json.dumps /
+json.loads against state_codec.encode_state / decode_state, plus gzipped sizes.
+
+    python -m benchmarks.bench_state_encoding [--players 4 8 16 32] [--repeat 2000]
+"""
+
+import argparse
+import gzip
+import json
+import time
+import uuid
+
+from benchmarks.common import quiet_logging, report
+from src.server.http import HttpServer
+from src.shared import state_codec
+
+
+def match_state_server(players):
+    """HttpServer with a started match of `players` players and no tick running"""
+    server = HttpServer()
+    server._start_game_timer = lambda: None  # callers drive ticks themselves, if at all
+    for _ in range(players):
+        server.register_client(str(uuid.uuid4()))
+    server.restart_game()
+    server.publish_state()
+    return server
+
+
+def match_state(players):
+    """Snapshot dict of a started match with `players` players"""
+    return match_state_server(players).current_snapshot.state
+
+
+def per_call(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    quiet_logging()
+
+    for players in args.players:
+        state = match_state(players)
+        as_json = json.dumps(state).encode()
+        as_binary = state_codec.encode_state(state)
+        assert state_codec.decode_state(as_binary)["players"].keys() == state["players"].keys()
+        rows = [
+            ("json", f"{len(as_json):6d} bytes ({len(gzip.compress(as_json)):5d} gzipped)  "
+                     f"encode {per_call(json.dumps, state, args.repeat):7.1f} us  "
+                     f"decode {per_call(json.loads, as_json, args.repeat):7.1f} us"),
+            ("x-cooked-state", f"{len(as_binary):6d} bytes ({len(gzip.compress(as_binary)):5d} gzipped)  "
+                               f"encode {per_call(state_codec.encode_state, state, args.repeat):7.1f} us  "
+                               f"decode {per_call(state_codec.decode_state, as_binary, args.repeat):7.1f} us"),
+        ]
+        report(f"Snapshot of a {players}-player match", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: the old 10 ms sleep loop vs the fixed-timestep TickScheduler
+
+Runs a started match in-process (HttpServer, no sockets) for a few seconds under
+each driver and reports ticks per second, CPU time spent by the process, drift
+from the intended rate and the scheduler's duration/jitter statistics. A second
+run adds an artificial slow tick to show catch-up and skipping.
+
+    python -m benchmarks.bench_tick_scheduler [--players 4] [--rate 30] [--duration 3]
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_state_encoding import match_state_server
+from benchmarks.common import quiet_logging, report
+from src.server.tick_scheduler import TickScheduler
+
+
+def sleep_loop(server, duration):
+    """The loop _game_timer_thread used to run: tick, then sleep 10 ms"""
+    end_time = time.time() + 180
+    ticks = 0
+    stop_at = time.monotonic() + duration
+    while time.monotonic() < stop_at:
+        server._game_tick(time.time(), end_time - time.time())
+        ticks += 1
+        time.sleep(0.01)
+    return ticks
+
+
+def measure(run):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = run()
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def run_scheduler(server, rate, duration, slow_every=0):
+    count = [0]
+
+    def tick(deadline):
+        count[0] += 1
+        if slow_every and count[0] % slow_every == 0:
+            time.sleep(3.5 / rate)  # one tick takes three and a half slots
+        return server._scheduled_tick(deadline)
+
+    scheduler = TickScheduler(rate=rate)
+    server.game_end = time.monotonic() + 180
+    scheduler.add(tick)
+    time.sleep(duration)
+    scheduler.discard(tick)
+    return scheduler.stats.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--rate", type=int, default=30, help="scheduler ticks per second")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    quiet_logging()
+
+    server = match_state_server(args.players)
+    ticks, wall, cpu = measure(lambda: sleep_loop(server, args.duration))
+    rows = [("sleep(0.01) loop", f"{ticks / wall:6.1f} ticks/s  {cpu / wall:6.1%} CPU")]
+
+    stats, wall, cpu = measure(lambda: run_scheduler(server, args.rate, args.duration))
+    drift = stats["ticks"] - args.rate * wall
+    rows.append((f"TickScheduler {args.rate}/s", f"{stats['ticks'] / wall:6.1f} ticks/s  {cpu / wall:6.1%} CPU  "
+                                                 f"drift {drift:+5.1f} ticks  "
+                                                 f"duration avg {stats['avg_duration_ms']:.3f} ms  "
+                                                 f"jitter avg {stats['avg_jitter_ms']:.3f} / max {stats['max_jitter_ms']:.3f} ms"))
+    report(f"Driving a {args.players}-player match for {args.duration:.0f}s", rows)
+
+    stats = run_scheduler(server, args.rate, args.duration, slow_every=args.rate)
+    report("One tick per second takes 3.5 slots", [
+        ("TickScheduler", f"{stats['ticks']} ticks  {stats['overruns']} overruns  {stats['skipped']} skipped  "
+                          f"max duration {stats['max_duration_ms']:.1f} ms  max jitter {stats['max_jitter_ms']:.1f} ms"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Shared helpers for the We are Cooked benchmarks
+"""
+
+import json
+import logging
+import socket
+import time
+
+
+def quiet_logging():
+    """Silence per-connection INFO logging so it does not dominate the measurements"""
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('GameServer').setLevel(logging.WARNING)
+
+
+def build_request(method, path, body=None, headers=None):
+    """Encode a minimal HTTP/1.1 request"""
+    lines = [f"{method} {path} HTTP/1.1", "Host: bench", "Connection: keep-alive"]
+    payload = b""
+    if body is not None:
+        payload = json.dumps(body).encode() if not isinstance(body, bytes) else body
+        lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(payload)}")
+    for k, v in (headers or {}).items():
+        lines.append(f"{k}: {v}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+
+class ResponseCounter:
+    """Incrementally splits a byte stream of HTTP responses and counts complete ones"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.count = 0
+        self.bytes_received = 0
+        self.last_status = None
+
+    def feed(self, data):
+        self.bytes_received += len(data)
+        self.buffer += data
+        while True:
+            end = self.buffer.find(b"\r\n\r\n")
+            if end == -1:
+                return
+            head = bytes(self.buffer[:end]).lower()
+            length = 0
+            idx = head.find(b"content-length:")
+            if idx != -1:
+                stop = head.find(b"\r\n", idx)
+                length = int(head[idx + len(b"content-length:"):stop if stop != -1 else None])
+            total = end + 4 + length
+            if len(self.buffer) < total:
+                return
+            self.last_status = int(head[9:12])
+            del self.buffer[:total]
+            self.count += 1
+
+
+def http_call(sock, method, path, body=None, headers=None):
+    """Send one request on a blocking socket and return (status, response headers, body bytes)"""
+    sock.sendall(build_request(method, path, body, headers))
+    counter = ResponseCounter()
+    raw = bytearray()
+    while counter.count == 0:
+        data = sock.recv(65536)
+        if not data:
+            raise ConnectionError("server closed the connection")
+        raw += data
+        counter.feed(data)
+    head, _, payload = bytes(raw).partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    response_headers = {}
+    for line in lines[1:]:
+        k, _, v = line.partition(": ")
+        response_headers[k.lower()] = v
+    return int(lines[0].split(" ")[1]), response_headers, payload[:len(payload) - len(counter.buffer)]
+
+
+def start_match(address, room=None, players=2):
+    """Connect `players` clients, ready them up and start the game; returns [(socket, client_id)]"""
+    headers = {"X-Room": room} if room else {}
+    clients = []
+    for _ in range(players):
+        sock = socket.create_connection(address)
+        _, _, body = http_call(sock, "POST", "/connect", {"action": "connect"}, headers)
+        clients.append((sock, json.loads(body)["client_id"]))
+    for sock, client_id in clients:
+        http_call(sock, "POST", "/action", {"action": "toggle_ready", "client_id": client_id}, headers)
+    sock, client_id = clients[0]
+    http_call(sock, "POST", "/action", {"action": "start_game", "client_id": client_id}, headers)
+    return clients
+
+
+class CountingSocket:
+    """Socket proxy that counts recv/send calls as a stand-in for syscalls"""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.recv_calls = 0
+        self.send_calls = 0
+
+    def recv(self, n):
+        self.recv_calls += 1
+        return self._sock.recv(n)
+
+    def sendall(self, data):
+        self.send_calls += 1
+        return self._sock.sendall(data)
+
+    def sendmsg(self, buffers):
+        self.send_calls += 1
+        return self._sock.sendmsg(buffers)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+def report(title, rows):
+    """Print a simple aligned table of (label, value) rows"""
+    print(f"\n== {title} ==")
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
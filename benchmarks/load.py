@@ -0,0 +1,129 @@
+"""
+Keep-alive HTTP load generator used by the server benchmarks
+
+Opens many connections from a single selectors loop; each connection keeps
+`depth` requests in flight and reconnects when the server closes it.
+"""
+
+import socket
+import selectors
+import time
+
+from benchmarks.common import ResponseCounter
+
+
+class _ClientConnection:
+    def __init__(self, address, request, depth):
+        self.sock = socket.create_connection(address)
+        self.sock.setblocking(False)
+        self.request = request
+        self.depth = depth
+        self.counter = ResponseCounter()
+        self.sent = 0
+        self.send_times = []
+
+    def in_flight(self):
+        return self.sent - self.counter.count
+
+
+def run_load(address, request, connections=50, duration=5.0, depth=1, request_factory=None):
+    """Drive `connections` keep-alive clients for `duration` seconds and return summary stats
+
+    `request` may be a list, in which case connection i always sends request[i % len(request)].
+    """
+    selector = selectors.DefaultSelector()
+    clients = []
+    latencies = []
+    statuses = {}
+    reconnects = 0
+    bytes_received = 0
+
+    requests = request if isinstance(request, list) else [request]
+    opened = [0]
+
+    def open_client(client_request=None):
+        if client_request is None:
+            client_request = requests[opened[0] % len(requests)]
+            opened[0] += 1
+        client = _ClientConnection(address, client_request, depth)
+        selector.register(client.sock, selectors.EVENT_READ, client)
+        clients.append(client)
+        top_up(client)
+        return client
+
+    def top_up(client):
+        missing = client.depth - client.in_flight()
+        if missing <= 0:
+            return
+        payload = b"".join(
+            (request_factory() if request_factory else client.request) for _ in range(missing)
+        )
+        try:
+            client.sock.sendall(payload)
+        except (BlockingIOError, OSError):
+            return
+        now = time.perf_counter()
+        client.send_times.extend([now] * missing)
+        client.sent += missing
+
+    for _ in range(connections):
+        open_client()
+
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        for key, _ in selector.select(timeout=0.1):
+            client = key.data
+            try:
+                data = client.sock.recv(262144)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                data = b""
+            if data:
+                before = client.counter.count
+                client.counter.feed(data)
+                done = client.counter.count - before
+                now = time.perf_counter()
+                for sent_at in client.send_times[:done]:
+                    latencies.append(now - sent_at)
+                del client.send_times[:done]
+                if done:
+                    statuses[client.counter.last_status] = statuses.get(client.counter.last_status, 0) + done
+                top_up(client)
+            else:
+                bytes_received += client.counter.bytes_received
+                selector.unregister(client.sock)
+                client.sock.close()
+                clients.remove(client)
+                reconnects += 1
+                try:
+                    open_client(client.request)
+                except OSError:
+                    pass
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        bytes_received += client.counter.bytes_received
+        selector.unregister(client.sock)
+        client.sock.close()
+    selector.close()
+
+    latencies.sort()
+    completed = len(latencies)
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(completed - 1, int(completed * p))] * 1000
+
+    return {
+        "requests": completed,
+        "rps": completed / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "reconnects": reconnects,
+        "statuses": statuses,
+        "bytes_received": bytes_received,
+        "elapsed": elapsed,
+    }
@@ -14,6 +14,7 @@ from src.client.game_manager import GameManager
 from src.client.renderer import Renderer
 from src.client.input_handler import InputHandler
 from src.client.http import HttpNetworkHandler
+from src.client.network_handler import NetworkHandler
 
 # Configure logging
 logging.basicConfig(
@@ -46,7 +47,10 @@ def main():
     
     # Connect to server
     try:
-        network_handler = HttpNetworkHandler(game_manager)
+        if config.CLIENT_TRANSPORT == "tcp":
+            network_handler = NetworkHandler(game_manager)
+        else:
+            network_handler = HttpNetworkHandler(game_manager)
         if not network_handler.start():
             logger.error("Failed to connect to server")
             pygame.quit()
@@ -65,17 +69,20 @@ def main():
     while running:
         # Handle user input
         actions = input_handler.handle_events(game_manager, renderer.ui_rects)
+        network_actions = []
         for action in actions:
             if action['type'] == 'quit':
                 running = False
             elif action['type'] == 'network':
-                network_handler.send_action(action['data'])
+                network_actions.append(action['data'])
             elif action['type'] == 'sfx':
                 asset_manager.sound_manager.play_sfx(action['name'])
             elif action['type'] == 'toggle_almanac':
                 renderer.show_almanac = not renderer.show_almanac
             elif action['type'] == 'close_almanac':
                 renderer.show_almanac = False
+        # Everything this frame produced goes to the server as one sequenced batch
+        network_handler.send_actions(network_actions)
         
         # Update game state
         game_manager.check_state_transitions(asset_manager)
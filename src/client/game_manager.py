@@ -7,19 +7,66 @@ class GameManager:
         self.current_state = None
         self.client_id = None
         self.final_score = 0
-        self._processed_event_ids = set()
+        self.event_cursor = None  # id of the last game event handed to pending_events
+        self.latest_event_id = 0  # newest event id the server has announced
+        self.pending_events = []
         self._timer_warning_played = False
         self.is_disconnected = False
 
     def update_state(self, new_state):
+        if "base" in new_state:
+            new_state = self._apply_delta(new_state)
+            if new_state is None:
+                return
         if "client_id" in new_state:
             if self.client_id != new_state["client_id"]:
                 print(f"[DEBUG] client_id berubah: {self.client_id} -> {new_state['client_id']}")
             self.client_id = new_state["client_id"]
         self.current_state = new_state
+        self._collect_events(new_state)
         if self.current_state and self.client_id not in self.current_state.get("players", {}):
             print(f"[WARNING] client_id {self.client_id} tidak ditemukan di state['players']! Mungkin sedang merge atau ada bug.")
 
+    def _apply_delta(self, delta):
+        """Patch current_state with a GET /game_state?base= delta; None if it is based on another version"""
+        if not self.current_state or self.current_state.get("version") != delta["base"]:
+            return None
+        state = dict(self.current_state)
+        state.update(delta.get("changed", {}))
+        for key, patch in delta.get("entities", {}).items():
+            entities = dict(state.get(key) or {})
+            for entity_id in patch.get("remove", []):
+                entities.pop(entity_id, None)
+            entities.update(patch.get("upsert", {}))
+            state[key] = entities
+        state["version"] = delta["version"]
+        if "client_id" in delta:
+            state["client_id"] = delta["client_id"]
+        return state
+
+    def _collect_events(self, state):
+        events = state.get("events") or []
+        self.latest_event_id = max(self.latest_event_id, state.get("last_event_id", 0))
+        if self.event_cursor is None:
+            # First state seen: start from the events it carries, earlier ones are history
+            self.event_cursor = events[0]["id"] - 1 if events else self.latest_event_id
+        if events and events[0]["id"] > self.event_cursor + 1:
+            return  # versions were skipped; missing_events() is now true and GET /events fills the gap in order
+        self.add_events(events)
+
+    def add_events(self, events):
+        """Queue events newer than the cursor (from a state or GET /events) and advance it"""
+        for event in events:
+            if event["id"] > self.event_cursor:
+                self.pending_events.append(event)
+                self.event_cursor = event["id"]
+        if self.event_cursor > self.latest_event_id:
+            self.latest_event_id = self.event_cursor
+
+    def missing_events(self):
+        """True when the server has logged events this client skipped (it missed state versions)"""
+        return self.event_cursor is not None and self.latest_event_id > self.event_cursor
+
     def check_state_transitions(self, asset_manager):
         if not self.current_state:
             return
@@ -28,7 +75,6 @@ class GameManager:
             self.game_screen_state = config.GAME_STATE_PLAYING
             asset_manager.sound_manager.play_music('KitchenBGM.mp3')
             self._timer_warning_played = False
-            self._processed_event_ids.clear()
         elif self.game_screen_state == config.GAME_STATE_PLAYING:
             if self.current_state.get('timer', 1) <= 0:
                 self.game_screen_state = config.GAME_STATE_END_SCREEN
@@ -52,24 +98,15 @@ class GameManager:
         if self.current_state.get('timer', 999) <= 10 and not self._timer_warning_played:
             asset_manager.sound_manager.play_sfx('Running out of Time', volume=0.7)
             self._timer_warning_played = True
-        if "visual_effects" in self.current_state:
-            for event in self.current_state["visual_effects"].get("game_events", []):
-                # Memastikan event hanya diproses sekali per ID
-                if event["id"] not in self._processed_event_ids:
-                    if event["type"] == "recipe_fusion":
-                        asset_manager.sound_manager.play_sfx("Success Order", volume=0.6)
-                        self._processed_event_ids.add(event["id"])
-                    elif event["type"] == "doorprize_spawn":
-                        asset_manager.sound_manager.play_sfx("Doorprize Spawn", volume=0.8) # Contoh SFX baru
-                        self._processed_event_ids.add(event["id"])
-                    elif event["type"] == "doorprize_collect":
-                        asset_manager.sound_manager.play_sfx("Doorprize Collect", volume=0.8) # Contoh SFX baru
-                        self._processed_event_ids.add(event["id"])
-                    elif event["type"] == "doorprize_expire":
-                        # Mungkin tidak perlu SFX khusus untuk expire, atau SFX yang lebih lembut
-                        self._processed_event_ids.add(event["id"])
-                    elif event["type"] == "player_relocate":
-                        self._processed_event_ids.add(event["id"])
+        events, self.pending_events = self.pending_events, []
+        for event in events:
+            if event["type"] == "recipe_fusion":
+                asset_manager.sound_manager.play_sfx("Success Order", volume=0.6)
+            elif event["type"] == "doorprize_spawn":
+                asset_manager.sound_manager.play_sfx("Doorprize Spawn", volume=0.8) # Contoh SFX baru
+            elif event["type"] == "doorprize_collect":
+                asset_manager.sound_manager.play_sfx("Doorprize Collect", volume=0.8) # Contoh SFX baru
+            # doorprize_expire, player_relocate, ingredient_change: belum ada SFX
 
     def handle_disconnect(self):
         print("Disconnected from server.")
@@ -1,9 +1,14 @@
 import threading
 import json
 import time
+import base64
+import os
+import socket
 import requests
 import logging
 from src.shared import config
+from src.shared import websocket
+from src.shared import state_codec
 
 # Configure logging
 logging.basicConfig(
@@ -16,16 +21,29 @@ logger = logging.getLogger('GameClient')
 class HttpNetworkHandler:
     """HTTP-based network handler for the game client"""
     
-    def __init__(self, game_manager, port=None):
+    def __init__(self, game_manager, port=None, room=None):
         self.game_manager = game_manager
-        server_port = port if port is not None else config.SERVER_PORT
-        self.server_url = f"http://{config.SERVER_IP}:{server_port}"
+        self.server_port = port if port is not None else config.SERVER_PORT
+        self.server_url = f"http://{config.SERVER_IP}:{self.server_port}"
         self.client_id = None
         self.thread = None
         self.running = False
         self.poll_interval = 0.1  # How often to poll for updates (seconds)
+        self.transport = config.CLIENT_TRANSPORT
+        self.long_poll = self.transport == "longpoll"  # Let the server hold /game_state until the state changes
+        self.state_version = None  # Last state version received, sent back as ?since= or Last-Event-ID
+        self.etag = None  # ETag of the last /game_state body, sent back as If-None-Match
+        self.delta_base = None  # Version of the last full /game_state applied, sent back as ?base=
+        self.ws_sock = None  # Open WebSocket when transport is "websocket"; actions go through it too
+        self._ws_lock = threading.Lock()
+        self._ws_buffered = b""
+        self.next_seq = 0  # Sequence number of the last batched action sent
+        self.acked_seq = 0  # Last sequence number the server reported as applied
         self.session = requests.Session()
-        logger.info(f"HTTP client initialized with server URL: {self.server_url}")
+        # Every request names the room so a multi-process server can route it to the owning worker
+        self.room = room if room is not None else (config.CLIENT_ROOM or config.DEFAULT_ROOM)
+        self.session.headers[config.ROOM_HEADER] = self.room
+        logger.info(f"HTTP client initialized with server URL: {self.server_url} (room '{self.room}')")
     
     def start(self):
         """Connect to the server and start the polling thread"""
@@ -53,17 +71,27 @@ class HttpNetworkHandler:
                 return False
             
             # Update the game state with initial data
+            self.state_version = data.get("version")
             self.game_manager.update_state(data)
             
+            if self.transport == "websocket":
+                self._open_websocket()
+
             # Start the polling thread
             self.running = True
-            self.thread = threading.Thread(target=self._polling_thread, daemon=True)
+            if self.transport == "websocket":
+                target = self._websocket_thread
+            elif self.transport == "sse":
+                target = self._stream_thread
+            else:
+                target = self._polling_thread
+            self.thread = threading.Thread(target=target, daemon=True)
             self.thread.start()
             
             logger.info(f"Connected to server with client ID: {self.client_id}")
             return True
             
-        except requests.exceptions.ConnectionError as e:
+        except (requests.exceptions.ConnectionError, OSError) as e:
             logger.error(f"Connection to server failed: {e}")
             self.game_manager.handle_disconnect()
             return False
@@ -75,6 +103,7 @@ class HttpNetworkHandler:
     def stop(self):
         """Stop the polling thread and disconnect from the server"""
         self.running = False
+        self._close_websocket()
         
         # Send disconnect message to server
         if self.client_id:
@@ -99,6 +128,10 @@ class HttpNetworkHandler:
         if not self.running or not self.client_id:
             return
         
+        if self.ws_sock is not None:
+            self._send_websocket_action(data)
+            return
+        
         try:
             # Add client ID to the action data
             data["client_id"] = self.client_id
@@ -118,21 +151,77 @@ class HttpNetworkHandler:
             self.game_manager.handle_disconnect()
             self.stop()
     
+    def send_actions(self, actions):
+        """Send one frame's actions as a single sequenced batch (POST /actions or one WebSocket message)"""
+        if not self.running or not self.client_id or not actions:
+            return
+        
+        batch = []
+        for data in actions:
+            self.next_seq += 1
+            batch.append(dict(data, seq=self.next_seq))
+        
+        if self.ws_sock is not None:
+            self._send_websocket_action({"actions": batch})
+            return
+        
+        try:
+            response = self.session.post(
+                f"{self.server_url}/actions",
+                json={"client_id": self.client_id, "actions": batch},
+                timeout=2.0
+            )
+            
+            if response.status_code != 200:
+                logger.warning(f"Server returned error: {response.status_code}")
+            else:
+                self.acked_seq = response.json().get("last_seq", self.acked_seq)
+                
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to send actions: {e}")
+            self.game_manager.handle_disconnect()
+            self.stop()
+    
     def _polling_thread(self):
         """Thread that polls the server for game state updates"""
         while self.running:
             try:
-                # Poll for game state updates
+                # Poll for game state updates; client_id came with /connect, and leaving it out
+                # lets the server answer from its shared, already-compressed snapshot
+                params = {}
+                if self.long_poll and self.state_version is not None:
+                    params["since"] = self.state_version
+                binary = config.CLIENT_STATE_ENCODING == "binary"
+                if config.CLIENT_STATE_DELTAS and not binary and self.delta_base is not None:
+                    params["base"] = self.delta_base
+                headers = {"If-None-Match": self.etag} if self.etag else {}
+                if binary:
+                    headers["Accept"] = f"{state_codec.CONTENT_TYPE}, application/json;q=0.5"
                 response = self.session.get(
                     f"{self.server_url}/game_state",
-                    params={"client_id": self.client_id},
-                    timeout=2.0
+                    params=params,
+                    headers=headers,
+                    timeout=config.LONG_POLL_TIMEOUT + 2.0 if self.long_poll else 2.0
                 )
                 
                 if response.status_code == 200:
                     # Update the game state with the new data
-                    state = response.json()
+                    if response.headers.get("Content-Type", "").startswith(state_codec.CONTENT_TYPE):
+                        state = state_codec.decode_state(response.content)
+                    else:
+                        state = response.json()
+                    self.state_version = state.get("version", self.state_version)
+                    self.etag = response.headers.get("ETag")
                     self.game_manager.update_state(state)
+                    self._catch_up_events()
+                    current = self.game_manager.current_state
+                    if current and current.get("version") == self.state_version:
+                        self.delta_base = self.state_version
+                    else:
+                        # A delta that could not be applied left us on an older version: fetch a full state next
+                        self.delta_base = self.etag = self.state_version = None
+                elif response.status_code == 304:
+                    pass  # Nothing changed since the state we already hold
                 else:
                     logger.warning(f"Server returned error during polling: {response.status_code}")
                     
@@ -149,5 +238,173 @@ class HttpNetworkHandler:
                     self.game_manager.handle_disconnect()
                     break
             
-            # Sleep before next poll
-            time.sleep(self.poll_interval)
+            # Long-polling already waited on the server, so ask again right away
+            if not self.long_poll:
+                time.sleep(self.poll_interval)
+
+    def _catch_up_events(self):
+        """Fetch game events logged in state versions this client never received (GET /events?after=)"""
+        if not self.game_manager.missing_events():
+            return
+        try:
+            response = self.session.get(
+                f"{self.server_url}/events",
+                params={"after": self.game_manager.event_cursor},
+                timeout=2.0
+            )
+            if response.status_code == 200:
+                self.game_manager.add_events(response.json().get("events", []))
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not fetch missed game events: {e}")
+
+    def _stream_thread(self):
+        """Thread that consumes GET /stream Server-Sent Events, resuming with Last-Event-ID after a drop"""
+        retry_delay = config.STREAM_RETRY_MS / 1000.0
+        failures = 0
+        while self.running:
+            headers = {}
+            if self.state_version is not None:
+                headers["Last-Event-ID"] = str(self.state_version)
+            try:
+                with self.session.get(
+                    f"{self.server_url}/stream",
+                    headers=headers,
+                    stream=True,
+                    timeout=(5.0, config.STREAM_HEARTBEAT * 2)  # no bytes for two heartbeats = dead stream
+                ) as response:
+                    if response.status_code != 200:
+                        raise requests.exceptions.RequestException(f"stream returned {response.status_code}")
+                    failures = 0
+                    buffer = b""
+                    # chunk_size=None yields each chunk as it arrives; the server sends one event per chunk
+                    for chunk in response.iter_content(chunk_size=None):
+                        if not self.running:
+                            return
+                        buffer += chunk
+                        while b"\n\n" in buffer:
+                            event, buffer = buffer.split(b"\n\n", 1)
+                            retry_delay = self._handle_stream_event(event.decode('utf-8'), retry_delay)
+            except requests.exceptions.RequestException as e:
+                if not self.running:
+                    return
+                failures += 1
+                logger.warning(f"Stream interrupted ({e}), reconnecting in {retry_delay:.1f}s")
+                if failures > 3:
+                    logger.error("Stream could not be resumed")
+                    self.running = False
+                    self.game_manager.handle_disconnect()
+                    return
+            except Exception as e:
+                logger.error(f"Unexpected error in stream thread: {e}")
+                if self.running:
+                    self.running = False
+                    self.game_manager.handle_disconnect()
+                return
+            time.sleep(retry_delay)
+
+    def _handle_stream_event(self, event, retry_delay):
+        """Apply one SSE event block; returns the (possibly server-updated) reconnect delay"""
+        event_id = None
+        data_lines = []
+        for line in event.split("\n"):
+            if line.startswith(":"):
+                continue  # heartbeat comment
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                event_id = value
+            elif field == "data":
+                data_lines.append(value)
+            elif field == "retry" and value.isdigit():
+                retry_delay = int(value) / 1000.0
+        if data_lines:
+            state = json.loads("\n".join(data_lines))
+            self.game_manager.update_state(state)
+            self._catch_up_events()
+        if event_id is not None and event_id.isdigit():
+            self.state_version = int(event_id)
+        return retry_delay
+
+    def _open_websocket(self):
+        """Upgrade a raw socket to a WebSocket on GET /ws; raises OSError if the server refuses"""
+        sock = socket.create_connection((config.SERVER_IP, self.server_port), timeout=5.0)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        key = base64.b64encode(os.urandom(16)).decode()
+        handshake = (
+            f"GET /ws?client_id={self.client_id} HTTP/1.1\r\n"
+            f"Host: {config.SERVER_IP}:{self.server_port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            f"{config.ROOM_HEADER}: {self.room}\r\n"
+            "\r\n"
+        )
+        sock.sendall(handshake.encode())
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = sock.recv(4096)
+            if not chunk:
+                sock.close()
+                raise ConnectionAbortedError("Server closed the connection during the WebSocket handshake")
+            response += chunk
+        head, _, rest = response.partition(b"\r\n\r\n")
+        head = head.decode('utf-8', errors='ignore')
+        if not head.startswith("HTTP/1.1 101") or websocket.accept_key(key) not in head:
+            sock.close()
+            raise ConnectionAbortedError(f"WebSocket upgrade refused: {head.splitlines()[0] if head else ''}")
+        sock.settimeout(config.STREAM_HEARTBEAT * 2)  # the server pings at least this often
+        self._ws_buffered = rest
+        self.ws_sock = sock
+        logger.info("WebSocket transport connected")
+
+    def _send_websocket_action(self, data):
+        try:
+            frame = websocket.encode_frame(json.dumps(data), mask=True)
+            with self._ws_lock:
+                self.ws_sock.sendall(frame)
+        except (OSError, AttributeError) as e:
+            if self.running:
+                logger.error(f"Failed to send action: {e}")
+                self.game_manager.handle_disconnect()
+                self.stop()
+
+    def _close_websocket(self):
+        sock, self.ws_sock = self.ws_sock, None
+        if sock is None:
+            return
+        try:
+            with self._ws_lock:
+                sock.sendall(websocket.close_frame(mask=True))
+        except OSError:
+            pass
+        sock.close()
+
+    def _websocket_thread(self):
+        """Thread that applies snapshots pushed over the WebSocket"""
+        parser = websocket.FrameParser(max_message_size=1 << 24, require_mask=False)
+        data = self._ws_buffered
+        try:
+            while self.running:
+                for opcode, payload in parser.feed(data):
+                    if opcode == websocket.OP_TEXT:
+                        message = json.loads(payload)
+                        if "error" in message:
+                            logger.warning(f"Server rejected action: {message['error']}")
+                            continue
+                        self.state_version = message.get("version", self.state_version)
+                        self.game_manager.update_state(message)
+                        self._catch_up_events()
+                    elif opcode == websocket.OP_PING:
+                        with self._ws_lock:
+                            self.ws_sock.sendall(websocket.encode_frame(payload, websocket.OP_PONG, mask=True))
+                    elif opcode == websocket.OP_CLOSE:
+                        raise ConnectionAbortedError("Server closed the WebSocket")
+                data = self.ws_sock.recv(65536)
+                if not data:
+                    raise ConnectionAbortedError("Server closed the connection")
+        except (OSError, AttributeError, ValueError, websocket.WebSocketError) as e:
+            if self.running:
+                logger.error(f"Error in WebSocket thread: {e}")
+                self.running = False
+                self.game_manager.handle_disconnect()
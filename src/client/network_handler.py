@@ -17,14 +17,15 @@ class NetworkHandler:
         self.game_manager = game_manager
         self.thread = None
         self.running = False
+        self.next_seq = 0  # sequence number of the last batched action sent
         self.sock.settimeout(1.0)  # Timeout for socket operations (connect, recv)
         logger.info("Network handler initialized")
 
     def start(self):
         """Connect to the server and start the receiver thread"""
         try:
-            logger.info(f"Connecting to server at {config.SERVER_IP}:{config.SERVER_PORT}")
-            self.sock.connect((config.SERVER_IP, config.SERVER_PORT))
+            logger.info(f"Connecting to server at {config.SERVER_IP}:{config.TCP_PUSH_PORT}")
+            self.sock.connect((config.SERVER_IP, config.TCP_PUSH_PORT))
         except (socket.error, ConnectionRefusedError) as e:
             logger.error(f"Connection to server failed: {e}")
             self.game_manager.handle_disconnect()
@@ -79,6 +80,16 @@ class NetworkHandler:
             self.game_manager.handle_disconnect()
             self.stop()
 
+    def send_actions(self, actions):
+        """Send one frame's actions as a single sequenced batch message"""
+        if not actions:
+            return
+        batch = []
+        for data in actions:
+            self.next_seq += 1
+            batch.append(dict(data, seq=self.next_seq))
+        self.send_action({"actions": batch})
+
     def _recv_all(self, n):
         """Receive exactly n bytes from the socket"""
         data = bytearray()
@@ -0,0 +1,179 @@
+"""
+asyncio front end for We are Cooked game server
+Serves HttpServer routing from asyncio.start_server and runs the game tick
+as an asyncio task, so keep-alive pollers cost a coroutine instead of a thread
+"""
+
+import asyncio
+import time
+import logging
+
+from src.shared import config
+from src.server.http import HttpServer, LongPoll, PushStream, set_nodelay
+from src.server.request_reader import parse_content_length
+from src.server.tick_scheduler import TickScheduler
+from src.server.tcp_push import FramedSession
+
+logger = logging.getLogger('GameServer')
+
+
+class AsyncHttpServer(HttpServer):
+    """HttpServer whose game timer is an asyncio task on the serving loop"""
+
+    def __init__(self, room=None, tick_scheduler=None):
+        if tick_scheduler is None:
+            tick_scheduler = TickScheduler(spawn=self._spawn_timer_task)
+        super().__init__(room, tick_scheduler)
+        self.timer_task = None
+        # Replaced on every publish, so each waiter wakes exactly once per state change
+        self._state_event = asyncio.Event()
+        self.add_state_listener(self._on_state_published)
+
+    def _spawn_timer_task(self):
+        self.timer_task = asyncio.get_running_loop().create_task(self._game_timer_task())
+
+    async def _game_timer_task(self):
+        """Task that runs the tick scheduler on the serving loop, so ticks never race request handlers"""
+        await self.tick_scheduler.run_async()
+
+    def _on_state_published(self, version):
+        self._state_event.set()
+        self._state_event = asyncio.Event()
+
+    async def wait_long_poll(self, poll):
+        """Coroutine counterpart of LongPoll.wait() that never blocks the loop"""
+        while not poll.ready():
+            event = self._state_event
+            try:
+                await asyncio.wait_for(event.wait(), max(0.0, poll.deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
+        return poll.render()
+
+    async def serve_stream(self, stream, reader, writer):
+        """Push snapshot events to one SSE/WebSocket client until it disconnects
+
+        A companion task reads from the client, so WebSocket actions are applied as they arrive.
+        """
+        async def read_client():
+            while not stream.closed:
+                data = await reader.read(config.RECV_CHUNK_SIZE)
+                if not data:
+                    break
+                writer.writelines(stream.receive(data))
+                await writer.drain()
+            stream.closed = True
+
+        loop = asyncio.get_running_loop()
+        writer.write(stream.header)
+        read_task = loop.create_task(read_client())
+        try:
+            while not stream.closed and not stream.server.shutdown_flag:
+                if not stream.pending():
+                    state_wait = loop.create_task(self._state_event.wait())
+                    done, _ = await asyncio.wait({state_wait, read_task}, timeout=config.STREAM_HEARTBEAT,
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                    state_wait.cancel()
+                    if read_task in done:
+                        break
+                    if not done:
+                        if stream.HEARTBEAT:
+                            writer.write(stream.HEARTBEAT)
+                            await writer.drain()
+                        continue
+                writer.writelines(stream.frames())
+                await writer.drain()
+        except (ConnectionError, OSError) as e:
+            logger.info(f"Stream client went away: {e}")
+        finally:
+            read_task.cancel()
+            try:
+                await read_task
+            except (asyncio.CancelledError, ConnectionError, OSError):
+                pass
+            stream.on_close()
+
+    async def handle_push_client(self, reader, writer):
+        """Serve one length-prefixed TCP push client (see src/server/tcp_push.py)"""
+        set_nodelay(writer.get_extra_info('socket'))
+        logger.info(f"Push connection from {writer.get_extra_info('peername')}")
+        try:
+            await self.serve_stream(FramedSession(self), reader, writer)
+        finally:
+            writer.close()
+
+    async def handle_client(self, reader, writer):
+        """Serve one keep-alive connection; drain() applies backpressure from slow clients"""
+        address = writer.get_extra_info('peername')
+        set_nodelay(writer.get_extra_info('socket'))
+        logger.info(f"Connection from {address}")
+        try:
+            keep_alive_counter = 0
+            while keep_alive_counter < config.KEEP_ALIVE_MAX_REQUESTS:
+                try:
+                    header_data = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), config.KEEP_ALIVE_TIMEOUT)
+                    content_length = parse_content_length(header_data)
+                    body_data = await reader.readexactly(content_length) if content_length else b""
+                except asyncio.TimeoutError:
+                    logger.info(f"Client {address} timed out (keep-alive). Closing connection.")
+                    break
+                except asyncio.LimitOverrunError:
+                    logger.info(f"Client {address} sent a header block that is too large.")
+                    break
+                except (asyncio.IncompleteReadError, ConnectionResetError, ConnectionAbortedError):
+                    logger.info(f"Client {address} disconnected gracefully or abruptly.")
+                    break
+
+                result = self.proses((header_data + body_data).decode('utf-8', errors='ignore'))
+                if isinstance(result, PushStream):
+                    await self.serve_stream(result, reader, writer)
+                    break
+                if isinstance(result, LongPoll):
+                    result = await self.wait_long_poll(result)
+                writer.writelines(result)
+                await writer.drain()
+                keep_alive_counter += 1
+
+            if keep_alive_counter >= config.KEEP_ALIVE_MAX_REQUESTS:
+                logger.info(f"Client {address} reached max keep-alive requests. Closing connection.")
+        except Exception as e:
+            logger.error(f"Error processing client {address}: {e}")
+        finally:
+            logger.info(f"Closing connection for client {address}.")
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+async def serve_async(host='0.0.0.0', port=8000, push_port=None):
+    """Start the asyncio server and serve until cancelled"""
+    server = AsyncHttpServer()
+    listener = await asyncio.start_server(
+        server.handle_client, host, port,
+        limit=config.MAX_HEADER_SIZE, backlog=config.LISTEN_BACKLOG
+    )
+    logger.info(f"Starting HTTP game server (asyncio) on {host}:{port}")
+    push_listener = None
+    if push_port:
+        push_listener = await asyncio.start_server(server.handle_push_client, host, push_port,
+                                                   backlog=config.LISTEN_BACKLOG)
+        logger.info(f"TCP push transport listening on {host}:{push_port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if push_listener is not None:
+            push_listener.close()
+        server.rooms.close()
+        if server.timer_task is not None:
+            server.timer_task.cancel()
+
+
+def run_async_server(host='0.0.0.0', port=8000, push_port=None):
+    """Run the HTTP game server on an asyncio event loop"""
+    try:
+        asyncio.run(serve_async(host, port, push_port))
+    except KeyboardInterrupt:
+        logger.info("Server shutting down")
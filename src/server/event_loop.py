@@ -0,0 +1,329 @@
+"""
+Single-threaded event-loop front end for We are Cooked game server
+Drives accept, read, parse, HttpServer.proses and write for every connection
+from one selectors loop (epoll on Linux) instead of one thread per connection
+"""
+
+import socket
+import selectors
+import time
+import logging
+
+from src.shared import config
+from src.server.http import HttpServer, LongPoll, PushStream, consume_buffers, send_buffers, set_nodelay
+from src.server.request_reader import RequestReader
+
+logger = logging.getLogger('GameServer')
+
+
+class _Connection:
+    """Per-connection state kept by the event loop"""
+
+    def __init__(self, sock, address, server):
+        self.sock = sock
+        self.address = address
+        self.server = server
+        self.reader = RequestReader(sock)
+        self.outbuf = []  # memoryviews still to be written, sent scatter-gather
+        self.requests_served = 0
+        self.closing = False
+        self.last_activity = time.monotonic()
+        self.waiting = None  # LongPoll parked until the game state changes
+        self.stream = None  # PushStream (SSE or WebSocket) this connection was turned into
+
+
+class EventLoopServer:
+    """Non-blocking HTTP front end that shares one selector between all connections"""
+
+    def __init__(self, server, listen_socket=None):
+        self.server = server
+        self.listen_socket = listen_socket
+        self.selector = selectors.DefaultSelector()
+        self.connections = {}
+        self.running = False
+        self.parked = set()
+        self.streams = set()
+        self._watched_servers = set()
+        # State listeners run on the game timer thread; they only poke this socketpair
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.add_reader(self._wake_r, self._on_wake)
+        if listen_socket is not None:
+            listen_socket.setblocking(False)
+            self.selector.register(listen_socket, selectors.EVENT_READ, None)
+
+    def add_connection(self, sock, address, initial_data=b"", server=None):
+        """Start serving an accepted socket, optionally with bytes already read from it"""
+        sock.setblocking(False)
+        set_nodelay(sock)
+        conn = _Connection(sock, address, server or self.server)
+        if id(conn.server) not in self._watched_servers:
+            self._watched_servers.add(id(conn.server))
+            conn.server.add_state_listener(self._wake)
+        self.connections[sock.fileno()] = conn
+        self.selector.register(sock, selectors.EVENT_READ, conn)
+        if initial_data:
+            conn.reader.feed(initial_data)
+            self._process_requests(conn)
+        return conn
+
+    def add_push_listener(self, listen_socket, session_factory):
+        """Accept connections on a second socket that start out as push streams (no HTTP request)"""
+        listen_socket.setblocking(False)
+        self.add_reader(listen_socket, lambda: self._accept_push(listen_socket, session_factory))
+
+    def add_reader(self, sock, callback):
+        """Call `callback()` from the loop whenever `sock` becomes readable"""
+        self.selector.register(sock, selectors.EVENT_READ, callback)
+
+    def serve_forever(self):
+        """Run the event loop until stop() is called"""
+        self.running = True
+        last_sweep = time.monotonic()
+        while self.running:
+            for key, mask in self.selector.select(timeout=self._select_timeout()):
+                if key.data is None:
+                    self._accept()
+                    continue
+                if callable(key.data):
+                    key.data()
+                    continue
+                conn = key.data
+                if mask & selectors.EVENT_READ:
+                    self._on_readable(conn)
+                if mask & selectors.EVENT_WRITE and conn.sock.fileno() != -1:
+                    self._flush(conn)
+
+            if self.parked:
+                self._resume_parked()
+            if self.streams:
+                self._push_streams()
+            now = time.monotonic()
+            if now - last_sweep >= 1.0:
+                self._close_idle_connections(now)
+                last_sweep = now
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        for conn in list(self.connections.values()):
+            self._close(conn)
+        self.selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client_socket, client_address = self.listen_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            logger.info(f"Connection from {client_address}")
+            self.add_connection(client_socket, client_address)
+
+    def _accept_push(self, listen_socket, session_factory):
+        while True:
+            try:
+                client_socket, client_address = listen_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            logger.info(f"Push connection from {client_address}")
+            conn = self.add_connection(client_socket, client_address)
+            self._start_stream(conn, session_factory(conn.server))
+            self._flush(conn)
+
+    def _start_stream(self, conn, stream):
+        conn.stream = stream
+        self.streams.add(conn)
+        conn.outbuf.append(memoryview(stream.header))
+        conn.outbuf.extend(memoryview(frame) for frame in stream.frames())
+
+    def _on_readable(self, conn):
+        try:
+            data = conn.sock.recv(conn.reader.chunk_size)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            logger.info(f"Client {conn.address} disconnected abruptly: {e}")
+            self._close(conn)
+            return
+
+        if not data:
+            logger.info(f"Client {conn.address} disconnected gracefully.")
+            self._close(conn)
+            return
+
+        conn.last_activity = time.monotonic()
+        if conn.stream is not None:
+            self._on_stream_data(conn, data)
+            return
+        conn.reader.feed(data)
+        self._process_requests(conn)
+
+    def _process_requests(self, conn):
+        try:
+            # While a long-poll is parked, later pipelined requests stay buffered in the reader
+            while not conn.closing and conn.waiting is None and conn.stream is None:
+                request = conn.reader.next_request()
+                if request is None:
+                    break
+                result = conn.server.proses(request.decode('utf-8', errors='ignore'))
+                if isinstance(result, PushStream):
+                    self._start_stream(conn, result)
+                    # Frames a WebSocket client sent right behind its handshake
+                    conn.outbuf.extend(memoryview(frame) for frame in result.receive(conn.reader.detach()))
+                    conn.closing = result.closed
+                    break
+                if isinstance(result, LongPoll):
+                    if not result.ready():
+                        conn.waiting = result
+                        self.parked.add(conn)
+                        break
+                    result = result.render()
+                self._queue_response(conn, result)
+        except ConnectionAbortedError as e:
+            logger.info(f"Client {conn.address} sent an invalid request: {e}")
+            conn.closing = True
+        except Exception as e:
+            logger.error(f"Error processing client {conn.address}: {e}")
+            conn.closing = True
+        self._flush(conn)
+
+    def _queue_response(self, conn, parts):
+        conn.outbuf.extend(memoryview(part) for part in parts if part)
+        conn.requests_served += 1
+        if conn.requests_served >= config.KEEP_ALIVE_MAX_REQUESTS:
+            logger.info(f"Client {conn.address} reached max keep-alive requests. Closing connection.")
+            conn.closing = True
+
+    def _wake(self, version=None):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # a wake-up is already pending
+
+    def _on_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _select_timeout(self):
+        if not self.parked:
+            return 1.0
+        nearest = min(conn.waiting.deadline for conn in self.parked)
+        return max(0.0, min(1.0, nearest - time.monotonic()))
+
+    def _resume_parked(self):
+        """Answer parked long-polls whose state advanced or whose deadline passed"""
+        for conn in list(self.parked):
+            if conn.sock.fileno() == -1:
+                self.parked.discard(conn)
+                continue
+            if not conn.waiting.ready():
+                continue
+            self.parked.discard(conn)
+            poll, conn.waiting = conn.waiting, None
+            conn.last_activity = time.monotonic()
+            try:
+                self._queue_response(conn, poll.render())
+            except Exception as e:
+                logger.error(f"Error processing client {conn.address}: {e}")
+                conn.closing = True
+            self._process_requests(conn)
+
+    def _on_stream_data(self, conn, data):
+        try:
+            conn.outbuf.extend(memoryview(frame) for frame in conn.stream.receive(data))
+        except Exception as e:
+            logger.error(f"Error processing stream client {conn.address}: {e}")
+            conn.stream.closed = True
+        if conn.stream.closed:
+            conn.closing = True
+        self._flush(conn)
+
+    def _push_streams(self):
+        """Write new snapshot events to every push connection that has caught up with its last write"""
+        now = time.monotonic()
+        for conn in list(self.streams):
+            if conn.stream.server.shutdown_flag:
+                self._close(conn)  # its room was destroyed
+                continue
+            if conn.outbuf or conn.closing:
+                continue  # still draining; the missed events are replayed from history next time
+            if conn.stream.pending():
+                conn.outbuf.extend(memoryview(frame) for frame in conn.stream.frames())
+            elif conn.stream.HEARTBEAT and now - conn.last_activity >= config.STREAM_HEARTBEAT:
+                conn.outbuf.append(memoryview(conn.stream.HEARTBEAT))
+            else:
+                continue
+            conn.last_activity = now
+            self._flush(conn)
+
+    def _flush(self, conn):
+        """Write as much pending output as the socket accepts and update the interest set"""
+        if conn.outbuf:
+            try:
+                consume_buffers(conn.outbuf, send_buffers(conn.sock, conn.outbuf))
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError as e:
+                logger.info(f"Client {conn.address} disconnected while writing: {e}")
+                self._close(conn)
+                return
+
+        if conn.outbuf:
+            events = selectors.EVENT_WRITE if conn.closing else selectors.EVENT_READ | selectors.EVENT_WRITE
+            self.selector.modify(conn.sock, events, conn)
+        elif conn.closing:
+            self._close(conn)
+        else:
+            self.selector.modify(conn.sock, selectors.EVENT_READ, conn)
+
+    def _close_idle_connections(self, now):
+        for conn in list(self.connections.values()):
+            if conn.outbuf or conn.waiting is not None or conn.stream is not None:
+                continue
+            if now - conn.last_activity >= config.KEEP_ALIVE_TIMEOUT:
+                logger.info(f"Client {conn.address} timed out (keep-alive). Closing connection.")
+                self._close(conn)
+
+    def _close(self, conn):
+        fileno = conn.sock.fileno()
+        if fileno == -1:
+            return
+        logger.info(f"Closing connection for client {conn.address}.")
+        self.connections.pop(fileno, None)
+        self.parked.discard(conn)
+        self.streams.discard(conn)
+        self.selector.unregister(conn.sock)
+        conn.sock.close()
+        if conn.stream is not None:
+            conn.stream.on_close()
+
+
+def run_event_loop_server(host='0.0.0.0', port=8000, push_port=None):
+    """Run the HTTP game server from a single selectors event loop"""
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(config.LISTEN_BACKLOG)
+
+    logger.info(f"Starting HTTP game server (event loop, {selectors.DefaultSelector.__name__}) on {host}:{port}")
+
+    loop = EventLoopServer(HttpServer(), server_socket)
+    if push_port:
+        # Same loop, same GameState; imported late because tcp_push builds on this module
+        from src.server.tcp_push import FramedSession, push_listen_socket
+        loop.add_push_listener(push_listen_socket(host, push_port), FramedSession)
+        logger.info(f"TCP push transport listening on {host}:{push_port}")
+    try:
+        loop.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server shutting down")
+    finally:
+        loop.close()
+        server_socket.close()
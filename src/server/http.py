@@ -3,14 +3,24 @@ import socket
 import threading
 import time
 import json
+import struct
+import gzip
+import zlib
 import uuid
 import logging
-from datetime import datetime
+import functools
+from email.utils import formatdate
 import random
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs
 
 from src.shared.game_state import GameState
+from src.shared.event_log import EventLog
 from src.shared import config
+from src.server.request_reader import RequestReader
+from src.server.tick_scheduler import TickScheduler
+from src.server.rooms import RoomError, RoomManager
+from src.shared import websocket
+from src.shared import state_codec
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,274 +29,971 @@ logging.basicConfig(
 )
 logger = logging.getLogger('GameServer')
 
+IOV_MAX = 1024  # most buffers a single sendmsg call accepts on Linux
+
+_date_cache = [None, b""]
+
+def _http_date_line():
+    """Return the Date header line, formatting it at most once per second"""
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache[1] = f"Date: {formatdate(now, usegmt=True)}\r\n".encode()
+        _date_cache[0] = now
+    return _date_cache[1]
+
+def set_nodelay(sock):
+    """Disable Nagle so small responses are not held back waiting for ACKs"""
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass  # not a TCP socket (e.g. a socketpair in benchmarks)
+
+def consume_buffers(buffers, sent):
+    """Drop `sent` bytes from the front of a list of memoryviews after a partial send"""
+    while sent:
+        first = buffers[0]
+        if sent >= len(first):
+            sent -= len(first)
+            del buffers[0]
+        else:
+            buffers[0] = first[sent:]
+            sent = 0
+
+def send_buffers(connection, buffers):
+    """One scatter-gather write of a list of buffers; returns the number of bytes sent"""
+    if hasattr(connection, 'sendmsg'):
+        return connection.sendmsg(buffers[:IOV_MAX])
+    return connection.send(buffers[0])  # Windows has no sendmsg
+
+# Content codings the server can produce, in order of preference for equal q-values
+_CONTENT_ENCODERS = {
+    'gzip': lambda body, level: gzip.compress(body, level, mtime=0),
+    'deflate': lambda body, level: zlib.compress(body, level),
+}
+
+@functools.lru_cache(maxsize=64)
+def negotiate_encoding(accept_encoding):
+    """Return 'gzip', 'deflate' or None (identity) for an Accept-Encoding header value"""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in _CONTENT_ENCODERS:
+        q = qualities.get(coding, qualities.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header value against one of our ETags"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def _chunk(data):
+    """Wrap bytes as one chunk of a Transfer-Encoding: chunked body"""
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+def send_response(connection, buffers):
+    """Send header and body buffers without concatenating them"""
+    pending = [memoryview(b) for b in buffers if b]
+    while pending:
+        consume_buffers(pending, send_buffers(connection, pending))
+
+class Request:
+    """Parsed HTTP request; headers, query and JSON body are decoded on first use"""
+    __slots__ = ('method', 'path', 'query_string', 'header_block', 'body', '_headers', '_query', '_json')
+
+    def __init__(self, method, path, query_string, header_block, body):
+        self.method = method
+        self.path = path
+        self.query_string = query_string
+        self.header_block = header_block
+        self.body = body
+        self._headers = None
+        self._query = None
+        self._json = None
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = {}
+            for h in self.header_block.split("\r\n"):
+                if ': ' in h:
+                    k, v = h.split(': ', 1)
+                    self._headers[k.lower()] = v
+        return self._headers
+
+    @property
+    def query(self):
+        if self._query is None:
+            self._query = parse_qs(self.query_string)
+        return self._query
+
+    def json(self):
+        """Decode the body as JSON; raises json.JSONDecodeError like json.loads"""
+        if self._json is None:
+            self._json = json.loads(self.body)
+        return self._json
+
+# Snapshot fields that are maps of entities; deltas carry only the entries that changed
+DELTA_ENTITY_KEYS = ("players", "clients_info")
+# Snapshot fields that only hold what happened since the previous version; deltas concatenate them
+DELTA_EVENT_KEYS = ("events",)
+
+class Snapshot:
+    """One published state version, encoded once and then shared read-only by every request
+
+    Built by publish_state (on the tick thread during a match); `encoded` and `deltas`
+    only ever gain entries derived from `body` and `state`, which never change, so
+    readers look them up without a lock and only fill a missing one under _encode_lock.
+    """
+    __slots__ = ('version', 'state', 'body', 'length', 'etag', 'encoded', 'deltas')
+
+    def __init__(self, version, state, etag):
+        self.version = version
+        self.state = state
+        self.body = json.dumps(state).encode()
+        self.length = len(self.body)
+        self.etag = etag
+        self.encoded = {}  # transport framings (keyed by encoder) and content codings of body
+        self.deltas = {}  # base version -> (delta body, content-coding cache for it)
+
+def state_delta(base, snapshots):
+    """Delta from the `base` Snapshot to the last of `snapshots` (every version after base, in order)
+
+    {"base": b, "version": v, "changed": {field: value}, "entities": {field: {"upsert": {...}, "remove": [...]}}}
+    """
+    old, new = base.state, snapshots[-1].state
+    changed = {}
+    entities = {}
+    for key, value in new.items():
+        if key == "version":
+            continue
+        if key in DELTA_EVENT_KEYS:
+            changed[key] = [event for snapshot in snapshots for event in snapshot.state.get(key, [])]
+        elif key in DELTA_ENTITY_KEYS and isinstance(value, dict) and isinstance(old.get(key), dict):
+            old_map = old[key]
+            upsert = {k: v for k, v in value.items() if old_map.get(k) != v}
+            remove = [k for k in old_map if k not in value]
+            if upsert or remove:
+                entities[key] = {"upsert": upsert, "remove": remove}
+        elif old.get(key) != value:
+            changed[key] = value
+    return {"base": base.version, "version": new["version"], "changed": changed, "entities": entities}
+
+class LongPoll:
+    """Deferred /game_state response waiting for the state version to pass `since`
+
+    Blocking front ends call wait(); event-loop front ends park the connection and
+    call render() once ready() turns true (checked from HttpServer state listeners).
+    """
+
+    def __init__(self, server, since, render, timeout=None):
+        self.server = server
+        self.since = since
+        self.render = render
+        self.deadline = time.monotonic() + (timeout if timeout is not None else config.LONG_POLL_TIMEOUT)
+
+    def ready(self):
+        return self.server.state_version > self.since or time.monotonic() >= self.deadline
+
+    def wait(self):
+        with self.server._state_changed:
+            while self.server.state_version <= self.since:
+                remaining = self.deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.server._state_changed.wait(remaining)
+        return self.render()
+
+class PushStream:
+    """A connection turned into a server push channel after GET /stream or a WebSocket upgrade
+
+    Front ends write `header`, then frames() whenever pending() is true and HEARTBEAT
+    when idle, and pass whatever the client sends to receive(). Frames are snapshot
+    events keyed by state version: encode(version, body) frames one snapshot body for
+    the transport, once per version, and the frame is shared by all its streams.
+    """
+    HEARTBEAT = b""
+
+    def __init__(self, server, last_id, encode):
+        self.server = server
+        self.last_id = last_id
+        self.encode = encode
+        self.closed = False
+        self.header = b""
+
+    def pending(self):
+        return self.server.state_version > self.last_id
+
+    def frames(self):
+        frames = self.server.stream_frames_since(self.last_id, self.encode)
+        if frames:
+            self.last_id = frames[-1][0]
+        return [frame for _, frame in frames]
+
+    def receive(self, data):
+        """Handle bytes sent by the client; returns frames to write back"""
+        return []
+
+    def on_close(self):
+        """Called once by the front end after the connection is gone"""
+
+    def serve(self, connection, initial_data=b""):
+        """Blocking loop for the thread-per-connection front end; returns when the stream ends
+
+        A helper thread pushes snapshots while this thread reads from the client.
+        """
+        send_lock = threading.Lock()
+        connection.settimeout(config.STREAM_HEARTBEAT * 2)
+
+        def push():
+            condition = self.server._state_changed
+            try:
+                while not self.closed and not self.server.shutdown_flag:
+                    with condition:
+                        if not self.pending():
+                            condition.wait(config.STREAM_HEARTBEAT)
+                    if self.closed:
+                        break
+                    with send_lock:
+                        send_response(connection, self.frames() or [self.HEARTBEAT])
+            except OSError as e:
+                logger.info(f"Stream client went away: {e}")
+            self.closed = True
+
+        with send_lock:
+            send_response(connection, [self.header] + self.receive(initial_data))
+        threading.Thread(target=push, daemon=True).start()
+        try:
+            while not self.closed:
+                try:
+                    data = connection.recv(config.RECV_CHUNK_SIZE)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                replies = self.receive(data)
+                if replies:
+                    with send_lock:
+                        send_response(connection, replies)
+        except OSError as e:
+            logger.info(f"Stream client went away: {e}")
+        finally:
+            self.closed = True
+            self.on_close()
+
+class EventStream(PushStream):
+    """GET /stream: Server-Sent Events over a chunked response
+
+    Event ids are state versions, so a client reconnecting with Last-Event-ID gets
+    the snapshots it missed replayed first.
+    """
+    HEARTBEAT = _chunk(b": ping\n\n")  # comment event, keeps proxies and dead-peer detection going
+
+    def __init__(self, server, last_id):
+        super().__init__(server, last_id, self.encode_event)
+        self.header = server.stream_header()
+
+    @staticmethod
+    def encode_event(version, body):
+        return _chunk(b"id: %d\nevent: state\ndata: %s\n\n" % (version, body))
+
+class WebSocketSession(PushStream):
+    """GET /ws with Upgrade: websocket; actions come in as text frames, snapshots go out as text frames"""
+    HEARTBEAT = websocket.encode_frame(b"", websocket.OP_PING)
+
+    def __init__(self, server, last_id, key, client_id=None):
+        super().__init__(server, last_id, self.encode_state)
+        self.client_id = client_id
+        self.parser = websocket.FrameParser(config.WS_MAX_MESSAGE_SIZE)
+        self.header = (
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocket.accept_key(key)}\r\n"
+            "\r\n"
+        ).encode()
+
+    @staticmethod
+    def encode_state(version, body):
+        return websocket.encode_frame(body)
+
+    def receive(self, data):
+        try:
+            messages = self.parser.feed(data)
+        except websocket.WebSocketError as e:
+            logger.info(f"WebSocket protocol error from {self.client_id}: {e}")
+            self.closed = True
+            return [websocket.close_frame(e.code)]
+
+        replies = []
+        for opcode, payload in messages:
+            if opcode == websocket.OP_TEXT:
+                replies.extend(self._on_action(payload))
+            elif opcode == websocket.OP_PING:
+                replies.append(websocket.encode_frame(payload, websocket.OP_PONG))
+            elif opcode == websocket.OP_CLOSE:
+                replies.append(websocket.close_frame())
+                self.closed = True
+                break
+            elif opcode == websocket.OP_BINARY:
+                replies.append(websocket.close_frame(websocket.CLOSE_UNSUPPORTED_DATA))
+                self.closed = True
+                break
+        return replies
+
+    def _on_action(self, payload):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return [websocket.encode_frame(json.dumps({"error": "Invalid JSON"}))]
+        if self.client_id:
+            data["client_id"] = self.client_id  # the session is bound to the client that opened it
+        if isinstance(data.get("actions"), list):
+            applied = self.server.apply_actions(data.get("client_id"), data["actions"])
+        else:
+            applied = self.server.apply_action(data)
+        if applied is False:
+            return [websocket.encode_frame(json.dumps({"error": "Invalid client ID"}))]
+        return []
+
+ROOM_ERROR_REASONS = {404: 'Not Found', 409: 'Conflict', 503: 'Service Unavailable'}
+
 class HttpServer:
-    def __init__(self):
-        self.game_state = GameState()
+    def __init__(self, room=None, tick_scheduler=None):
+        # A server built without a room name is the process's default room and hosts the others;
+        # rooms created through it (or by a multiprocess worker) share one tick scheduler
+        self.room = room or config.DEFAULT_ROOM
+        self.tick_scheduler = tick_scheduler if tick_scheduler is not None else TickScheduler()
+        self.rooms = RoomManager(self._new_room, default=self) if room is None else None
+        self.event_log = EventLog()  # outlives each GameState so event ids keep increasing across matches
+        self.game_state = GameState(events=self.event_log)
+        # Copy-on-write: writers build a new dict under _clients_lock and swap it in, so the tick
+        # thread and handlers can iterate clients_info without a lock while clients come and go
         self.clients_info = {}
+        self._clients_lock = threading.Lock()
         self.game_started = False
-        self.timer_thread_active = False
-        self.timer_thread_instance = None
-        self.game_events = []
+        self.game_end = 0.0  # time.monotonic() deadline of the running match
         self.shutdown_flag = False
-        
-    def response(self, kode=200, message='OK', messagebody=bytes(), headers={}):
-        """Generate HTTP response"""
-        tanggal = datetime.now().strftime('%c')
-        resp = []
-        resp.append(f"HTTP/1.1 {kode} {message}\r\n") # Ganti HTTP/1.0 menjadi HTTP/1.1
-        resp.append(f"Date: {tanggal}\r\n")
-        # Hapus baris ini: resp.append("Connection: close\r\n")
-        resp.append("Server: WeAreCooked/1.0\r\n")
-        resp.append(f"Content-Length: {len(messagebody)}\r\n")
-        
-        # Tambahkan header Connection: keep-alive
-        resp.append("Connection: keep-alive\r\n") # Tambahkan ini
-        resp.append(f"Keep-Alive: timeout={config.KEEP_ALIVE_TIMEOUT}, max={config.KEEP_ALIVE_MAX_REQUESTS}\r\n") # Tambahkan ini (perlu konfigurasi baru)
-        
-        # Add CORS headers for browser clients
-        resp.append("Access-Control-Allow-Origin: *\r\n")
-        resp.append("Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n")
-        resp.append("Access-Control-Allow-Headers: Content-Type\r\n")
-        
-        for kk in headers:
-            resp.append(f"{kk}: {headers[kk]}\r\n")
-        resp.append("\r\n")
+        self.worker_pool = None  # set by the worker pool front end so /health can report its stats
+        self.last_seq = {}  # client_id -> seq of the last batched action applied (POST /actions)
+        self.tick_error = None  # why this room's match timer stopped, if its game tick raised
+
+        # Long-polling: state_version is the last version announced to waiting clients
+        self.state_version = self.game_state.version
+        self._state_changed = threading.Condition()
+        self._state_listeners = []
+
+        # ETags are W/"<instance>-<version>" so a version number from a previous run never matches
+        self._etag_prefix = uuid.uuid4().hex[:8]
+
+        # Snapshot published for state_version, plus recent ones for SSE replay and ?base= deltas.
+        # Read-copy-update: publishers build a new Snapshot and a new history tuple under
+        # _stream_lock and swap the references; readers never take _stream_lock, so a poll
+        # cannot hold up the tick. Encodings a reader adds to a published Snapshot (gzip,
+        # deltas, binary, stream frames) are built once under _encode_lock, which publishers never take.
+        self._stream_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._stream_history = ()
+        self.current_snapshot = self._capture_snapshot()
 
-        response_headers = ''.join(resp)
+        # Header lines that never change are encoded once instead of on every response
+        self._status_lines = {}
+        self._static_headers = (
+            "Server: WeAreCooked/1.0\r\n"
+            # Add CORS headers for browser clients
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS\r\n"
+            f"Access-Control-Allow-Headers: Content-Type, If-None-Match, {config.ROOM_HEADER}\r\n"
+            "Access-Control-Expose-Headers: ETag\r\n"
+        ).encode()
+        self._keep_alive_headers = (
+            "Connection: keep-alive\r\n"
+            f"Keep-Alive: timeout={config.KEEP_ALIVE_TIMEOUT}, max={config.KEEP_ALIVE_MAX_REQUESTS}\r\n"
+        ).encode() + self._static_headers
+
+        # Route table keyed by (method, path); add endpoints with add_route
+        self.routes = {}
+        self._known_paths = set()
+        self.add_route('GET', '/game_state', self.handle_game_state)
+        self.add_route('GET', '/stream', self.handle_stream)
+        self.add_route('GET', '/ws', self.handle_websocket)
+        self.add_route('GET', '/events', self.handle_events)
+        self.add_route('GET', '/health', self.handle_health)
+        self.add_route('POST', '/connect', self.handle_connect)
+        self.add_route('POST', '/action', self.handle_action)
+        self.add_route('POST', '/actions', self.handle_actions)
+        self.add_route('POST', '/disconnect', self.handle_disconnect)
         
+    def response(self, kode=200, message='OK', messagebody=bytes(), headers={}, request=None, cache=None):
+        """Generate HTTP response as (header bytes, body bytes) for scatter-gather sending
+
+        Given the `request`, a body of at least COMPRESSION_MIN_SIZE bytes is compressed
+        with the coding its Accept-Encoding prefers. `cache` is a dict shared by every
+        response with this exact body (one per state version) so it is compressed once.
+        """
         # Convert messagebody to bytes if it's not already
         if not isinstance(messagebody, bytes):
             messagebody = messagebody.encode()
 
-        # Combine headers and body
-        response = response_headers.encode() + messagebody
-        return response
+        vary = encoding = None
+        if request is not None and config.COMPRESSION_LEVEL and len(messagebody) >= config.COMPRESSION_MIN_SIZE:
+            vary = b"Vary: Accept-Encoding\r\n"
+            encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+            if encoding:
+                messagebody = self._compress(messagebody, encoding, cache)
+
+        resp = [self._status_line(kode, message), _http_date_line()]
+        if kode != 304:  # a 304 has no body; a Content-Length would have to describe the 200 body
+            resp.append(b"Content-Length: %d\r\n" % len(messagebody))
+        if vary:
+            resp.append(vary)
+            if encoding:
+                resp.append(b"Content-Encoding: %s\r\n" % encoding.encode())
+        # Connection: keep-alive kecuali caller menentukan Connection sendiri
+        resp.append(self._static_headers if 'Connection' in headers else self._keep_alive_headers)
+        for kk in headers:
+            resp.append(f"{kk}: {headers[kk]}\r\n".encode())
+        resp.append(b"\r\n")
+
+        return b"".join(resp), messagebody
+
+    def _compress(self, body, encoding, cache=None):
+        if cache is None:
+            return _CONTENT_ENCODERS[encoding](body, config.COMPRESSION_LEVEL)
+        encoded = cache.get(encoding)
+        if encoded is not None:
+            return encoded
+        # Under the encode lock so clients woken together by one tick compress it only once
+        with self._encode_lock:
+            encoded = cache.get(encoding)
+            if encoded is None:
+                encoded = cache[encoding] = _CONTENT_ENCODERS[encoding](body, config.COMPRESSION_LEVEL)
+            return encoded
+
+    def _status_line(self, kode, message):
+        status_line = self._status_lines.get((kode, message))
+        if status_line is None:
+            status_line = f"HTTP/1.1 {kode} {message}\r\n".encode()
+            self._status_lines[(kode, message)] = status_line
+        return status_line
+
+    def stream_header(self):
+        """Response header opening a chunked text/event-stream that lasts until the connection closes"""
+        return b"".join([
+            self._status_line(200, 'OK'), _http_date_line(),
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Transfer-Encoding: chunked\r\n",
+            self._keep_alive_headers, b"\r\n",
+            _chunk(b"retry: %d\n\n" % config.STREAM_RETRY_MS),
+        ])
+
+    def add_route(self, method, path, handler):
+        """Register handler(request) for an exact (method, path) pair"""
+        self.routes[(method, path)] = handler
+        self._known_paths.add(path)
 
     def proses(self, data):
         """Process HTTP request data"""
-        requests = data.split("\r\n")
-        
-        if not requests:
-            return self.response(400, 'Bad Request', '', {})
-            
-        baris = requests[0]
-        
-        # Extract headers
-        headers = {}
-        for h in requests[1:]:
-            if h == '':
-                break
-            if ': ' in h:
-                k, v = h.split(': ', 1)
-                headers[k.lower()] = v
-        
-        # Parse request line
-        j = baris.split(" ")
-        try:
-            method = j[0].upper().strip()
-            url = j[1].strip()
-            
-            # Parse URL
-            parsed_url = urlparse(url)
-            path = parsed_url.path
-            query = parse_qs(parsed_url.query)
-            
-            # Handle different HTTP methods
-            if method == 'GET':
-                return self.http_get(path, query, headers)
-            elif method == 'POST':
-                # Find the request body
-                body = ""
-                content_length = int(headers.get('content-length', 0))
-                
-                # Find the body in the request
-                empty_line_found = False
-                for i, line in enumerate(requests):
-                    if line == '' and i < len(requests) - 1:
-                        empty_line_found = True
-                        body_lines = requests[i+1:]
-                        body = '\r\n'.join(body_lines)
-                        break
-                
-                # If we couldn't find the body using the empty line method,
-                # try to extract it based on content-length
-                if not empty_line_found and content_length > 0:
-                    # Find the double CRLF that separates headers from body
-                    raw_data = data
-                    body_start = raw_data.find('\r\n\r\n')
-                    if body_start != -1:
-                        body = raw_data[body_start + 4:]
-                
-                return self.http_post(path, query, body, headers)
-            elif method == 'OPTIONS':
-                return self.http_options(path, query, headers)
-            else:
-                return self.response(405, 'Method Not Allowed', '', {})
-        except IndexError:
+        head, _, body = data.partition("\r\n\r\n")
+        line_end = head.find("\r\n")
+        request_line = head if line_end == -1 else head[:line_end]
+        j = request_line.split(" ")
+        if len(j) < 2:
             return self.response(400, 'Bad Request', '', {})
 
-    def http_get(self, path, query, headers):
-        """Handle GET requests"""
-        if path == '/game_state':
-            # Return the current game state
-            state_dict = self.game_state.to_dict()
-            state_dict["clients_info"] = self.clients_info
-            state_dict["game_started"] = self.game_started
-            
-            # Add visual effects
-            state_dict["visual_effects"] = {"game_events": []}
-            if "_visual_events" in state_dict:
-                state_dict["visual_effects"]["game_events"].extend(state_dict["_visual_events"])
-                del state_dict["_visual_events"]
-            
-            # Extract client_id from query parameters if present
-            client_id = query.get('client_id', [None])[0]
-            if client_id:
-                state_dict["client_id"] = client_id
-            
-            return self.response(200, 'OK', json.dumps(state_dict), {'Content-Type': 'application/json'})
-        
-        elif path == '/health':
-            # Simple health check endpoint
-            return self.response(200, 'OK', json.dumps({"status": "ok", "players": len(self.clients_info)}), 
-                                {'Content-Type': 'application/json'})
-            
+        method = j[0].upper().strip()
+        path, _, query_string = j[1].strip().partition("?")
+        request = Request(method, path, query_string, '' if line_end == -1 else head[line_end + 2:], body)
+
+        if path == '/rooms' or path.startswith('/rooms/'):
+            return self._route_rooms(request)
+        if self.rooms is not None:
+            # Clients name their room in a header or ?room= as in multiprocess mode; it must exist (POST /rooms)
+            name = request.headers.get(config.ROOM_HEADER.lower()) or \
+                (request.query.get('room', [None])[0] if 'room=' in query_string else None)
+            if name and name != self.room:
+                return self._dispatch_in_room(name, request)
+        return self.dispatch(request)
+
+    def dispatch(self, request):
+        """Run the route handler for a parsed request addressed to this room"""
+        method, path = request.method, request.path
+        # Fast paths for the two hottest routes skip the route table entirely
+        if method == 'GET' and path == '/game_state':
+            handler = self.handle_game_state
+        elif method == 'POST' and path == '/action':
+            handler = self.handle_action
         else:
+            handler = self.routes.get((method, path))
+
+        if handler is None:
+            if method == 'OPTIONS':
+                return self.http_options(request)
+            if method not in ('GET', 'POST'):
+                return self.response(405, 'Method Not Allowed', '', {})
+            if path in self._known_paths:
+                return self.response(405, 'Method Not Allowed', json.dumps({"error": "Method not allowed"}), {'Content-Type': 'application/json'})
             # Handle 404 for unknown paths
-            return self.response(404, 'Not Found', json.dumps({"error": "Not found"}), 
-                                {'Content-Type': 'application/json'})
+            return self.response(404, 'Not Found', json.dumps({"error": "Not found"}), {'Content-Type': 'application/json'})
 
-    def http_post(self, path, query, body, headers):
-        """Handle POST requests"""
         try:
-            data = json.loads(body)
-            action = data.get("action")
-            client_id = data.get("client_id")
-            
-            # Register new client if this is a connection request
-            if path == '/connect':
-                if not client_id:
-                    client_id = str(uuid.uuid4())
-                    self.register_client(client_id)
-                
-                response = {
-                    "client_id": client_id,
-                    "status": "connected",
-                    "game_state": self.game_state.to_dict(),
-                    "clients_info": self.clients_info,
-                    "game_started": self.game_started
-                }
-                return self.response(200, 'OK', json.dumps(response), {'Content-Type': 'application/json'})
-            
-            # Handle client actions
-            if path == '/action':
-                if not client_id or client_id not in self.clients_info:
-                    return self.response(400, 'Bad Request', json.dumps({"error": "Invalid client ID"}), 
-                                        {'Content-Type': 'application/json'})
-                
-                # Process the action based on game state
-                if action == "return_to_lobby":
-                    self.return_to_lobby()
-                
-                elif not self.game_started:
-                    if action == "set_username":
-                        username = data.get("username", "Unknown")
-                        self.clients_info[client_id]["username"] = username
-                        logger.info(f"Client {client_id} set username to {username}")
-                    
-                    elif action == "toggle_ready":
-                        self.clients_info[client_id]["ready"] = not self.clients_info[client_id].get("ready", False)
-                        logger.info(f"Client {client_id} toggled ready. Status: {self.clients_info[client_id]['ready']}")
-                    
-                    elif action == "start_game":
-                        if all(c["ready"] for c in self.clients_info.values()) and len(self.clients_info) > 1:
-                            self.restart_game()
-                
-                else:
-                    if self.game_state.timer > 0:
-                        if action == "move":
-                            direction = data.get("direction")
-                            self.game_state.move_player(client_id, direction)
-                            logger.info(f"Client {client_id} moved {direction}")
-                        
-                        elif action == "restart":
-                            self.restart_game()
-                        
-                        elif action == "change_ingredient":
-                            if self.game_state.can_player_change_ingredient(client_id):
-                                self.change_player_ingredient(client_id)
-                
-                # Return success response
-                return self.response(200, 'OK', json.dumps({"status": "success"}), {'Content-Type': 'application/json'})
-            
-            # Handle disconnect
-            if path == '/disconnect':
-                if client_id in self.clients_info:
-                    self.cleanup_disconnected_players([client_id])
-                    logger.info(f"Client {client_id} disconnected")
-                
-                return self.response(200, 'OK', json.dumps({"status": "disconnected"}), {'Content-Type': 'application/json'})
-            
-            # Handle unknown paths
-            return self.response(404, 'Not Found', json.dumps({"error": "Not found"}), {'Content-Type': 'application/json'})
-            
+            return handler(request)
         except json.JSONDecodeError:
             return self.response(400, 'Bad Request', json.dumps({"error": "Invalid JSON"}), {'Content-Type': 'application/json'})
         except Exception as e:
             logger.error(f"Error processing request: {e}")
             return self.response(500, 'Internal Server Error', json.dumps({"error": str(e)}), {'Content-Type': 'application/json'})
 
-    def http_options(self, path, query, headers):
+    def handle_game_state(self, request):
+        """GET /game_state[?since=<version>][&base=<version>]: return the current game state
+
+        With `since`, the response is held back until the state version passes it
+        or LONG_POLL_TIMEOUT expires. With `base`, only what changed since that
+        version is returned (see state_delta), or the full state if it is too old.
+        """
+        since = request.query.get('since', [None])[0] if request.query_string else None
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return self.response(400, 'Bad Request', json.dumps({"error": "Invalid since"}), {'Content-Type': 'application/json'})
+            if self.state_version <= since:
+                return LongPoll(self, since, lambda: self._game_state_response(request))
+        return self._game_state_response(request)
+
+    def _game_state_response(self, request):
+        # Every poller is served the snapshot published for this version; nothing is re-encoded.
+        # ?client_id= is accepted but no longer echoed: the client has its id from /connect,
+        # and a per-client field would make every body unique.
+        snapshot = self.current_snapshot
+        if request.header_block and etag_matches(request.headers.get('if-none-match'), snapshot.etag):
+            return self.response(304, 'Not Modified', b'', {'ETag': snapshot.etag})
+
+        if state_codec.CONTENT_TYPE in request.headers.get('accept', ''):
+            binary = self._binary_snapshot(snapshot)
+            if binary is not None:
+                return self.response(200, 'OK', binary[0], {'Content-Type': state_codec.CONTENT_TYPE, 'ETag': snapshot.etag},
+                                     request, binary[1])
+
+        body, encoded = snapshot.body, snapshot.encoded
+        base = request.query.get('base', [None])[0] if request.query_string else None
+        if base is not None and base.isdigit():
+            delta = self._delta(int(base), snapshot)
+            if delta is not None:
+                body, encoded = delta
+        
+        return self.response(200, 'OK', body, {'Content-Type': 'application/json', 'ETag': snapshot.etag},
+                             request, encoded)
+
+    def _binary_snapshot(self, snapshot):
+        """(body, coding cache) of the x-cooked-state encoding, built once per snapshot; None if not encodable"""
+        if state_codec.CONTENT_TYPE in snapshot.encoded:
+            return snapshot.encoded[state_codec.CONTENT_TYPE]
+        with self._encode_lock:
+            if state_codec.CONTENT_TYPE not in snapshot.encoded:
+                try:
+                    snapshot.encoded[state_codec.CONTENT_TYPE] = (state_codec.encode_state(snapshot.state), {})
+                except (ValueError, KeyError, struct.error) as e:
+                    logger.warning(f"State version {snapshot.version} has no binary encoding, sending JSON: {e}")
+                    snapshot.encoded[state_codec.CONTENT_TYPE] = None
+            return snapshot.encoded[state_codec.CONTENT_TYPE]
+
+    def etag(self, version):
+        """Weak validator for a state version (weak because gzip and identity bodies share it)"""
+        return f'W/"{self._etag_prefix}-{version}"'
+
+    def _state_dict(self):
+        """Snapshot shared by /game_state and /stream"""
+        state_dict = self.game_state.to_dict()
+        # Copied so snapshots kept for deltas and replay don't change under later lobby updates
+        # (clients_info itself is never resized in place, so iterating it needs no lock)
+        state_dict["clients_info"] = {cid: dict(info) for cid, info in self.clients_info.items()}
+        state_dict["game_started"] = self.game_started
+        return state_dict
+
+    def handle_stream(self, request):
+        """GET /stream: push a snapshot event for every new state version (Server-Sent Events)"""
+        last_id = request.headers.get('last-event-id')
+        if last_id is None and request.query_string:
+            last_id = request.query.get('last_event_id', [None])[0]
+        try:
+            last_id = int(last_id) if last_id is not None else None
+        except ValueError:
+            last_id = None
+        if last_id is None or last_id > self.state_version:
+            # Fresh subscriber, or an id from before a server restart: start from the current snapshot
+            last_id = self.state_version - 1
+        return EventStream(self, last_id)
+
+    def handle_websocket(self, request):
+        """GET /ws: upgrade to a WebSocket carrying actions upstream and snapshots downstream"""
+        headers = request.headers
+        key = headers.get('sec-websocket-key')
+        if headers.get('upgrade', '').lower() != 'websocket' or not key:
+            return self.response(426, 'Upgrade Required', json.dumps({"error": "WebSocket upgrade required"}),
+                                 {'Content-Type': 'application/json', 'Upgrade': 'websocket'})
+        if headers.get('sec-websocket-version') != '13':
+            return self.response(426, 'Upgrade Required', '', {'Sec-WebSocket-Version': '13'})
+        client_id = request.query.get('client_id', [None])[0] if request.query_string else None
+        return WebSocketSession(self, self.state_version - 1, key, client_id)
+
+    def _delta(self, base, snapshot):
+        """(body, coding cache) of the delta from `base` to `snapshot`, built once per pair; None if base is gone"""
+        cached = snapshot.deltas.get(base)
+        if cached is not None:
+            return cached
+        history = self._stream_history
+        if snapshot not in history:
+            return None
+        end = history.index(snapshot)
+        for i in range(end):
+            if history[i].version == base:
+                with self._encode_lock:
+                    cached = snapshot.deltas.get(base)
+                    if cached is None:
+                        cached = snapshot.deltas[base] = (
+                            json.dumps(state_delta(history[i], history[i + 1:end + 1])).encode(), {})
+                return cached
+        return None
+
+    def stream_frames_since(self, last_id, encode):
+        """Return [(version, frame)] newer than last_id
+
+        The current state is serialized at most once per version, and each transport's
+        framing of it (encode) at most once per version as well.
+        """
+        frames = []
+        for snapshot in self._stream_history:
+            if snapshot.version > last_id:
+                frame = snapshot.encoded.get(encode)
+                if frame is None:
+                    with self._encode_lock:
+                        frame = snapshot.encoded.get(encode)
+                        if frame is None:
+                            frame = snapshot.encoded[encode] = encode(snapshot.version, snapshot.body)
+                frames.append((snapshot.version, frame))
+        return frames
+
+    def snapshot(self):
+        """Return (version, JSON body) of the last published state"""
+        snapshot = self.current_snapshot
+        return snapshot.version, snapshot.body
+
+    def _capture_snapshot(self):
+        """Encode the current state once and publish a new history tuple ending with it; caller holds _stream_lock"""
+        history = self._stream_history
+        state_dict = self._state_dict()
+        version = state_dict["version"]
+        if history and history[-1].version >= version:
+            return history[-1]  # another publisher already encoded this version (or a newer one)
+        # Events logged since the previous snapshot; clients that skipped versions use GET /events
+        previous = history[-1].state["last_event_id"] if history else 0
+        events = self.event_log.since(previous)
+        state_dict["events"] = events
+        state_dict["last_event_id"] = events[-1]["id"] if events else previous
+        snapshot = Snapshot(version, state_dict, self.etag(version))
+        self._stream_history = (history + (snapshot,))[-config.STREAM_REPLAY_EVENTS:]
+        return snapshot
+
+    def handle_events(self, request):
+        """GET /events?after=<id>: game events newer than the client's cursor, oldest first"""
+        after = request.query.get('after', ['0'])[0] if request.query_string else '0'
+        try:
+            after = int(after)
+        except ValueError:
+            return self.response(400, 'Bad Request', json.dumps({"error": "Invalid after"}), {'Content-Type': 'application/json'})
+        events = self.event_log.since(after)
+        return self.response(200, 'OK', json.dumps({"events": events, "last_event_id": events[-1]["id"] if events else self.event_log.last_id}),
+                             {'Content-Type': 'application/json'}, request)
+
+    def _route_rooms(self, request):
+        """/rooms (list, create), /rooms/<name> (info, destroy) and /rooms/<name>/<route> scoped to a room"""
+        _, _, name, *rest = request.path.split('/', 3) + ['']
+        if request.method == 'OPTIONS':
+            return self.http_options(request)
+        if not name:
+            if self.rooms is None:
+                return self.response(404, 'Not Found', json.dumps({"error": "Rooms are not managed here"}), {'Content-Type': 'application/json'})
+            if request.method == 'GET':
+                return self.response(200, 'OK', json.dumps({"rooms": self.rooms.list()}), {'Content-Type': 'application/json'}, request)
+            if request.method == 'POST':
+                try:
+                    data = request.json() if request.body else {}
+                    room = self.rooms.create(data.get("room") if isinstance(data, dict) else None)
+                except json.JSONDecodeError:
+                    return self.response(400, 'Bad Request', json.dumps({"error": "Invalid JSON"}), {'Content-Type': 'application/json'})
+                except RoomError as e:
+                    return self._room_error(e)
+                return self.response(201, 'Created', json.dumps(room.room_info()), {'Content-Type': 'application/json'})
+            return self.response(405, 'Method Not Allowed', json.dumps({"error": "Method not allowed"}), {'Content-Type': 'application/json'})
+
+        room = self if name == self.room else (self.rooms.get(name) if self.rooms is not None else None)
+        if room is None:
+            return self.response(404, 'Not Found', json.dumps({"error": f"Room '{name}' not found"}), {'Content-Type': 'application/json'})
+        if rest[0]:
+            request.path = '/' + rest[0]
+            return room.dispatch(request)
+        if request.method == 'GET':
+            return self.response(200, 'OK', json.dumps(room.room_info()), {'Content-Type': 'application/json'})
+        if request.method == 'DELETE' and self.rooms is not None:
+            try:
+                self.rooms.destroy(name)
+            except RoomError as e:
+                return self._room_error(e)
+            return self.response(200, 'OK', json.dumps({"status": "destroyed", "room": name}), {'Content-Type': 'application/json'})
+        return self.response(405, 'Method Not Allowed', json.dumps({"error": "Method not allowed"}), {'Content-Type': 'application/json'})
+
+    def _dispatch_in_room(self, name, request):
+        room = self.rooms.get(name)
+        if room is None:
+            return self.response(404, 'Not Found', json.dumps({"error": f"Room '{name}' not found"}), {'Content-Type': 'application/json'})
+        return room.dispatch(request)
+
+    def _room_error(self, error):
+        return self.response(error.status, ROOM_ERROR_REASONS.get(error.status, 'Bad Request'), json.dumps({"error": str(error)}),
+                             {'Content-Type': 'application/json'})
+
+    def _new_room(self, name):
+        """RoomManager factory: a room of this process, ticked by this server's scheduler"""
+        room = type(self)(room=name, tick_scheduler=self.tick_scheduler)
+        # Front ends register their wake-up callbacks on this server only; publishes in any room must run them
+        room._state_listeners = self._state_listeners
+        room.worker_pool = self.worker_pool
+        return room
+
+    def room_info(self):
+        return {"room": self.room, "players": len(self.clients_info), "game_started": self.game_started,
+                "version": self.state_version, "tick_error": self.tick_error}
+
+    def close(self):
+        """Stop this room's match and end its push streams (RoomManager.destroy, shutdown)"""
+        self.shutdown_flag = True
+        self._stop_game_timer()
+        with self._state_changed:
+            self._state_changed.notify_all()
+
+    def handle_health(self, request):
+        """GET /health: simple health check endpoint"""
+        health = {"status": "ok", "players": len(self.clients_info), "tick": self.tick_scheduler.stats.stats()}
+        if self.rooms is not None:
+            health["rooms"] = len(self.rooms)
+        if self.worker_pool is not None:
+            health["pool"] = self.worker_pool.stats()
+        return self.response(200, 'OK', json.dumps(health), {'Content-Type': 'application/json'})
+
+    def handle_connect(self, request):
+        """POST /connect: register a new client connection"""
+        client_id = request.json().get("client_id")
+        if not client_id:
+            client_id = str(uuid.uuid4())
+            self.register_client(client_id)
+        
+        # The published snapshot, so a connect never waits on GameState._lock
+        snapshot = self.current_snapshot
+        response = {
+            "client_id": client_id,
+            "status": "connected",
+            "game_state": snapshot.state,
+            "clients_info": snapshot.state["clients_info"],
+            "game_started": self.game_started,
+            "version": snapshot.version,
+            "last_event_id": self.event_log.last_id
+        }
+        return self.response(200, 'OK', json.dumps(response), {'Content-Type': 'application/json'}, request)
+
+    def handle_action(self, request):
+        """POST /action: process a client action based on the game phase"""
+        if not self.apply_action(request.json()):
+            return self.response(400, 'Bad Request', json.dumps({"error": "Invalid client ID"}), 
+                                {'Content-Type': 'application/json'})
+        
+        # Return success response
+        return self.response(200, 'OK', json.dumps({"status": "success"}), {'Content-Type': 'application/json'})
+
+    def apply_action(self, data):
+        """Apply one action dict from any transport; returns False for an unknown client"""
+        action = data.get("action")
+        client_id = data.get("client_id")
+
+        if not client_id or client_id not in self.clients_info:
+            return False
+        
+        if action == "return_to_lobby":
+            self.return_to_lobby()
+        
+        elif not self.game_started:
+            if action == "set_username":
+                username = data.get("username", "Unknown")
+                self.clients_info[client_id]["username"] = username
+                self._lobby_changed()
+                logger.info(f"Client {client_id} set username to {username}")
+            
+            elif action == "toggle_ready":
+                self.clients_info[client_id]["ready"] = not self.clients_info[client_id].get("ready", False)
+                self._lobby_changed()
+                logger.info(f"Client {client_id} toggled ready. Status: {self.clients_info[client_id]['ready']}")
+            
+            elif action == "start_game":
+                if all(c["ready"] for c in self.clients_info.values()) and len(self.clients_info) > 1:
+                    self.restart_game()
+        
+        else:
+            if self.game_state.timer > 0:
+                if action in ("move", "change_ingredient"):
+                    with self.game_state._lock:
+                        self._apply_action_locked(client_id, data)
+                
+                elif action == "restart":
+                    self.restart_game()
+        return True
+
+    def handle_actions(self, request):
+        """POST /actions: apply a client's batch of sequenced actions in order"""
+        data = request.json()
+        actions = data.get("actions")
+        if not isinstance(actions, list) or not all(isinstance(a, dict) for a in actions):
+            return self.response(400, 'Bad Request', json.dumps({"error": "Expected a list of actions"}),
+                                {'Content-Type': 'application/json'})
+        last_seq = self.apply_actions(data.get("client_id"), actions)
+        if last_seq is False:
+            return self.response(400, 'Bad Request', json.dumps({"error": "Invalid client ID"}),
+                                {'Content-Type': 'application/json'})
+        return self.response(200, 'OK', json.dumps({"status": "success", "last_seq": last_seq}),
+                             {'Content-Type': 'application/json'})
+
+    def apply_actions(self, client_id, actions):
+        """Apply a batch of {"seq": n, "action": ...} dicts in seq order; returns the last applied seq
+
+        Actions whose seq is not above the client's last applied seq are duplicates of a
+        retried batch and are skipped; the rest are applied sorted by seq, however the batch
+        ordered them. Consecutive moves and ingredient changes are applied
+        under a single GameState._lock acquisition; lobby and phase actions (which stop the
+        timer or replace the GameState) go through apply_action between those runs.
+        Returns False for an unknown client.
+        """
+        if not client_id or client_id not in self.clients_info:
+            return False
+
+        applied_seq = self.last_seq.get(client_id, 0)
+        by_seq = {}
+        for action in actions:
+            seq = action.get("seq") if isinstance(action, dict) else None
+            if isinstance(seq, int) and seq > applied_seq:
+                by_seq.setdefault(seq, action)  # a seq repeated within the batch is applied once
+        pending = [by_seq[seq] for seq in sorted(by_seq)]
+
+        i = 0
+        while i < len(pending):
+            state = self.game_state
+            if not self._is_locked_action(pending[i]):
+                self.apply_action(dict(pending[i], client_id=client_id))
+                i += 1
+                continue
+            with state._lock:
+                while i < len(pending) and self._is_locked_action(pending[i]) and state is self.game_state:
+                    self._apply_action_locked(client_id, pending[i])
+                    i += 1
+
+        if pending:
+            applied_seq = pending[-1]["seq"]
+            self.last_seq[client_id] = applied_seq
+        return applied_seq
+
+    def _is_locked_action(self, data):
+        """In-game actions that only touch GameState and can share one lock acquisition"""
+        return self.game_started and self.game_state.timer > 0 and data.get("action") in ("move", "change_ingredient")
+
+    def _apply_action_locked(self, client_id, data):
+        """apply_action for moves and ingredient changes; the caller holds game_state._lock"""
+        action = data.get("action")
+        if action == "move":
+            direction = data.get("direction")
+            self.game_state.move_player_locked(client_id, direction)
+            logger.info(f"Client {client_id} moved {direction}")
+        elif action == "change_ingredient":
+            if self.game_state.can_player_change_ingredient_locked(client_id):
+                self._change_player_ingredient_locked(client_id)
+
+    def handle_disconnect(self, request):
+        """POST /disconnect: handle client disconnection"""
+        client_id = request.json().get("client_id")
+        if client_id in self.clients_info:
+            self.cleanup_disconnected_players([client_id])
+            logger.info(f"Client {client_id} disconnected")
+        
+        return self.response(200, 'OK', json.dumps({"status": "disconnected"}), {'Content-Type': 'application/json'})
+
+    def http_options(self, request):
         """Handle OPTIONS requests for CORS preflight"""
         return self.response(200, 'OK', '', {
             'Content-Type': 'text/plain',
             'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type'
+            'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS',
+            'Access-Control-Allow-Headers': f'Content-Type, If-None-Match, {config.ROOM_HEADER}'
         })
 
     def register_client(self, client_id):
         """Register a new client connection"""
-        self.clients_info[client_id] = {"username": f"Chef_{client_id[:5]}", "ready": False}
+        with self._clients_lock:
+            self.clients_info = {**self.clients_info, client_id: {"username": f"Chef_{client_id[:5]}", "ready": False}}
+        self._lobby_changed()
         logger.info(f"Client {client_id} connected. Total players: {len(self.clients_info)}")
     
     def cleanup_disconnected_players(self, player_ids):
         """Remove disconnected players from the game"""
+        with self._clients_lock:
+            self.clients_info = {cid: info for cid, info in self.clients_info.items() if cid not in player_ids}
         for player_id in player_ids:
             logger.info(f"Cleaning up disconnected client: {player_id}")
-            if player_id in self.clients_info:
-                del self.clients_info[player_id]
+            self.last_seq.pop(player_id, None)
             self.game_state.remove_player(player_id)
         
         if len(self.clients_info) == 0 and self.game_started:
             logger.info("All players disconnected. Returning to lobby.")
             self.return_to_lobby()
+        else:
+            self._lobby_changed()
     
     def return_to_lobby(self):
         """Return all players to the lobby"""
-        if self.timer_thread_instance and self.timer_thread_instance.is_alive():
-            logger.info("Stopping timer thread for lobby return")
-            self.timer_thread_active = False
-            self.timer_thread_instance.join(timeout=1.0)
+        self._stop_game_timer()
         
         self.game_started = False
-        for player_id in self.clients_info:
-            self.clients_info[player_id]["ready"] = False
+        for info in self.clients_info.values():
+            info["ready"] = False
         
-        self.game_state = GameState()
-        self.game_events = []
+        self.game_state = GameState(version=self.game_state.version + 1, events=self.event_log)
+        self.publish_state()
         logger.info("All players returned to lobby")
     
     def restart_game(self):
         """Restart the game with current players"""
-        if self.timer_thread_instance and self.timer_thread_instance.is_alive():
-            logger.info("Stopping old timer thread")
-            self.timer_thread_active = False
-            self.timer_thread_instance.join(timeout=1.0)
+        self._stop_game_timer()
 
-        self.game_state = GameState()
+        self.game_state = GameState(version=self.game_state.version + 1, events=self.event_log)
         self.game_started = True
-        self.game_events = []
+        self.tick_error = None
         logger.info("Restarting game")
 
         # Initialize game elements
@@ -309,10 +1016,8 @@ class HttpServer:
         self._assign_ingredients_to_players()
         
         # Start the game timer
-        self.timer_thread_active = True
-        self.timer_thread_instance = threading.Thread(target=self._game_timer_thread, daemon=True)
-        self.timer_thread_instance.start()
-        logger.info("Game timer thread started")
+        self.publish_state()
+        self._start_game_timer()
     
     def _assign_ingredients_to_players(self):
         """Assign ingredients to players at game start"""
@@ -349,171 +1054,188 @@ class HttpServer:
     
     def change_player_ingredient(self, player_id):
         """Change a player's ingredient at an Enter Station"""
+        with self.game_state._lock:
+            self._change_player_ingredient_locked(player_id)
+
+    def _change_player_ingredient_locked(self, player_id):
         all_possible_ingredients = [
             'Rice', 'Salmon', 'Tuna', 'Shrimp', 'Egg', 'Seaweed',
             'Cucumber', 'Avocado', 'Crab Meat', 'Eel', 'Cream Cheese', 'Fish Roe'
         ]
         
-        with self.game_state._lock:
-            player = self.game_state.players.get(player_id)
-            if player:
-                old_ing = player.ingredient
-                new_ing = random.choice([i for i in all_possible_ingredients if i != old_ing])
-                player.ingredient = new_ing
-                logger.info(f"Player {player_id} changed ingredient from {old_ing} to {new_ing}")
-                self._add_game_event("ingredient_change", {
-                    "player_id": player_id, 
-                    "old_ingredient": old_ing, 
-                    "new_ingredient": new_ing
-                })
-
-    def _add_game_event(self, event_type, data):
-        """Add a game event to the event queue"""
-        class GameEvent:
-            def __init__(self, event_type, data, timestamp=None):
-                self.event_type = event_type
-                self.data = data
-                self.timestamp = timestamp or time.time()
-                self.id = uuid.uuid4().hex[:8]
-        
-        event = GameEvent(event_type, data)
-        self.game_events.append(event)
-        
-        # Clean up old events
-        current_time = time.time()
-        self.game_events = [e for e in self.game_events if current_time - e.timestamp < 5.0]
-    
+        player = self.game_state.players.get(player_id)
+        if player:
+            old_ing = player.ingredient
+            new_ing = random.choice([i for i in all_possible_ingredients if i != old_ing])
+            player.ingredient = new_ing
+            self.game_state.mark_player_dirty_locked(player_id)
+            self.game_state.touch()
+            logger.info(f"Player {player_id} changed ingredient from {old_ing} to {new_ing}")
+            self.event_log.append("ingredient_change", {
+                "player_id": player_id, 
+                "old_ingredient": old_ing, 
+                "new_ingredient": new_ing
+            })
+
+    def add_state_listener(self, callback):
+        """Call callback(version) after every publish; front ends use it to resume parked long-polls"""
+        self._state_listeners.append(callback)
+
+    def publish_state(self):
+        """Encode the current state once, announce its version and wake every waiting long-poll"""
+        with self._stream_lock:
+            snapshot = self._capture_snapshot()
+            if snapshot.version > self.current_snapshot.version:
+                # Snapshot first: a reader that sees the new state_version must find its snapshot
+                self.current_snapshot = snapshot
+                self.state_version = snapshot.version
+        with self._state_changed:
+            self._state_changed.notify_all()
+        for callback in list(self._state_listeners):
+            callback(self.state_version)
+
+    def _publish_if_changed(self):
+        if self.game_state.version != self.state_version:
+            self.publish_state()
+
+    def _lobby_changed(self):
+        """clients_info lives outside GameState; bump the version and publish right away"""
+        self.game_state.touch()
+        self.publish_state()
+
     def _random_range(self, min_val, max_val):
         """Generate a random value in the given range"""
         return random.uniform(min_val, max_val)
     
-    def _game_timer_thread(self):
-        """Thread that manages the game timer, fusion detection, and game state updates"""
-        start_time = time.time()
-        end_time = start_time + config.GAME_TIMER_SECONDS
+    def _start_game_timer(self):
+        """Add this room's _game_tick to the (possibly shared) tick scheduler"""
+        self.game_end = time.monotonic() + config.GAME_TIMER_SECONDS
+        self.tick_scheduler.add(self._scheduled_tick)
+
+    def _stop_game_timer(self):
+        """Remove this room's tick; returns after a tick already running has finished"""
+        self.tick_scheduler.discard(self._scheduled_tick)
+
+    def _scheduled_tick(self, deadline):
+        """TickScheduler callback; deadline is the tick's time.monotonic() slot"""
+        if not self.game_started:
+            return False
+        try:
+            return self._game_tick(time.time(), self.game_end - deadline)
+        except Exception as e:
+            # Only this room's timer stops; the scheduler it shares keeps ticking the other rooms
+            logger.exception(f"Room '{self.room}': game tick failed, stopping its match timer")
+            self.tick_error = f"{type(e).__name__}: {e}"
+            self.tick_scheduler.stats.record_failure()
+            return False
+
+    def _game_tick(self, current_time, remaining):
+        """Run one game update; returns False once the game timer has expired
+
+        current_time is wall-clock time (GameState spawn times use it), remaining the
+        seconds left in the match on the scheduler's monotonic clock.
+        """
+        remaining = max(0, remaining)
+        if self.game_state.timer != int(remaining):
+            self.game_state.timer = int(remaining)
+            self.game_state.touch()
         
-        logger.info(f"Timer thread: Starting with timer_thread_active={self.timer_thread_active}")
+        # Check for recipe combinations and process fusion events
+        self.game_state.check_for_merge()
+        self.game_state.process_fusion_events()
         
-        while self.timer_thread_active and self.game_started:
-            current_time = time.time()
-            remaining = max(0, end_time - current_time)
-            self.game_state.timer = int(remaining)
-            
-            # Check for recipe combinations and process fusion events
-            self.game_state.check_for_merge()
-            self.game_state.process_fusion_events()
-            
-            # Handle doorprize station logic
-            if self.game_state.doorprize_station is None and \
-               current_time - self.game_state.doorprize_spawn_time >= self.game_state.next_doorprize_spawn_delay:
-                self.game_state.spawn_doorprize_station(current_time)
-            elif self.game_state.doorprize_station is not None:
-                self.game_state.check_doorprize_interaction()
-            
-            # Generate new orders as needed
-            if current_time - self.game_state.last_order_spawn_time >= self.game_state.next_order_spawn_delay:
-                if len(self.game_state.players) > 0:
-                    self.game_state.generate_orders(len(self.game_state.players))
-                    self.game_state.last_order_spawn_time = current_time
-                    self.game_state.next_order_spawn_delay = self._random_range(
-                        config.ORDER_SPAWN_INTERVAL_MIN, 
-                        config.ORDER_SPAWN_INTERVAL_MAX
-                    )
-                    logger.info(f"Next order will spawn in {self.game_state.next_order_spawn_delay:.2f} seconds")
-            
-            # Check if game timer has expired
-            if remaining <= 0:
-                logger.info("Game timer finished")
-                self.game_state.timer = 0
-                break
-            
-            time.sleep(0.01)
+        # Handle doorprize station logic
+        if self.game_state.doorprize_station is None and \
+           current_time - self.game_state.doorprize_spawn_time >= self.game_state.next_doorprize_spawn_delay:
+            self.game_state.spawn_doorprize_station(current_time)
+        elif self.game_state.doorprize_station is not None:
+            self.game_state.check_doorprize_interaction()
         
-        logger.info(f"Timer thread: Exiting loop. timer_thread_active={self.timer_thread_active}")
+        # Generate new orders as needed
+        if current_time - self.game_state.last_order_spawn_time >= self.game_state.next_order_spawn_delay:
+            if len(self.game_state.players) > 0:
+                self.game_state.generate_orders(len(self.game_state.players))
+                self.game_state.last_order_spawn_time = current_time
+                self.game_state.next_order_spawn_delay = self._random_range(
+                    config.ORDER_SPAWN_INTERVAL_MIN, 
+                    config.ORDER_SPAWN_INTERVAL_MAX
+                )
+                logger.info(f"Next order will spawn in {self.game_state.next_order_spawn_delay:.2f} seconds")
+        
+        # Check if game timer has expired
+        if remaining <= 0:
+            logger.info("Game timer finished")
+            self.game_state.timer = 0
+            self._publish_if_changed()
+            return False
+
+        # Wake every long-polling client together once per tick
+        self._publish_if_changed()
+        return True
 
 def ProcessTheClient(connection, address, server):
-    """Process client connection in a separate thread, supporting keep-alive"""
-    logger.info(f"Processing client {address} in thread.") # Logging baru
+    """Process client connection in a separate thread, supporting keep-alive and pipelining"""
+    logger.info(f"Processing client {address} in thread.")
+    reader = RequestReader(connection)
     try:
+        # Set timeout agar koneksi keep-alive tidak menggantung selamanya
+        connection.settimeout(config.KEEP_ALIVE_TIMEOUT)
         keep_alive_counter = 0
-        while True: # Loop untuk menangani multiple requests pada koneksi yang sama
-            # Set timeout untuk setiap read agar koneksi tidak menggantung selamanya
-            connection.settimeout(config.KEEP_ALIVE_TIMEOUT) # Perlu konfigurasi baru
-            
-            rcv = b"" # Gunakan bytes untuk menerima data
+        while keep_alive_counter < config.KEEP_ALIVE_MAX_REQUESTS:
             try:
-                # Baca header terlebih dahulu untuk menentukan panjang body
-                # Ini adalah cara sederhana untuk mengurai HTTP request
-                # Untuk robustness, Anda mungkin ingin menggunakan parser HTTP yang lebih canggih
-                
-                # Baca baris pertama (request line) dan header
-                header_data = b""
-                while True:
-                    chunk = connection.recv(1) # Baca byte per byte sampai CRLF ganda
-                    if not chunk: raise ConnectionAbortedError("Client disconnected")
-                    header_data += chunk
-                    if b"\r\n\r\n" in header_data:
-                        break
-                
-                # Cek apakah ada Content-Length di header
-                headers_str = header_data.decode('utf-8', errors='ignore')
-                headers_dict = {}
-                for line in headers_str.split('\r\n')[1:]:
-                    if ': ' in line:
-                        k, v = line.split(': ', 1)
-                        headers_dict[k.lower()] = v
-                
-                content_length = int(headers_dict.get('content-length', 0))
-                
-                # Baca body jika ada
-                body_data = b""
-                if content_length > 0:
-                    remaining_body_len = content_length - (len(header_data) - headers_str.find('\r\n\r\n') - 4) # Hitung berapa body yang sudah terbaca bersama header
-                    if remaining_body_len > 0:
-                         body_data = connection.recv(remaining_body_len)
-                         if len(body_data) < remaining_body_len:
-                             # Ini bisa terjadi jika klien memutus koneksi di tengah body
-                             logger.warning(f"Incomplete body received from {address}")
-                             raise ConnectionAbortedError("Incomplete body")
-
-                full_request_data = header_data + body_data
-                
+                requests = [reader.read_request()]
             except socket.timeout:
                 logger.info(f"Client {address} timed out (keep-alive). Closing connection.")
-                break # Keluar dari loop, tutup koneksi
+                break
             except (ConnectionResetError, ConnectionAbortedError):
                 logger.info(f"Client {address} disconnected gracefully or abruptly.")
                 break
-            
-            # Proses request
-            hasil = server.proses(full_request_data.decode('utf-8', errors='ignore'))
-            
-            # Kirim respons
-            connection.sendall(hasil)
-            
-            keep_alive_counter += 1
-            if keep_alive_counter >= config.KEEP_ALIVE_MAX_REQUESTS: # Perlu konfigurasi baru
-                logger.info(f"Client {address} reached max keep-alive requests. Closing connection.")
-                break # Keluar dari loop, tutup koneksi
+
+            # Pipelined requests that already arrived in the same chunk are answered in one write
+            while len(requests) < config.KEEP_ALIVE_MAX_REQUESTS - keep_alive_counter:
+                pipelined = reader.next_request()
+                if pipelined is None:
+                    break
+                requests.append(pipelined)
+
+            hasil = []
+            for r in requests:
+                result = server.proses(r.decode('utf-8', errors='ignore'))
+                if isinstance(result, PushStream):
+                    send_response(connection, hasil)
+                    result.serve(connection, reader.detach())  # the stream owns this connection until the client leaves
+                    return
+                if isinstance(result, LongPoll):
+                    result = result.wait()  # this thread belongs to the connection, just block
+                hasil.extend(result)
+            send_response(connection, hasil)
+            keep_alive_counter += len(requests)
+
+        if keep_alive_counter >= config.KEEP_ALIVE_MAX_REQUESTS:
+            logger.info(f"Client {address} reached max keep-alive requests. Closing connection.")
 
     except Exception as e:
         logger.error(f"Error processing client {address}: {e}")
     finally:
-        logger.info(f"Closing connection for client {address}.") # Logging baru
+        logger.info(f"Closing connection for client {address}.")
         connection.close()
 
-def run_server(host='0.0.0.0', port=8000):
+def run_server(host='0.0.0.0', port=8000, push_port=None):
     """Run the HTTP game server using raw sockets"""
     # Create server socket
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     server_socket.bind((host, port))
-    server_socket.listen(5)
+    server_socket.listen(config.LISTEN_BACKLOG)
     
     logger.info(f"Starting HTTP game server on {host}:{port}")
     
     # Create server instance
     server = HttpServer()
+    if push_port:
+        # Imported late: tcp_push builds on this module
+        from src.server.tcp_push import start_push_server
+        start_push_server(server, host, push_port)
     
     # Thread pool for client connections
     client_threads = []
@@ -522,6 +1244,7 @@ def run_server(host='0.0.0.0', port=8000):
         while True:
             # Accept client connection
             client_socket, client_address = server_socket.accept()
+            set_nodelay(client_socket)
             logger.info(f"Connection from {client_address}")
             
             # Create thread to handle client
@@ -0,0 +1,270 @@
+"""
+Multi-process front end for We are Cooked game server
+A front listener reads the first request of every connection, picks the room
+from the X-Room header (or ?room= query), and passes the socket together with
+the bytes already read to the worker process that owns that room. Each worker
+runs its own event loop and a RoomManager with one HttpServer (GameState) per
+room, all ticked by the worker's single TickScheduler, so concurrent matches
+spread across cores.
+
+Unlike the single-process modes, a worker creates a room the first time a
+connection for it is handed over (up to MAX_ROOMS per worker) and keeps it until
+the worker exits. This is deliberate: a room's owner is picked from its name alone,
+and no process holds a registry of all rooms to serve the /rooms create, list and
+destroy routes against, so those routes answer 404 here. Passing sockets between
+processes needs socket.send_fds (Python 3.9+, Unix).
+"""
+
+import os
+import json
+import socket
+import selectors
+import struct
+import time
+import zlib
+import logging
+import multiprocessing
+from urllib.parse import parse_qs
+
+from src.shared import config
+from src.server.http import HttpServer
+from src.server.event_loop import EventLoopServer
+from src.server.rooms import RoomError, RoomManager
+from src.server.tick_scheduler import TickScheduler
+
+logger = logging.getLogger('GameServer')
+
+HANDOFF_HEADER = struct.Struct('>II')  # room id length, initial data length
+
+
+def room_from_request(header_block):
+    """Return the room named by a /rooms/<name>/ path, the X-Room header or the ?room= query of a raw request"""
+    lines = header_block.decode('utf-8', errors='ignore').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) > 1 and parts[1].startswith('/rooms/'):
+        room = parts[1].split('?', 1)[0].split('/')[2]
+        if room:
+            return room
+    header_name = config.ROOM_HEADER.lower() + ':'
+    for line in lines[1:]:
+        if line.lower().startswith(header_name):
+            room = line.split(':', 1)[1].strip()
+            if room:
+                return room
+    if len(parts) > 1 and '?' in parts[1]:
+        room = parse_qs(parts[1].split('?', 1)[1]).get('room', [None])[0]
+        if room:
+            return room
+    return config.DEFAULT_ROOM
+
+
+def worker_index_for_room(room, workers):
+    """Stable room -> worker mapping shared by every connection of a room"""
+    return zlib.crc32(room.encode('utf-8')) % workers
+
+
+def _recv_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionAbortedError("Front listener closed the channel")
+        data += chunk
+    return bytes(data)
+
+
+class RoomWorker:
+    """Worker process side: adopts handed-off sockets and serves them per room
+
+    Rooms are created on the first connection naming them (see the module docstring).
+    """
+
+    def __init__(self, index, channel):
+        self.index = index
+        self.channel = channel
+        self.tick_scheduler = TickScheduler()
+        self.rooms = RoomManager(self._new_room)
+        self.loop = EventLoopServer(None)
+
+    def _new_room(self, room):
+        logger.info(f"Worker {self.index} (pid {os.getpid()}) now hosts room '{room}'")
+        return HttpServer(room=room, tick_scheduler=self.tick_scheduler)
+
+    def serve_forever(self):
+        # The channel stays blocking; the front writes each handoff message in one go
+        self.loop.add_reader(self.channel, self._on_handoff)
+        self.loop.serve_forever()
+
+    def _on_handoff(self):
+        try:
+            header, fds, _, _ = socket.recv_fds(self.channel, HANDOFF_HEADER.size, 1)
+            if not header:
+                logger.info(f"Worker {self.index}: front listener went away, exiting")
+                self.loop.stop()
+                return
+            header += _recv_exact(self.channel, HANDOFF_HEADER.size - len(header))
+            room_len, data_len = HANDOFF_HEADER.unpack(header)
+            room = _recv_exact(self.channel, room_len).decode('utf-8')
+            initial_data = _recv_exact(self.channel, data_len)
+        except (ConnectionAbortedError, OSError) as e:
+            logger.error(f"Worker {self.index}: handoff failed: {e}")
+            self.loop.stop()
+            return
+
+        if not fds:
+            return
+        client_socket = socket.socket(fileno=fds[0])
+        try:
+            address = client_socket.getpeername()
+        except OSError:
+            address = None
+        try:
+            server = self.rooms.join(room)  # first use creates the room; there is no POST /rooms here
+        except RoomError as e:
+            # No room to hand the connection to: answer its first request and hang up
+            body = json.dumps({"error": str(e)}).encode()
+            try:
+                client_socket.sendall(b"HTTP/1.1 %d Room Unavailable\r\nContent-Type: application/json\r\n"
+                                      b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (e.status, len(body), body))
+            except OSError:
+                pass
+            client_socket.close()
+            return
+        self.loop.add_connection(client_socket, address, initial_data, server)
+
+
+def _worker_main(index, channel):
+    worker = RoomWorker(index, channel)
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.loop.close()
+
+
+class FrontListener:
+    """Accepts connections, reads the first request header and routes the socket by room"""
+
+    def __init__(self, listen_socket, channels):
+        self.listen_socket = listen_socket
+        self.channels = channels
+        self.selector = selectors.DefaultSelector()
+        self.pending = {}
+        listen_socket.setblocking(False)
+        self.selector.register(listen_socket, selectors.EVENT_READ, None)
+
+    def serve_forever(self):
+        last_sweep = time.monotonic()
+        while True:
+            for key, _ in self.selector.select(timeout=1.0):
+                if key.data is None:
+                    self._accept()
+                else:
+                    self._on_readable(key.fileobj)
+            now = time.monotonic()
+            if now - last_sweep >= 1.0:
+                self._close_stalled(now)
+                last_sweep = now
+
+    def close(self):
+        for sock in list(self.pending):
+            self._drop(sock)
+        self.selector.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client_socket, client_address = self.listen_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            client_socket.setblocking(False)
+            self.pending[client_socket] = [bytearray(), time.monotonic()]
+            self.selector.register(client_socket, selectors.EVENT_READ, client_address)
+
+    def _on_readable(self, sock):
+        state = self.pending[sock]
+        try:
+            data = sock.recv(config.RECV_CHUNK_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(sock)
+            return
+        state[0] += data
+        end = state[0].find(b"\r\n\r\n")
+        if end == -1:
+            if len(state[0]) > config.MAX_HEADER_SIZE:
+                self._drop(sock)
+            return
+        self._hand_off(sock, room_from_request(bytes(state[0][:end])), bytes(state[0]))
+
+    def _hand_off(self, sock, room, initial_data):
+        self.selector.unregister(sock)
+        del self.pending[sock]
+        channel = self.channels[worker_index_for_room(room, len(self.channels))]
+        room_bytes = room.encode('utf-8')
+        try:
+            socket.send_fds(channel, [HANDOFF_HEADER.pack(len(room_bytes), len(initial_data))], [sock.fileno()])
+            channel.sendall(room_bytes + initial_data)
+        except OSError as e:
+            logger.error(f"Failed to hand off connection for room '{room}': {e}")
+        finally:
+            sock.close()  # the worker holds its own duplicate of the descriptor now
+
+    def _close_stalled(self, now):
+        for sock, (_, accepted_at) in list(self.pending.items()):
+            if now - accepted_at >= config.KEEP_ALIVE_TIMEOUT:
+                self._drop(sock)
+
+    def _drop(self, sock):
+        self.selector.unregister(sock)
+        del self.pending[sock]
+        sock.close()
+
+
+def run_multiprocess_server(host='0.0.0.0', port=8000, processes=None, push_port=None):
+    """Run the HTTP game server with rooms distributed across worker processes"""
+    if not hasattr(socket, "send_fds"):
+        raise RuntimeError("Multiprocess mode passes sockets to its workers with socket.send_fds, "
+                           "which needs Python 3.9+ on Linux or macOS; use another --mode")
+    processes = processes or config.WORKER_PROCESSES or os.cpu_count() or 1
+    if push_port:
+        # A push connection names no room before it is accepted, so there is no worker to route it to
+        logger.warning("The TCP push transport is not available in multiprocess mode; ignoring the push port")
+
+    # spawn (not fork) so a worker inherits only its own channel end and sees EOF when the front exits
+    context = multiprocessing.get_context("spawn")
+    channels = []
+    workers = []
+    for index in range(processes):
+        front_end, worker_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        proc = context.Process(target=_worker_main, args=(index, worker_end), daemon=True)
+        proc.start()
+        worker_end.close()
+        channels.append(front_end)
+        workers.append(proc)
+
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(config.LISTEN_BACKLOG)
+
+    logger.info(f"Starting HTTP game server (multi-process, {processes} room workers) on {host}:{port}")
+
+    front = FrontListener(server_socket, channels)
+    try:
+        front.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server shutting down")
+    finally:
+        front.close()
+        server_socket.close()
+        for channel in channels:
+            channel.close()
+        for proc in workers:
+            proc.join(timeout=1.0)
+            if proc.is_alive():
+                proc.terminate()
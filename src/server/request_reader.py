@@ -0,0 +1,94 @@
+"""
+Buffered HTTP request reader for We are Cooked game server
+Pulls large chunks from the socket and splits them into complete requests,
+carrying leftover bytes over to the next request (HTTP pipelining)
+"""
+
+from src.shared import config
+
+
+class RequestReader:
+    """Per-connection buffer that yields one complete HTTP request at a time"""
+
+    def __init__(self, connection=None, chunk_size=None):
+        self.connection = connection
+        self.chunk_size = chunk_size or config.RECV_CHUNK_SIZE
+        self.buffer = bytearray()
+        self.recv_calls = 0
+        self._scan_pos = 0  # where the next search for the header terminator starts
+        self._pending_length = None  # total length of a request whose body is still incomplete
+
+    def feed(self, data):
+        """Append bytes received from the network to the buffer"""
+        self.buffer += data
+
+    def has_buffered_data(self):
+        return len(self.buffer) > 0
+
+    def detach(self):
+        """Hand over the unparsed bytes once the connection stops speaking HTTP (protocol upgrade)"""
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        self._scan_pos = 0
+        self._pending_length = None
+        return data
+
+    def next_request(self):
+        """Return the next complete request from the buffer, or None if more data is needed"""
+        if self._pending_length is None:
+            end = self.buffer.find(b"\r\n\r\n", self._scan_pos)
+            if end == -1:
+                if len(self.buffer) > config.MAX_HEADER_SIZE:
+                    raise ConnectionAbortedError("Request header too large")
+                # The terminator may straddle the chunk boundary, so rescan the last 3 bytes
+                self._scan_pos = max(0, len(self.buffer) - 3)
+                return None
+            header_end = end + 4
+            self._pending_length = header_end + self._content_length(header_end)
+
+        if len(self.buffer) < self._pending_length:
+            return None
+
+        request = bytes(self.buffer[:self._pending_length])
+        del self.buffer[:self._pending_length]
+        self._pending_length = None
+        self._scan_pos = 0
+        return request
+
+    def read_request(self):
+        """Block until a complete request is available on the connection"""
+        request = self.next_request()
+        while request is None:
+            chunk = self.connection.recv(self.chunk_size)
+            self.recv_calls += 1
+            if not chunk:
+                if self.buffer:
+                    raise ConnectionAbortedError("Incomplete request")
+                raise ConnectionAbortedError("Client disconnected")
+            self.feed(chunk)
+            request = self.next_request()
+        return request
+
+    def _content_length(self, header_end):
+        """Extract Content-Length from the buffered header block"""
+        return parse_content_length(bytes(self.buffer[:header_end]))
+
+
+def parse_content_length(header_block):
+    """Return the Content-Length declared in a raw header block (0 when absent)
+
+    A length above MAX_BODY_SIZE aborts the connection before any of the body is buffered.
+    """
+    header_block = header_block.lower()
+    start = header_block.find(b"\r\ncontent-length:")
+    if start == -1:
+        return 0
+    start += len(b"\r\ncontent-length:")
+    stop = header_block.find(b"\r\n", start)
+    try:
+        length = max(0, int(header_block[start:stop]))
+    except ValueError:
+        raise ConnectionAbortedError("Invalid Content-Length")
+    if length > config.MAX_BODY_SIZE:
+        raise ConnectionAbortedError("Request body too large")
+    return length
@@ -0,0 +1,96 @@
+"""
+Game rooms for We are Cooked game server
+A room is one HttpServer (GameState, clients, snapshots, event log) under a name.
+RoomManager creates, looks up, lists and destroys the rooms of one process; every
+room it creates shares one TickScheduler, so all running matches of the process
+are ticked by a single timer.
+"""
+
+import re
+import threading
+import uuid
+import logging
+
+from src.shared import config
+
+logger = logging.getLogger('GameServer')
+
+ROOM_NAME = re.compile(r'^[A-Za-z0-9_-]{1,32}$')  # room names travel in URL paths and headers
+
+
+class RoomError(Exception):
+    """A room operation that cannot be done; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class RoomManager:
+    """Named rooms of one process
+
+    factory(name) builds the HttpServer of a new room (sharing the manager's tick
+    scheduler is up to the factory). `default`, if given, is a room that always
+    exists and cannot be destroyed.
+    """
+
+    def __init__(self, factory, default=None, max_rooms=None):
+        self.factory = factory
+        self.max_rooms = max_rooms or config.MAX_ROOMS
+        self.default = default
+        self._rooms = {}
+        self._lock = threading.Lock()
+        if default is not None:
+            self._rooms[default.room] = default
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def get(self, name):
+        return self._rooms.get(name)
+
+    def create(self, name=None):
+        """Create a room (a generated name if none is given); RoomError if it exists or the process is full"""
+        name = name or uuid.uuid4().hex[:8]
+        with self._lock:
+            if name in self._rooms:
+                raise RoomError(f"Room '{name}' already exists", 409)
+            return self._create_locked(name)
+
+    def join(self, name):
+        """Room named `name`, created on first use (multiprocess workers, which have no /rooms routes)"""
+        room = self._rooms.get(name)
+        if room is not None:
+            return room
+        with self._lock:
+            room = self._rooms.get(name)
+            return room if room is not None else self._create_locked(name)
+
+    def _create_locked(self, name):
+        if not ROOM_NAME.match(name):
+            raise RoomError("Room names are 1-32 letters, digits, '-' or '_'")
+        if len(self._rooms) >= self.max_rooms:
+            raise RoomError("Room limit reached", 503)
+        room = self.factory(name)
+        self._rooms[name] = room
+        logger.info(f"Room '{name}' created ({len(self._rooms)} rooms)")
+        return room
+
+    def destroy(self, name):
+        """Stop the room's match and forget it; its clients get 404 on room-scoped routes afterwards"""
+        with self._lock:
+            room = self._rooms.get(name)
+            if room is None:
+                raise RoomError(f"Room '{name}' not found", 404)
+            if room is self.default:
+                raise RoomError(f"Room '{name}' is the default room and cannot be destroyed", 409)
+            del self._rooms[name]
+        room.close()
+        logger.info(f"Room '{name}' destroyed ({len(self._rooms)} rooms)")
+
+    def list(self):
+        return [room.room_info() for room in list(self._rooms.values())]
+
+    def close(self):
+        for room in list(self._rooms.values()):
+            room.close()
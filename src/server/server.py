@@ -4,11 +4,42 @@ Using a barebones socket-based HTTP implementation
 """
 
 import sys
+import argparse
 import logging
 from src.shared import config
 from src.server.http import run_server
+from src.server.event_loop import run_event_loop_server
+from src.server.async_server import run_async_server
+from src.server.worker_pool import run_pool_server
+from src.server.multiprocess import run_multiprocess_server
+
+SERVER_MODES = {
+    "threaded": run_server,
+    "selectors": run_event_loop_server,
+    "asyncio": run_async_server,
+    "pool": run_pool_server,
+    "multiprocess": run_multiprocess_server,
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="We are Cooked HTTP Game Server")
+    parser.add_argument("--mode", choices=sorted(SERVER_MODES), default=config.SERVER_MODE,
+                        help="connection handling front end")
+    parser.add_argument("--host", default=config.SERVER_IP)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.POOL_WORKERS,
+                        help="worker threads (pool mode)")
+    parser.add_argument("--queue-depth", type=int, default=config.POOL_QUEUE_DEPTH,
+                        help="pending connections before answering 503 (pool mode)")
+    parser.add_argument("--processes", type=int, default=config.WORKER_PROCESSES,
+                        help="room worker processes, 0 = one per CPU core (multiprocess mode)")
+    parser.add_argument("--push-port", type=int, default=config.TCP_PUSH_PORT,
+                        help="port of the length-prefixed TCP push transport, 0 = disabled")
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
+
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -19,11 +50,17 @@ if __name__ == "__main__":
     
     # Print startup message
     logger.info("Starting We are Cooked HTTP Game Server")
-    logger.info(f"Server will listen on {config.SERVER_IP}:{config.SERVER_PORT}")
+    logger.info(f"Server will listen on {args.host}:{args.port} ({args.mode} mode)")
     
     try:
         # Run the HTTP server
-        run_server(host=config.SERVER_IP, port=config.SERVER_PORT)
+        if args.mode == "pool":
+            run_pool_server(host=args.host, port=args.port, workers=args.workers, queue_depth=args.queue_depth,
+                            push_port=args.push_port)
+        elif args.mode == "multiprocess":
+            run_multiprocess_server(host=args.host, port=args.port, processes=args.processes, push_port=args.push_port)
+        else:
+            SERVER_MODES[args.mode](host=args.host, port=args.port, push_port=args.push_port)
     except KeyboardInterrupt:
         logger.info("Server shutting down due to keyboard interrupt")
         sys.exit(0)
@@ -0,0 +1,98 @@
+"""
+Length-prefixed TCP push transport for We are Cooked game server
+Speaks the framing of src/client/network_handler.py: every message is a 4-byte
+big-endian length followed by UTF-8 JSON. A connection is registered as a player
+on accept, receives its initial state right away and then one snapshot per state
+change, and sends its actions back in the same framing. It runs next to the HTTP
+front end on TCP_PUSH_PORT and shares its HttpServer (same GameState).
+"""
+
+import json
+import socket
+import struct
+import threading
+import uuid
+import logging
+
+from src.shared import config
+from src.server.http import PushStream
+from src.server.event_loop import EventLoopServer
+
+logger = logging.getLogger('GameServer')
+
+FRAME_HEADER = struct.Struct('>I')  # matches NetworkHandler.HEADER_SIZE
+
+
+def encode_message(body):
+    """Prefix a JSON body with its 4-byte big-endian length"""
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+class FramedSession(PushStream):
+    """One NetworkHandler client; the connection itself is the player's session"""
+
+    def __init__(self, server):
+        self.client_id = str(uuid.uuid4())
+        server.register_client(self.client_id)
+        version, body = server.snapshot()
+        super().__init__(server, version, self.encode_state)
+        self.buffer = bytearray()
+        self._cleaned_up = False
+        # The initial state is the shared snapshot with this client's id spliced in front
+        self.header = encode_message(b'{"client_id": "%s", %s' % (self.client_id.encode(), body[1:]))
+        logger.info(f"Push client {self.client_id} connected")
+
+    @staticmethod
+    def encode_state(version, body):
+        return encode_message(body)
+
+    def receive(self, data):
+        self.buffer += data
+        while len(self.buffer) >= FRAME_HEADER.size:
+            length = FRAME_HEADER.unpack_from(self.buffer)[0]
+            if length > config.TCP_PUSH_MAX_MESSAGE_SIZE:
+                logger.info(f"Push client {self.client_id} sent an oversized message, closing")
+                self.closed = True
+                break
+            end = FRAME_HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            payload = bytes(self.buffer[FRAME_HEADER.size:end])
+            del self.buffer[:end]
+            try:
+                action = json.loads(payload)
+            except ValueError:
+                logger.info(f"Push client {self.client_id} sent invalid JSON")
+                continue
+            if action.get("action") == "disconnect":
+                self.closed = True
+                break
+            if isinstance(action.get("actions"), list):
+                self.server.apply_actions(self.client_id, action["actions"])
+                continue
+            action["client_id"] = self.client_id
+            self.server.apply_action(action)
+        return []
+
+    def on_close(self):
+        if not self._cleaned_up:
+            self._cleaned_up = True
+            self.server.cleanup_disconnected_players([self.client_id])
+            logger.info(f"Push client {self.client_id} disconnected")
+
+
+def push_listen_socket(host, port):
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(config.LISTEN_BACKLOG)
+    return server_socket
+
+
+def start_push_server(server, host, port):
+    """Serve the push transport for `server` from its own event-loop thread; returns the loop"""
+    loop = EventLoopServer(server)
+    loop.add_push_listener(push_listen_socket(host, port), FramedSession)
+    threading.Thread(target=loop.serve_forever, name="tcp-push", daemon=True).start()
+    logger.info(f"TCP push transport listening on {host}:{port}")
+    return loop
@@ -0,0 +1,177 @@
+"""
+Fixed-timestep tick scheduler for We are Cooked game server
+Runs tick callbacks on time.monotonic deadlines spaced 1 / TICK_RATE apart, so
+the rate does not drift with how long each tick takes and the scheduler sleeps
+until the next tick is due instead of polling. When a tick overruns, the ticks
+missed meanwhile run back to back (at most TICK_MAX_CATCH_UP of them) and the
+rest are skipped. A tick that raises is logged and removed; the others keep
+running. Tick duration, start jitter, overruns and failures are kept for /health.
+"""
+
+import asyncio
+import threading
+import time
+import logging
+
+from src.shared import config
+
+logger = logging.getLogger('GameServer')
+
+
+class TickStats:
+    """Counters for the ticks a TickScheduler has run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.overruns = 0  # ticks that finished after the next tick was already due
+        self.skipped = 0  # due ticks dropped instead of caught up
+        self.failures = 0  # tick callbacks that raised and were removed
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.total_jitter = 0.0  # how late each tick started against its deadline
+        self.max_jitter = 0.0
+
+    def record(self, duration, jitter, overrun, skipped):
+        with self._lock:
+            self.ticks += 1
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+            self.total_jitter += jitter
+            self.max_jitter = max(self.max_jitter, jitter)
+            self.overruns += overrun
+            self.skipped += skipped
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ticks": self.ticks,
+                "overruns": self.overruns,
+                "skipped": self.skipped,
+                "failures": self.failures,
+                "avg_duration_ms": round(self.total_duration / self.ticks * 1000, 3) if self.ticks else 0.0,
+                "max_duration_ms": round(self.max_duration * 1000, 3),
+                "avg_jitter_ms": round(self.total_jitter / self.ticks * 1000, 3) if self.ticks else 0.0,
+                "max_jitter_ms": round(self.max_jitter * 1000, 3),
+            }
+
+
+class TickScheduler:
+    """Calls every added tick(deadline) once per interval until it returns False, raises or is discarded
+
+    deadline is the tick's scheduled time.monotonic() value, so consecutive ticks see
+    exactly one interval between them even when one of them started late. One scheduler
+    can drive many ticks (one per room): they run back to back in each slot and the
+    overrun accounting covers the whole slot. The loop is started by the first add()
+    and ends once no tick is left; by default it runs on a thread, event-loop front
+    ends pass a spawn that runs run_async() as a task instead.
+    """
+
+    def __init__(self, rate=None, max_catch_up=None, spawn=None):
+        self.rate = rate or config.TICK_RATE
+        self.interval = 1.0 / self.rate
+        self.max_catch_up = config.TICK_MAX_CATCH_UP if max_catch_up is None else max_catch_up
+        self.stats = TickStats()
+        self.running = False
+        self._loop = 0  # bumped for every loop spawned, so a loop that ended only resets its own state
+        self.next_deadline = 0.0
+        self._spawn = spawn or self._spawn_thread
+        # Held while ticks run, so discard() returns only after the tick it removes has finished
+        self._lock = threading.RLock()
+        self._ticks = {}  # insertion-ordered set of callbacks
+
+    def __len__(self):
+        return len(self._ticks)
+
+    def add(self, tick):
+        with self._lock:
+            self._ticks[tick] = None
+            if not self.running:
+                self.running = True
+                self._loop += 1
+                self.next_deadline = time.monotonic()
+                self._spawn()
+                logger.info(f"Tick scheduler started at {self.rate} ticks/s")
+
+    def discard(self, tick):
+        with self._lock:
+            self._ticks.pop(tick, None)
+
+    def _spawn_thread(self):
+        threading.Thread(target=self.run, name="tick-scheduler", daemon=True).start()
+
+    def run(self):
+        """Blocking loop; returns once the last tick is gone"""
+        loop = self._loop
+        try:
+            while True:
+                delay = self.advance(time.monotonic())
+                if delay is None:
+                    break
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
+            self._loop_ended(loop)
+        logger.info("Tick scheduler idle")
+
+    async def run_async(self):
+        """Coroutine counterpart of run()"""
+        loop = self._loop
+        try:
+            while True:
+                delay = self.advance(time.monotonic())
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            self._loop_ended(loop)
+        logger.info("Tick scheduler task idle")
+
+    def _loop_ended(self, loop):
+        """However a loop ended (idle, error, task cancelled), the next add() must be able to spawn one"""
+        with self._lock:
+            if self._loop == loop:  # not already replaced by a loop a later add() spawned
+                self.running = False
+
+    def _tick_all(self, deadline):
+        with self._lock:
+            for tick in list(self._ticks):
+                try:
+                    keep = tick(deadline)
+                except Exception:
+                    # One failing tick (one room's match) must not stop the clock of the others
+                    logger.exception(f"Tick {tick!r} raised; removed from the scheduler")
+                    self.stats.record_failure()
+                    keep = False
+                if not keep:
+                    self._ticks.pop(tick, None)
+            if not self._ticks:
+                self.running = False  # the next add() spawns a fresh loop
+            return self.running
+
+    def advance(self, now):
+        """Run the ticks if they are due; returns seconds until the next deadline, or None once none is left"""
+        if now < self.next_deadline:
+            return self.next_deadline - now
+        deadline = self.next_deadline
+        keep_running = self._tick_all(deadline)
+        finished = time.monotonic()
+        if not keep_running:
+            # next_deadline may already belong to a loop spawned by a later add()
+            self.stats.record(finished - now, now - deadline, False, 0)
+            return None
+
+        self.next_deadline = deadline + self.interval
+        behind = finished - self.next_deadline
+        skipped = 0
+        if behind >= 0:
+            # Deadlines already passed: run up to max_catch_up of them right away, skip the rest
+            missed = int(behind / self.interval) + 1
+            skipped = max(0, missed - self.max_catch_up)
+            self.next_deadline += skipped * self.interval
+        self.stats.record(finished - now, now - deadline, behind >= 0, skipped)
+        return max(0.0, self.next_deadline - finished)
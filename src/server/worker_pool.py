@@ -0,0 +1,442 @@
+"""
+Bounded worker pool front end for We are Cooked game server
+A selector thread watches idle keep-alive connections and hands readable ones
+to a fixed set of worker threads through a bounded queue. When the queue is
+full the connection is answered with a fast 503 + Retry-After, written without
+blocking the selector thread, and closed once the client has read it.
+"""
+
+import json
+import queue
+import socket
+import selectors
+import threading
+import time
+import logging
+
+from src.shared import config
+from src.server.http import HttpServer, LongPoll, PushStream, consume_buffers, send_buffers, send_response, set_nodelay
+from src.server.request_reader import RequestReader
+from src.server.tcp_push import start_push_server
+
+logger = logging.getLogger('GameServer')
+
+SHED_LINGER = 1.0  # seconds a rejected client gets to read its 503 before the connection is dropped
+
+
+class WorkerPool:
+    """Fixed number of worker threads fed from a bounded queue"""
+
+    def __init__(self, handler, workers=None, queue_depth=None):
+        self.handler = handler
+        self.workers = workers or config.POOL_WORKERS
+        self.queue = queue.Queue(maxsize=queue_depth or config.POOL_QUEUE_DEPTH)
+        self._threads = []
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.busy = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"pool-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, job):
+        """Queue a job; returns False instead of blocking when the queue is full"""
+        try:
+            self.queue.put_nowait((time.monotonic(), job))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            return False
+        with self._stats_lock:
+            self.submitted += 1
+        return True
+
+    def shutdown(self):
+        for _ in self._threads:
+            self.queue.put((time.monotonic(), None))
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "busy": self.busy,
+                "queued": self.queue.qsize(),
+                "queue_depth": self.queue.maxsize,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "avg_queue_wait_ms": round(self.total_wait / self.completed * 1000, 3) if self.completed else 0.0,
+                "max_queue_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+    def _worker(self):
+        while True:
+            enqueued_at, job = self.queue.get()
+            if job is None:
+                return
+            wait = time.monotonic() - enqueued_at
+            with self._stats_lock:
+                self.busy += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            try:
+                self.handler(job)
+            except Exception as e:
+                logger.error(f"Worker pool job failed: {e}")
+            finally:
+                with self._stats_lock:
+                    self.busy -= 1
+                    self.completed += 1
+
+
+class _Connection:
+    """Keep-alive connection parked in the selector between requests"""
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.reader = RequestReader(sock)
+        self.requests_served = 0
+        self.last_activity = time.monotonic()
+        self.waiting = None  # LongPoll parked in the selector thread until the game state changes
+        self.stream = None  # PushStream (SSE or WebSocket) served from the selector thread
+        self.outbuf = []  # stream events (or a 503 being shed) not yet accepted by the socket
+        self.shedding = False  # answered with 503; only its output is flushed and its input drained
+
+
+class PooledServer:
+    """Selector thread for idle connections plus a WorkerPool for request handling"""
+
+    def __init__(self, server, listen_socket, workers=None, queue_depth=None):
+        self.server = server
+        self.listen_socket = listen_socket
+        self.pool = WorkerPool(self._handle_connection, workers, queue_depth)
+        self.server.worker_pool = self.pool
+        self.selector = selectors.DefaultSelector()
+        self.connections = {}
+        self.parked = set()
+        self.streams = set()
+        self.returned = queue.SimpleQueue()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self.running = False
+        self._busy_body = json.dumps({"error": "Server busy"})
+        self._busy_headers = {'Content-Type': 'application/json', 'Retry-After': config.POOL_RETRY_AFTER, 'Connection': 'close'}
+
+        listen_socket.setblocking(False)
+        self.selector.register(listen_socket, selectors.EVENT_READ, "accept")
+        self.selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        # Long-polls park here instead of holding a worker; publishes only wake the selector
+        server.add_state_listener(lambda version: self._wake())
+
+    def serve_forever(self):
+        self.running = True
+        self.pool.start()
+        last_sweep = time.monotonic()
+        while self.running:
+            for key, mask in self.selector.select(timeout=self._select_timeout()):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    self._drain_returned()
+                elif key.data.shedding:
+                    self._on_shed_event(key.data, mask)
+                elif key.data.stream is not None:
+                    self._on_stream_event(key.data, mask)
+                else:
+                    self._dispatch(key.data)
+            if self.parked:
+                self._resume_parked()
+            if self.streams:
+                self._push_streams()
+
+            now = time.monotonic()
+            if now - last_sweep >= 1.0:
+                self._close_idle_connections(now)
+                last_sweep = now
+
+    def close(self):
+        self.running = False
+        self.pool.shutdown()
+        for conn in list(self.connections.values()):
+            self._close(conn, registered=self._is_registered(conn))
+        self.selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client_socket, client_address = self.listen_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            set_nodelay(client_socket)
+            logger.info(f"Connection from {client_address}")
+            conn = _Connection(client_socket, client_address)
+            self.connections[client_socket.fileno()] = conn
+            self.selector.register(client_socket, selectors.EVENT_READ, conn)
+
+    def _dispatch(self, conn, registered=True):
+        """Hand a readable connection to the pool, or shed it with a 503 when the pool is saturated"""
+        if registered:
+            self.selector.unregister(conn.sock)
+        if self.pool.submit(conn):
+            return
+        logger.info(f"Worker pool saturated, rejecting {conn.address}")
+        # Written from the selector loop like stream output, so a client that does not read cannot stall it;
+        # built per rejection so its Date header is current (response() caches that line per second)
+        conn.shedding = True
+        conn.last_activity = time.monotonic()
+        conn.sock.setblocking(False)
+        conn.outbuf = [memoryview(b) for b in self.server.response(
+            503, 'Service Unavailable', self._busy_body, self._busy_headers)]
+        self.selector.register(conn.sock, selectors.EVENT_WRITE, conn)
+        self._flush_shed(conn)
+
+    def _on_shed_event(self, conn, mask):
+        if mask & selectors.EVENT_WRITE:
+            self._flush_shed(conn)
+            return
+        # Discard what the client still sends: closing with unread input would reset the connection
+        # and could destroy the 503 before the client reads it
+        try:
+            data = conn.sock.recv(config.RECV_CHUNK_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(conn)
+
+    def _flush_shed(self, conn):
+        try:
+            consume_buffers(conn.outbuf, send_buffers(conn.sock, conn.outbuf))
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._close(conn)
+            return
+        if conn.outbuf:
+            return  # EVENT_WRITE brings us back once the socket accepts more
+        try:
+            conn.sock.shutdown(socket.SHUT_WR)  # the 503 is out; wait for the client to close its side
+        except OSError:
+            self._close(conn)
+            return
+        self.selector.modify(conn.sock, selectors.EVENT_READ, conn)
+
+    def _handle_connection(self, conn):
+        """Worker side: answer every request already available, then park the connection again"""
+        keep_open = False
+        try:
+            conn.sock.setblocking(True)
+            conn.sock.settimeout(config.KEEP_ALIVE_TIMEOUT)
+            hasil = []
+            if conn.waiting is not None:
+                poll, conn.waiting = conn.waiting, None
+                hasil.extend(poll.render())
+                conn.requests_served += 1
+                request = conn.reader.next_request()
+            else:
+                request = conn.reader.read_request()
+            # A long-poll that is not ready yet ends the batch; later pipelined requests stay buffered
+            while request is not None:
+                result = self.server.proses(request.decode('utf-8', errors='ignore'))
+                if isinstance(result, PushStream):
+                    # Streams never hold a worker; the selector thread pushes their events from here on
+                    conn.stream = result
+                    hasil.append(result.header)
+                    hasil.extend(result.frames())
+                    hasil.extend(result.receive(conn.reader.detach()))
+                    break
+                if isinstance(result, LongPoll):
+                    if not result.ready():
+                        conn.waiting = result
+                        break
+                    result = result.render()
+                hasil.extend(result)
+                conn.requests_served += 1
+                request = conn.reader.next_request()
+            if hasil:
+                send_response(conn.sock, hasil)
+            keep_open = conn.waiting is not None or (conn.stream is not None and not conn.stream.closed) or conn.requests_served < config.KEEP_ALIVE_MAX_REQUESTS
+            if not keep_open:
+                logger.info(f"Client {conn.address} reached max keep-alive requests. Closing connection.")
+        except socket.timeout:
+            logger.info(f"Client {conn.address} timed out mid-request. Closing connection.")
+        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+            logger.info(f"Client {conn.address} disconnected gracefully or abruptly.")
+        except Exception as e:
+            logger.error(f"Error processing client {conn.address}: {e}")
+        finally:
+            conn.last_activity = time.monotonic()
+            self.returned.put((conn, keep_open))
+            self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _drain_returned(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        while True:
+            try:
+                conn, keep_open = self.returned.get_nowait()
+            except queue.Empty:
+                return
+            if not keep_open:
+                self._close(conn, registered=False)
+                continue
+            if conn.waiting is not None:
+                self.parked.add(conn)
+                continue
+            conn.sock.setblocking(False)
+            if conn.stream is not None:
+                self.streams.add(conn)
+                self.selector.register(conn.sock, selectors.EVENT_READ, conn)
+                continue
+            self.selector.register(conn.sock, selectors.EVENT_READ, conn)
+            if conn.reader.has_buffered_data():
+                # Part of the next pipelined request is already buffered, keep it moving
+                self._dispatch(conn)
+
+    def _select_timeout(self):
+        if not self.parked:
+            return 1.0
+        nearest = min(conn.waiting.deadline for conn in self.parked)
+        return max(0.0, min(1.0, nearest - time.monotonic()))
+
+    def _resume_parked(self):
+        """Send parked long-polls whose state advanced or whose deadline passed back to the pool"""
+        for conn in list(self.parked):
+            if conn.waiting.ready():
+                self.parked.discard(conn)
+                self._dispatch(conn, registered=False)
+
+    def _push_streams(self):
+        """Queue new snapshot events (or a heartbeat) for every push connection that is not still draining"""
+        now = time.monotonic()
+        for conn in list(self.streams):
+            if conn.stream.server.shutdown_flag:
+                self._close(conn)  # its room was destroyed
+                continue
+            if conn.outbuf or conn.stream.closed:
+                continue  # missed events are replayed from history once the socket drains
+            if conn.stream.pending():
+                conn.outbuf.extend(memoryview(frame) for frame in conn.stream.frames())
+            elif conn.stream.HEARTBEAT and now - conn.last_activity >= config.STREAM_HEARTBEAT:
+                conn.outbuf.append(memoryview(conn.stream.HEARTBEAT))
+            else:
+                continue
+            conn.last_activity = now
+            self._flush_stream(conn)
+
+    def _on_stream_event(self, conn, mask):
+        if mask & selectors.EVENT_READ:
+            try:
+                data = conn.sock.recv(config.RECV_CHUNK_SIZE)
+            except (BlockingIOError, InterruptedError):
+                data = None
+            except OSError:
+                data = b""
+            if data == b"":
+                logger.info(f"Stream client {conn.address} disconnected.")
+                self._close(conn)
+                return
+            if data:
+                # WebSocket actions are small and applied right here instead of round-tripping through the pool
+                try:
+                    conn.outbuf.extend(memoryview(frame) for frame in conn.stream.receive(data))
+                except Exception as e:
+                    logger.error(f"Error processing stream client {conn.address}: {e}")
+                    conn.stream.closed = True
+                self._flush_stream(conn)
+                return
+        if mask & selectors.EVENT_WRITE:
+            self._flush_stream(conn)
+
+    def _flush_stream(self, conn):
+        try:
+            if conn.outbuf:
+                consume_buffers(conn.outbuf, send_buffers(conn.sock, conn.outbuf))
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            logger.info(f"Stream client {conn.address} disconnected while writing: {e}")
+            self._close(conn)
+            return
+        if conn.stream.closed and not conn.outbuf:
+            self._close(conn)
+            return
+        events = selectors.EVENT_READ | selectors.EVENT_WRITE if conn.outbuf else selectors.EVENT_READ
+        self.selector.modify(conn.sock, events, conn)
+
+    def _is_registered(self, conn):
+        try:
+            self.selector.get_key(conn.sock)
+        except (KeyError, ValueError):
+            return False
+        return True
+
+    def _close_idle_connections(self, now):
+        for conn in list(self.connections.values()):
+            try:
+                key = self.selector.get_key(conn.sock)
+            except (KeyError, ValueError):
+                continue  # currently owned by a worker
+            if conn.stream is not None:
+                continue  # streams stay open; heartbeats detect dead peers
+            if now - conn.last_activity >= (SHED_LINGER if conn.shedding else config.KEEP_ALIVE_TIMEOUT):
+                logger.info(f"Client {conn.address} timed out (keep-alive). Closing connection.")
+                self._close(key.data)
+
+    def _close(self, conn, registered=True):
+        fileno = conn.sock.fileno()
+        if fileno == -1:
+            return
+        logger.info(f"Closing connection for client {conn.address}.")
+        self.connections.pop(fileno, None)
+        self.parked.discard(conn)
+        self.streams.discard(conn)
+        if registered:
+            self.selector.unregister(conn.sock)
+        conn.sock.close()
+        if conn.stream is not None:
+            conn.stream.on_close()
+
+
+def run_pool_server(host='0.0.0.0', port=8000, workers=None, queue_depth=None, push_port=None):
+    """Run the HTTP game server with a bounded worker pool and 503 load shedding"""
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(config.LISTEN_BACKLOG)
+
+    server = HttpServer()
+    pooled = PooledServer(server, server_socket, workers, queue_depth)
+    if push_port:
+        start_push_server(server, host, push_port)
+    logger.info(f"Starting HTTP game server (worker pool: {pooled.pool.workers} workers, "
+                f"queue depth {pooled.pool.queue.maxsize}) on {host}:{port}")
+    try:
+        pooled.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server shutting down")
+    finally:
+        pooled.close()
+        server_socket.close()
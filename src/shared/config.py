@@ -40,6 +40,61 @@ WIN_SOUND = "Mission Complete.mp3"
 LOSE_BACKGROUND_IMAGE = "end_lose.jpg"
 LOSE_SOUND = "Mission Failed.mp3"  
 
+# Player Storage Configuration (for server)
+PLAYER_BACKEND = "objects" # "objects" (one PlayerState per player) or "arrays" (NumPy struct-of-arrays, needs numpy; for load tests with thousands of bots)
+
+# Game Tick Configuration (for server)
+TICK_RATE = 30 # game ticks per second; moves reach long-polling clients on the next tick
+TICK_MAX_CATCH_UP = 2 # ticks run back to back after an overrun before the rest are skipped
+
 # HTTP Keep-Alive Configuration (for server)
 KEEP_ALIVE_TIMEOUT = 5 # seconds to keep connection open after last request
-KEEP_ALIVE_MAX_REQUESTS = 100 # max requests per single keep-alive connection
\ No newline at end of file
+KEEP_ALIVE_MAX_REQUESTS = 100 # max requests per single keep-alive connection
+
+# HTTP Request Reader Configuration (for server)
+RECV_CHUNK_SIZE = 65536 # bytes pulled from the socket per recv call
+MAX_HEADER_SIZE = 65536 # reject requests whose header block grows past this size
+MAX_BODY_SIZE = 1048576 # reject requests declaring a larger Content-Length before buffering the body
+
+# Server Front End Configuration
+SERVER_MODE = "threaded" # "threaded" (thread per connection), "selectors" (single-threaded event loop), "asyncio", "pool" or "multiprocess"
+LISTEN_BACKLOG = 128 # pending connections queued by the listening socket
+
+# Worker Pool Configuration (for server, "pool" mode)
+POOL_WORKERS = 16 # threads handling requests
+POOL_QUEUE_DEPTH = 64 # readable connections allowed to wait for a worker before shedding
+POOL_RETRY_AFTER = 1 # seconds advertised in Retry-After on 503 responses
+
+# Rooms Configuration (X-Room header, /rooms/<name>/...; spread across processes in "multiprocess" mode)
+WORKER_PROCESSES = 0 # room worker processes, 0 = one per CPU core
+ROOM_HEADER = "X-Room" # request header naming the room a client plays in
+DEFAULT_ROOM = "lobby" # room used when a request names none
+CLIENT_ROOM = None # room this client joins, None = DEFAULT_ROOM
+MAX_ROOMS = 256 # rooms one server process (or multiprocess worker) hosts at most
+
+# Long-Polling Configuration
+LONG_POLL_TIMEOUT = 1.0 # seconds GET /game_state?since= waits for a newer state before answering anyway
+
+# Server-Sent Events Configuration (GET /stream)
+STREAM_REPLAY_EVENTS = 64 # recent snapshot events kept for Last-Event-ID replay
+STREAM_HEARTBEAT = 15 # seconds without a new snapshot before a ": ping" comment is sent
+STREAM_RETRY_MS = 1000 # reconnect delay advertised to clients in the stream's retry field
+
+# WebSocket Configuration (GET /ws)
+WS_MAX_MESSAGE_SIZE = 65536 # largest message accepted from a client before closing with 1009
+
+# TCP Push Configuration (length-prefixed JSON, used by the client NetworkHandler)
+TCP_PUSH_PORT = 5556 # second server port for the push transport, 0 = disabled
+TCP_PUSH_MAX_MESSAGE_SIZE = 65536 # largest action message accepted before the connection is closed
+
+# Response Compression Configuration (Accept-Encoding: gzip / deflate)
+COMPRESSION_MIN_SIZE = 1024 # bodies smaller than this many bytes are always sent uncompressed
+COMPRESSION_LEVEL = 6 # zlib level 1 (fastest) - 9 (smallest), 0 = never compress
+
+# Game Event Log Configuration (GET /events)
+EVENT_LOG_SIZE = 256 # newest game events kept for clients catching up with GET /events?after=<id>
+
+# Client Transport Configuration
+CLIENT_STATE_DELTAS = True # poll with GET /game_state?base=<version> and apply the returned delta
+CLIENT_STATE_ENCODING = "json" # "json" or "binary" (Accept: application/x-cooked-state, full snapshots only)
+CLIENT_TRANSPORT = "longpoll" # "poll", "longpoll" (GET /game_state?since=), "sse" (GET /stream), "websocket" (GET /ws, actions go upstream too) or "tcp" (TCP_PUSH_PORT)
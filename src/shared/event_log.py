@@ -0,0 +1,36 @@
+# src/shared/event_log.py
+import threading
+from collections import deque
+from itertools import islice
+
+from . import config
+
+
+class EventLog:
+    """Bounded ring buffer of game events with monotonically increasing ids
+
+    Events are never removed by readers: each client keeps its own cursor (the last
+    id it has seen) and asks for what comes after it, so every client gets every
+    event once. Only the oldest events fall off when the buffer is full.
+    """
+
+    def __init__(self, capacity=None):
+        self._events = deque(maxlen=capacity or config.EVENT_LOG_SIZE)
+        self._lock = threading.Lock()
+        self.last_id = 0
+
+    def append(self, event_type, data):
+        with self._lock:
+            self.last_id += 1
+            event = {"id": self.last_id, "type": event_type, "data": data}
+            self._events.append(event)
+            return event
+
+    def since(self, cursor):
+        """Events with id > cursor that are still buffered, oldest first"""
+        with self._lock:
+            if cursor >= self.last_id:
+                return []
+            # Ids are consecutive, so the first wanted event sits at a known offset from the end
+            start = max(0, len(self._events) - (self.last_id - cursor))
+            return list(islice(self._events, start, None))
@@ -2,8 +2,11 @@
 import random
 import threading
 import time
+from collections import deque
 from . import config
 from .recipe_manager import RecipeManager
+from .event_log import EventLog
+from .player_arrays import PlayerArrays
 
 class PlayerState:
     def __init__(self, player_id, ingredient, pos):
@@ -13,20 +16,30 @@ class PlayerState:
         self.target_pos = pos
 
 class GameState:
-    def __init__(self):
+    def __init__(self, version=0, events=None, backend=None):
         self.players = {}
         self.orders = []
+        # Indeks order terbuka: mask ingredient -> deque (urutan, order), urutan = urutan kemunculan di self.orders
+        self._open_orders = {}
+        self._order_seq = 0
         self.score = 0
         self.timer = config.GAME_TIMER_SECONDS
         self.recipe_manager = RecipeManager()
         self.clients_info = {}
         self._lock = threading.Lock()
         self._fusion_event_queue = []
-        self._visual_events = []
+        self.events = events if events is not None else EventLog() # dibagi antar GameState agar id event terus naik
+        self.version = version # naik setiap kali state berubah, dipakai untuk long-polling
 
         self.fusion_stations = []
+        self._fusion_tiles = set() # tile yang tertutup fusion station
         self.enter_station = None
 
+        # Indeks okupansi: tile (x, y) -> set player_id, diperbarui setiap kali posisi pemain berubah
+        self.occupancy = {}
+        # Tile yang penghuninya (atau ingredient penghuninya) berubah sejak check_for_merge terakhir
+        self.dirty_tiles = set()
+
         self.doorprize_station = None # (x, y) dari doorprize station
         self.doorprize_spawn_time = 0 # timestamp kapan doorprize muncul
         self.next_doorprize_spawn_delay = random.uniform(config.DOORPRIZE_SPAWN_INTERVAL_MIN, config.DOORPRIZE_SPAWN_INTERVAL_MAX)
@@ -38,34 +51,153 @@ class GameState:
         self.all_possible_ingredients = ['Rice', 'Salmon', 'Tuna', 'Shrimp', 'Egg', 'Seaweed', 
                                        'Cucumber', 'Avocado', 'Crab Meat', 'Eel', 'Cream Cheese', 'Fish Roe']
 
+        # "arrays": pemain disimpan di array NumPy (lihat player_arrays.py), self.players berisi view per slot
+        backend = backend or config.PLAYER_BACKEND
+        self._arrays = PlayerArrays(self.all_possible_ingredients) if backend == "arrays" else None
+
+    def touch(self):
+        """Mark the state as changed"""
+        self.version += 1
+
     def add_player(self, player_id, ingredient, pos):
         with self._lock:
-            self.players[player_id] = PlayerState(player_id, ingredient, pos)
+            old = self.players.pop(player_id, None)
+            if old:
+                self._forget_player(old)
+            if self._arrays is not None:
+                self.players[player_id] = self._arrays.add(player_id, ingredient, pos)  # masuk indeks lewat _sync_tiles
+            else:
+                self.players[player_id] = PlayerState(player_id, ingredient, pos)
+                self._occupy(player_id, pos)
+            self.touch()
 
     def remove_player(self, player_id):
         with self._lock:
             if player_id in self.players:
-                del self.players[player_id]
+                self._forget_player(self.players.pop(player_id))
+                self.touch()
+
+    def _forget_player(self, p):
+        if self._arrays is not None:
+            tile = self._arrays.remove(p.player_id)
+            if tile is not None:
+                self._vacate(p.player_id, tile)
+        else:
+            self._vacate(p.player_id, p.pos)
+
+    @staticmethod
+    def _tile_of(pos):
+        return int(pos[0]), int(pos[1])
+
+    @staticmethod
+    def _station_tiles(station_top_left):
+        sx, sy = station_top_left
+        return [(x, y) for x in range(sx, sx + config.STATION_SIZE) for y in range(sy, sy + config.STATION_SIZE)]
+
+    def _occupy(self, player_id, pos):
+        tile = self._tile_of(pos)
+        self.occupancy.setdefault(tile, set()).add(player_id)
+        self.dirty_tiles.add(tile)
+
+    def _vacate(self, player_id, pos):
+        tile = self._tile_of(pos)
+        occupants = self.occupancy.get(tile)
+        if occupants is not None:
+            occupants.discard(player_id)
+            if not occupants:
+                del self.occupancy[tile]
+        self.dirty_tiles.add(tile)
+
+    def _place_player(self, p, pos):
+        """Set p.pos and keep the occupancy index in step; only tile changes touch the index"""
+        if self._arrays is not None:
+            p.pos = pos
+            p.target_pos = pos
+            return  # the arrays backend files tile changes in _sync_tiles, once per tick
+        if self._tile_of(pos) != self._tile_of(p.pos):
+            self._vacate(p.player_id, p.pos)
+            self._occupy(p.player_id, pos)
+        p.pos = pos
+        p.target_pos = pos
+
+    def _sync_tiles(self):
+        """Arrays backend: update the occupancy index, which then only covers fusion tiles, from the arrays"""
+        if self._arrays is None:
+            return
+        for player_id, old_tile, new_tile in self._arrays.changed_tiles():
+            if old_tile is not None:
+                self._vacate(player_id, old_tile)
+            if new_tile is not None:
+                self._occupy(player_id, new_tile)
+
+    def mark_player_dirty_locked(self, player_id):
+        """Re-check the player's tile for merges, e.g. after its ingredient changed outside GameState"""
+        p = self.players.get(player_id)
+        if p:
+            self.dirty_tiles.add(self._tile_of(p.pos))
+
+    def _index_order(self, order):
+        mask = self.recipe_manager.ingredient_mask(order['ingredients'])
+        self._open_orders.setdefault(mask, deque()).append((self._order_seq, order))
+        self._order_seq += 1
+
+    def _match_order(self, available_mask):
+        """Earliest open order whose ingredients are all in available_mask, as (mask, order), or None
+
+        Loops over distinct recipes with open orders, not over the orders themselves.
+        """
+        best = None
+        for mask, entries in self._open_orders.items():
+            if mask & available_mask == mask and (best is None or entries[0][0] < best[1][0][0]):
+                best = (mask, entries)
+        return (best[0], best[1][0][1]) if best else None
+
+    def _close_order(self, mask):
+        entries = self._open_orders[mask]
+        entries.popleft()
+        if not entries:
+            del self._open_orders[mask]
+
+    def _recheck_fusion_tiles(self):
+        """New orders or stations can complete merges on tiles nobody moved on or off"""
+        self.dirty_tiles.update(tile for tile in self._fusion_tiles if tile in self.occupancy)
 
     def move_player(self, player_id, direction):
         with self._lock:
-            p = self.players.get(player_id)
-            if not p:
-                return
-            x, y = p.pos
-            new_x, new_y = x, y
-            if direction == "UP":
-                new_y -= config.PLAYER_SPEED
-            elif direction == "DOWN":
-                new_y += config.PLAYER_SPEED
-            elif direction == "LEFT":
-                new_x -= config.PLAYER_SPEED
-            elif direction == "RIGHT":
-                new_x += config.PLAYER_SPEED
-            final_x = max(0.0, min(new_x, float(config.GRID_WIDTH - 1)))
-            final_y = max(0.0, min(new_y, float(config.GRID_HEIGHT - 1)))
-            p.pos = (final_x, final_y)
-            p.target_pos = (final_x, final_y)
+            self.move_player_locked(player_id, direction)
+
+    def move_players(self, moves):
+        """Apply many (player_id, direction) moves at once, e.g. for thousands of bots per tick"""
+        with self._lock:
+            self.move_players_locked(moves)
+
+    def move_players_locked(self, moves):
+        if self._arrays is None:
+            for player_id, direction in moves:
+                self.move_player_locked(player_id, direction)
+        elif self._arrays.move(moves):  # vectorized clamping over all moved slots
+            self.touch()
+
+    def move_player_locked(self, player_id, direction):
+        """move_player for callers that already hold self._lock (batched actions)"""
+        p = self.players.get(player_id)
+        if not p:
+            return
+        x, y = p.pos
+        new_x, new_y = x, y
+        if direction == "UP":
+            new_y -= config.PLAYER_SPEED
+        elif direction == "DOWN":
+            new_y += config.PLAYER_SPEED
+        elif direction == "LEFT":
+            new_x -= config.PLAYER_SPEED
+        elif direction == "RIGHT":
+            new_x += config.PLAYER_SPEED
+        final_x = max(0.0, min(new_x, float(config.GRID_WIDTH - 1)))
+        final_y = max(0.0, min(new_y, float(config.GRID_HEIGHT - 1)))
+        if (final_x, final_y) != p.pos:
+            self.touch()
+        self._place_player(p, (final_x, final_y))
 
     def _is_player_on_station(self, player_pos, station_top_left):
         px, py = int(player_pos[0]), int(player_pos[1])
@@ -96,6 +228,12 @@ class GameState:
                 self.fusion_stations.append(pos)
                 existing_station_positions.append((*pos, config.STATION_SIZE))
 
+            self._fusion_tiles = {tile for station in self.fusion_stations for tile in self._station_tiles(station)}
+            if self._arrays is not None:
+                self.occupancy.clear()
+                self._arrays.watch_tiles(self._fusion_tiles)  # _sync_tiles files everyone on them again
+            self._recheck_fusion_tiles()
+
             pos = self._get_random_station_pos(existing_station_positions, config.STATION_SIZE)
             self.enter_station = pos
             existing_station_positions.append((*pos, config.STATION_SIZE))
@@ -105,15 +243,19 @@ class GameState:
             self.doorprize_spawn_time = time.time() 
             self.next_doorprize_spawn_delay = random.uniform(config.DOORPRIZE_SPAWN_INTERVAL_MIN, config.DOORPRIZE_SPAWN_INTERVAL_MAX)
             self.players_collected_doorprize.clear()
+            self.touch()
 
             print(f"Stations initialized: Fusion={self.fusion_stations}, Enter={self.enter_station}")
 
     def can_player_change_ingredient(self, player_id):
         with self._lock:
-            p = self.players.get(player_id)
-            if not p or not self.enter_station:
-                return False
-            return self._is_player_on_station(p.pos, self.enter_station)
+            return self.can_player_change_ingredient_locked(player_id)
+
+    def can_player_change_ingredient_locked(self, player_id):
+        p = self.players.get(player_id)
+        if not p or not self.enter_station:
+            return False
+        return self._is_player_on_station(p.pos, self.enter_station)
 
     def spawn_doorprize_station(self, current_time):
         with self._lock:
@@ -126,7 +268,8 @@ class GameState:
                 self.doorprize_station = pos
                 self.doorprize_spawn_time = current_time # Ini waktu stasiun ini muncul
                 self.players_collected_doorprize.clear() # Clear untuk stasiun baru ini
-                self._visual_events.append({"type": "doorprize_spawn", "data": {"pos": pos}})
+                self.events.append("doorprize_spawn", {"pos": pos})
+                self.touch()
                 print(f"Doorprize station spawned at {pos} at time {current_time:.2f}")
   
     def check_doorprize_interaction(self):
@@ -138,93 +281,78 @@ class GameState:
             if current_time - self.doorprize_spawn_time > config.DOORPRIZE_DURATION:
                 # Logika penghapusan stasiun doorprize setelah 3 detik
                 print(f"Doorprize station at {self.doorprize_station} expired.")
-                self._visual_events.append({"type": "doorprize_expire", "data": {"pos": self.doorprize_station}})
+                self.events.append("doorprize_expire", {"pos": self.doorprize_station})
                 self.doorprize_station = None
                 self.doorprize_spawn_time = current_time # Reset time for next spawn
                 self.next_doorprize_spawn_delay = random.uniform(config.DOORPRIZE_SPAWN_INTERVAL_MIN, config.DOORPRIZE_SPAWN_INTERVAL_MAX)
                 self.players_collected_doorprize.clear()
+                self.touch()
                 return
 
-            # Logika interaksi pemain dengan doorprize station yang aktif
-            for player_id, player in self.players.items():
-                # Pastikan pemain belum mengumpulkan dari stasiun ini DAN
-                # Pemain berada di dalam area doorprize station
-                if player_id not in self.players_collected_doorprize and \
-                   self._is_player_on_station(player.pos, self.doorprize_station):
-                    
+            # Logika interaksi pemain dengan doorprize station yang aktif:
+            # cukup lihat penghuni tile doorprize station lewat indeks okupansi (backend arrays: sekaligus di array)
+            if self._arrays is not None:
+                on_station = self._arrays.on_station(self.doorprize_station)
+            else:
+                on_station = [player_id for tile in self._station_tiles(self.doorprize_station)
+                              for player_id in self.occupancy.get(tile, ())]
+            for player_id in on_station:
+                # Pastikan pemain belum mengumpulkan dari stasiun ini
+                if player_id not in self.players_collected_doorprize:
                     score_gain = random.randint(config.DOORPRIZE_SCORE_MIN, config.DOORPRIZE_SCORE_MAX)
                     self.score += score_gain # Poin ditambahkan ke score total game
                     self.players_collected_doorprize.add(player_id) # Tandai pemain sudah mengumpulkan
                     # Tambahkan event visual agar klien bisa memutar SFX atau menampilkan notifikasi
-                    self._visual_events.append({"type": "doorprize_collect", "data": {"player_id": player_id, "score": score_gain, "pos": self.doorprize_station}})
+                    self.events.append("doorprize_collect", {"player_id": player_id, "score": score_gain, "pos": self.doorprize_station})
+                    self.touch()
                     print(f"Player {player_id} collected {score_gain} from doorprize at {self.doorprize_station}. Total score: {self.score}")
 
 
     def check_for_merge(self):
         with self._lock:
-            positions_on_grid = {}
-            for p in self.players.values():
-                grid_x, grid_y = int(p.pos[0]), int(p.pos[1])
-                positions_on_grid.setdefault((grid_x, grid_y), []).append(p)
-            temp_players_processed_in_merge_cycle = set() 
+            # Hanya tile fusion yang penghuninya berubah sejak tick sebelumnya yang perlu dicek,
+            # jadi biaya per tick mengikuti aktivitas pemain, bukan jumlah pemain
+            self._sync_tiles()
+            dirty_fusion_tiles = self.dirty_tiles & self._fusion_tiles
+            self.dirty_tiles.clear()
             
             if not self.fusion_stations:
                 return False 
 
-            for pos_key, plist in positions_on_grid.items():
-                is_on_fusion_station = False
-                for station_pos in self.fusion_stations:
-                    if self._is_player_on_station(pos_key, station_pos):
-                        is_on_fusion_station = True
-                        break
-                
-                if not is_on_fusion_station:
+            # Urutan tile dan pemain tetap (bukan urutan hash set), jadi merge yang terjadi deterministik
+            for pos_key in sorted(dirty_fusion_tiles):
+                occupants = self.occupancy.get(pos_key, ())
+                if len(occupants) < 2 or not self._open_orders:
                     continue
-
-                if len(plist) > 1:
-                    current_players_on_tile_available = {p.player_id: p for p in plist if p.player_id not in temp_players_processed_in_merge_cycle}
-                    if len(current_players_on_tile_available) < 2:
-                        continue
-                    orders_to_check = list(self.orders)
-                    for order_index, order in enumerate(orders_to_check):
-                        if order.get('fulfilled', False):
-                            continue
-                        required_order_ingredients = list(order['ingredients'])
-                        potential_merge_player_ids = []
-                        potential_merge_ingredient_names = []
-                        temp_available_ingredients_map = {}
-                        for p_id, p_obj in current_players_on_tile_available.items():
-                            temp_available_ingredients_map.setdefault(p_obj.ingredient, []).append(p_id)
-                        all_ingredients_found_for_order = True
-                        for required_ing in required_order_ingredients:
-                            if required_ing in temp_available_ingredients_map and \
-                            temp_available_ingredients_map[required_ing]:
-                                p_id_for_this_ing = temp_available_ingredients_map[required_ing].pop(0)
-                                potential_merge_player_ids.append(p_id_for_this_ing)
-                                potential_merge_ingredient_names.append(required_ing)
-                            else:
-                                all_ingredients_found_for_order = False
-                                break
-                        if all_ingredients_found_for_order and \
-                        len(potential_merge_ingredient_names) == len(required_order_ingredients):
-                            result_recipe = self.recipe_manager.check_merge(frozenset(potential_merge_ingredient_names))
-                            if result_recipe and result_recipe['name'] == order['name']:
-                                self._fusion_event_queue.append({
-                                    "recipe": result_recipe,
-                                    "pos": pos_key,
-                                    "players_involved": potential_merge_player_ids,
-                                    "order_name_fulfilled": order['name']
-                                })
-                                print(f"Fusion event detected: {result_recipe['name']} at {pos_key}")
-                                temp_players_processed_in_merge_cycle.update(potential_merge_player_ids)
-                                order['fulfilled'] = True
-                                break
+                # Satu kali per tile: ingredient -> pemain pertama yang membawanya, dan mask semua ingredient
+                players_by_ingredient = {}
+                for player_id in sorted(occupants):
+                    players_by_ingredient.setdefault(self.players[player_id].ingredient, player_id)
+                match = self._match_order(self.recipe_manager.ingredient_mask(players_by_ingredient))
+                if match is None:
+                    continue
+                mask, order = match
+                result_recipe = self.recipe_manager.check_merge_mask(mask)
+                if not result_recipe:
+                    continue
+                self._fusion_event_queue.append({
+                    "recipe": result_recipe,
+                    "pos": pos_key,
+                    "players_involved": [players_by_ingredient[ing] for ing in order['ingredients']],
+                    "order_name_fulfilled": order['name']
+                })
+                print(f"Fusion event detected: {result_recipe['name']} at {pos_key}")
+                order['fulfilled'] = True
+                self._close_order(mask)
+                self.touch()
             return True
 
     def process_fusion_events(self):
         with self._lock:
             events_to_process = list(self._fusion_event_queue)
             self._fusion_event_queue.clear()
+            if events_to_process:
+                self.touch()
             
             for event in events_to_process:
                 recipe = event['recipe']
@@ -243,14 +371,17 @@ class GameState:
                         order_obj['fulfilled'] = True
                         break
                 print(f"Order '{order_name_fulfilled}' fulfilled.")
-                self._visual_events.append({"type": "recipe_fusion", "data": {"pos": pos, "recipe_name": recipe['name']}})
+                self.events.append("recipe_fusion", {"pos": pos, "recipe_name": recipe['name']})
 
             self.orders = [order for order in self.orders if not order.get('fulfilled', False)]
             
     def to_dict(self):
         with self._lock:
-            players_copy = {pid: {"ingredient": p.ingredient, "pos": p.pos, "target_pos": p.target_pos}
-                            for pid, p in self.players.items()}
+            if self._arrays is not None:
+                players_copy = self._arrays.to_dict()
+            else:
+                players_copy = {pid: {"ingredient": p.ingredient, "pos": p.pos, "target_pos": p.target_pos}
+                                for pid, p in self.players.items()}
             serializable_orders_copy = []
             for order in self.orders:
                 if not order.get('fulfilled', False):
@@ -261,9 +392,7 @@ class GameState:
                     })
             score_copy = self.score
             timer_copy = self.timer
-            
-            visual_events_copy = list(self._visual_events)
-            self._visual_events.clear()
+            version_copy = self.version
             
             fusion_stations_copy = list(self.fusion_stations)
             enter_station_copy = self.enter_station
@@ -279,11 +408,11 @@ class GameState:
             "orders": serializable_orders_copy,
             "score": score_copy,
             "timer": timer_copy,
-            "visual_events": visual_events_copy,
             "fusion_stations": fusion_stations_copy,
             "enter_station": enter_station_copy,
             "doorprize_station": doorprize_station_copy,
-            "doorprize_remaining_time": doorprize_remaining_time
+            "doorprize_remaining_time": doorprize_remaining_time,
+            "version": version_copy
         }
 
     def generate_orders(self, num_active_players):
@@ -315,6 +444,9 @@ class GameState:
                 "ingredients": ingredients_list,
                 "fulfilled": False
             })
+            self._index_order(self.orders[-1])
+            self._recheck_fusion_tiles()
+            self.touch()
             print(f"DEBUG: Added 1 new order: {selected_recipe['name']}. Total orders: {len(self.orders)}")
 
     def _get_safe_spawn_position(self):
@@ -366,8 +498,7 @@ class GameState:
             
             if config.POST_FUSION_RELOCATION:
                 new_pos = self._get_safe_spawn_position()
-                player.pos = new_pos
-                player.target_pos = new_pos
+                self._place_player(player, new_pos)
                 print(f"Player {player_id} relocated to {new_pos}")
             else:
                 new_pos = old_pos
@@ -396,17 +527,18 @@ class GameState:
             else:
                 new_ingredient = old_ingredient
                 print(f"Player {player_id} keeping ingredient {old_ingredient} (ingredient change disabled)")
+
+            # Pemain lain yang tersisa di tile lama bisa saja cocok dengan order berikutnya
+            self.dirty_tiles.add(self._tile_of(old_pos))
+            self.dirty_tiles.add(self._tile_of(new_pos))
             
             # Tambahkan visual event untuk relocation
-            self._visual_events.append({
-                "type": "player_relocate", 
-                "data": {
-                    "player_id": player_id, 
-                    "old_pos": old_pos,
-                    "new_pos": new_pos,
-                    "old_ingredient": old_ingredient,
-                    "new_ingredient": new_ingredient
-                }
+            self.events.append("player_relocate", {
+                "player_id": player_id, 
+                "old_pos": old_pos,
+                "new_pos": new_pos,
+                "old_ingredient": old_ingredient,
+                "new_ingredient": new_ingredient
             })
             
             print(f"Successfully completed relocation for player {player_id}")
@@ -0,0 +1,197 @@
+# src/shared/player_arrays.py
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: only PLAYER_BACKEND = "arrays" needs it
+    np = None
+
+from . import config
+
+# direction -> index into _STEP_X/_STEP_Y (steps in units of PLAYER_SPEED); unknown directions
+# take the last entry, which only clamps, like move_player_locked
+_DIRECTION_CODES = {"UP": 0, "DOWN": 1, "LEFT": 2, "RIGHT": 3}
+_STEP_X = (0, 0, -1, 1, 0)
+_STEP_Y = (-1, 1, 0, 0, 0)
+
+
+class ArrayPlayerState:
+    """PlayerState for one slot of a PlayerArrays; attribute reads and writes go to the arrays"""
+
+    __slots__ = ("player_id", "slot", "_store")
+
+    def __init__(self, store, player_id, slot):
+        self._store = store
+        self.player_id = player_id
+        self.slot = slot
+
+    @property
+    def pos(self):
+        return float(self._store.x[self.slot]), float(self._store.y[self.slot])
+
+    @pos.setter
+    def pos(self, pos):
+        self._store.x[self.slot], self._store.y[self.slot] = pos
+
+    @property
+    def target_pos(self):
+        return float(self._store.target_x[self.slot]), float(self._store.target_y[self.slot])
+
+    @target_pos.setter
+    def target_pos(self, pos):
+        self._store.target_x[self.slot], self._store.target_y[self.slot] = pos
+
+    @property
+    def ingredient(self):
+        return self._store.ingredient_names[self._store.ingredient[self.slot]]
+
+    @ingredient.setter
+    def ingredient(self, name):
+        self._store.ingredient[self.slot] = self._store.ingredient_id(name)
+
+
+class PlayerArrays:
+    """Struct-of-arrays player storage: one slot per player in parallel NumPy arrays
+
+    x/y, target_x/target_y, ingredient id, live flag and the tile each player was
+    on at the last changed_tiles() (indexed_x/indexed_y, -1 = not seen yet). Player
+    ids map to slots; removed slots are reused. Batch moves, tile changes and
+    station containment are computed over all slots at once. Only tile changes
+    into or out of watched tiles (GameState watches the fusion tiles) are reported,
+    so the Python side of a tick scales with activity on those tiles.
+    """
+
+    def __init__(self, ingredient_names, capacity=64):
+        if np is None:
+            raise ImportError('PLAYER_BACKEND = "arrays" needs numpy (pip install numpy)')
+        self.ingredient_names = list(ingredient_names)
+        self._ingredient_ids = {name: i for i, name in enumerate(self.ingredient_names)}
+        self.slots = {}  # player_id -> slot
+        self._ids = [None] * capacity  # slot -> player_id
+        self._free = list(range(capacity - 1, -1, -1))
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.target_x = np.zeros(capacity)
+        self.target_y = np.zeros(capacity)
+        self.ingredient = np.zeros(capacity, dtype=np.int16)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.indexed_x = np.full(capacity, -1, dtype=np.int32)
+        self.indexed_y = np.full(capacity, -1, dtype=np.int32)
+        # One spare column and row that is never watched: off-grid and unseen (-1) tiles are clipped onto it
+        self.watched = np.zeros((config.GRID_WIDTH + 1, config.GRID_HEIGHT + 1), dtype=bool)
+
+    def watch_tiles(self, tiles):
+        """Report changes into or out of these tiles from now on; every player is re-reported"""
+        self.watched[:] = False
+        for x, y in tiles:
+            self.watched[x, y] = True
+        self.indexed_x[:] = -1
+        self.indexed_y[:] = -1
+
+    def ingredient_id(self, name):
+        if name not in self._ingredient_ids:
+            self._ingredient_ids[name] = len(self.ingredient_names)
+            self.ingredient_names.append(name)
+        return self._ingredient_ids[name]
+
+    def _grow(self):
+        old = len(self._ids)
+        for name in ("x", "y", "target_x", "target_y", "ingredient", "live"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros(old, dtype=array.dtype)]))
+        for name in ("indexed_x", "indexed_y"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.full(old, -1, dtype=np.int32)]))
+        self._ids.extend([None] * old)
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def add(self, player_id, ingredient, pos):
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.slots[player_id] = slot
+        self._ids[slot] = player_id
+        self.x[slot], self.y[slot] = pos
+        self.target_x[slot], self.target_y[slot] = pos
+        self.ingredient[slot] = self.ingredient_id(ingredient)
+        self.live[slot] = True
+        self.indexed_x[slot] = self.indexed_y[slot] = -1
+        return ArrayPlayerState(self, player_id, slot)
+
+    def remove(self, player_id):
+        """Free the player's slot; returns the watched tile it was reported on, or None"""
+        slot = self.slots.pop(player_id)
+        self._ids[slot] = None
+        self.live[slot] = False
+        self._free.append(slot)
+        x, y = int(self.indexed_x[slot]), int(self.indexed_y[slot])
+        return (x, y) if self._is_watched(x, y) else None
+
+    def move(self, moves):
+        """Apply (player_id, direction) moves in order with clamping; returns True if anyone moved
+
+        Moves of different players are applied together; a player's later moves go in later
+        rounds, so clamping at the border behaves as if they were applied one by one.
+        """
+        known = self.slots
+        pending = [(known[pid], _DIRECTION_CODES.get(d, 4)) for pid, d in moves if pid in known]
+        if not pending:
+            return False
+        slots = np.fromiter((slot for slot, _ in pending), dtype=np.intp, count=len(pending))
+        codes = np.fromiter((code for _, code in pending), dtype=np.intp, count=len(pending))
+        dx = np.array(_STEP_X, dtype=float)[codes] * config.PLAYER_SPEED
+        dy = np.array(_STEP_Y, dtype=float)[codes] * config.PLAYER_SPEED
+        moved = False
+        while len(slots):
+            _, first = np.unique(slots, return_index=True)
+            now = slots[first]
+            old_x, old_y = self.x[now], self.y[now]
+            new_x = np.clip(old_x + dx[first], 0.0, float(config.GRID_WIDTH - 1))
+            new_y = np.clip(old_y + dy[first], 0.0, float(config.GRID_HEIGHT - 1))
+            moved = moved or bool(np.any((new_x != old_x) | (new_y != old_y)))
+            self.x[now] = self.target_x[now] = new_x
+            self.y[now] = self.target_y[now] = new_y
+            later = np.ones(len(slots), dtype=bool)
+            later[first] = False
+            slots, dx, dy = slots[later], dx[later], dy[later]
+        return moved
+
+    def changed_tiles(self):
+        """(player_id, old watched tile or None, new watched tile or None) for live players that
+        entered or left a watched tile since the last call"""
+        tile_x = self.x.astype(np.int32)
+        tile_y = self.y.astype(np.int32)
+        changed = np.flatnonzero(self.live & ((tile_x != self.indexed_x) | (tile_y != self.indexed_y)))
+        old_x, old_y = self.indexed_x[changed], self.indexed_y[changed]
+        new_x, new_y = tile_x[changed], tile_y[changed]
+        self.indexed_x[changed] = new_x
+        self.indexed_y[changed] = new_y
+        was_watched = self._is_watched(old_x, old_y)
+        now_watched = self._is_watched(new_x, new_y)
+        report = was_watched | now_watched
+        return [(self._ids[slot], (ox, oy) if was else None, (nx, ny) if now else None)
+                for slot, ox, oy, nx, ny, was, now in zip(
+                    changed[report].tolist(), old_x[report].tolist(), old_y[report].tolist(),
+                    new_x[report].tolist(), new_y[report].tolist(),
+                    was_watched[report].tolist(), now_watched[report].tolist())]
+
+    def _is_watched(self, tile_x, tile_y):
+        return self.watched[np.clip(tile_x, -1, config.GRID_WIDTH), np.clip(tile_y, -1, config.GRID_HEIGHT)]
+
+    def on_station(self, station_top_left):
+        """Ids of the players standing on the station's STATION_SIZE x STATION_SIZE area"""
+        sx, sy = station_top_left
+        tile_x = self.x.astype(np.int32)
+        tile_y = self.y.astype(np.int32)
+        inside = self.live & (tile_x >= sx) & (tile_x < sx + config.STATION_SIZE) & \
+            (tile_y >= sy) & (tile_y < sy + config.STATION_SIZE)
+        return [self._ids[slot] for slot in np.flatnonzero(inside).tolist()]
+
+    def to_dict(self):
+        """{player_id: {"ingredient", "pos", "target_pos"}} like GameState.to_dict builds from PlayerState"""
+        slots = np.fromiter(self.slots.values(), dtype=np.intp, count=len(self.slots))
+        names = self.ingredient_names
+        positions = list(zip(self.x[slots].tolist(), self.y[slots].tolist()))
+        if np.array_equal(self.x[slots], self.target_x[slots]) and np.array_equal(self.y[slots], self.target_y[slots]):
+            targets = positions  # every move sets both, so share the tuples
+        else:
+            targets = list(zip(self.target_x[slots].tolist(), self.target_y[slots].tolist()))
+        return {pid: {"ingredient": names[ing], "pos": pos, "target_pos": target}
+                for pid, ing, pos, target in zip(self.slots, self.ingredient[slots].tolist(), positions, targets)}
@@ -18,7 +18,14 @@ class RecipeManager:
             if not os.path.exists(db_path):
                 raise FileNotFoundError(f"Database tidak ditemukan di {db_path}")
             self.db_path = db_path
+            self._ingredient_ids = self._load_ingredient_ids()
+            self._ingredient_names = {i: name for name, i in self._ingredient_ids.items()}
+            # Setiap ingredient punya satu bit (bit = id ingredient), resep disimpan per mask ingredient-nya
+            self._ingredient_bits = {name: 1 << i for name, i in self._ingredient_ids.items()}
             self._recipes_cache = self._load_recipes_to_cache()
+            self._reachable_by_mask = self._build_reachable_table()
+            self._recipes_by_id = {r['id']: r for r in self._recipes_cache.values()}
+            self._recipe_ids_by_name = {r['name']: r['id'] for r in self._recipes_cache.values()}
             RecipeManager._initialized = True
             print("RecipeManager initialized and recipes cached.")
         else:
@@ -38,31 +45,87 @@ class RecipeManager:
         cache = {}
         for row in cursor.fetchall():
             recipe_id, name, price, level, ingredients_str = row
-            ingredients_set = frozenset(ingredients_str.split(','))
+            ingredients = ingredients_str.split(',')
+            mask = self.ingredient_mask(ingredients)
             
             # Simpan daftar ingredients sebagai bagian dari data resep
-            cache[ingredients_set] = {
+            cache[mask] = {
                 'id': recipe_id,
                 'name': name,
                 'price': price,
                 'level': level,
-                'ingredients': list(ingredients_set) # Tambahkan ini!
+                'ingredients': ingredients, # urutan dari database, sama di server dan client
+                'mask': mask
             }
             
         conn.close()
         return cache
 
+    def _build_reachable_table(self):
+        """Setiap sub-mask dari mask resep -> resep yang masih bisa dicapai dari sub-mask itu"""
+        table = {}
+        for mask, recipe in self._recipes_cache.items():
+            sub = mask
+            while True:
+                table.setdefault(sub, []).append(recipe)
+                if sub == 0:
+                    break
+                sub = (sub - 1) & mask
+        return table
+
+    def _load_ingredient_ids(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {name: ingredient_id for ingredient_id, name in conn.execute("SELECT id, name FROM ingredients")}
+        finally:
+            conn.close()
+
+    def get_ingredient_id(self, name):
+        """Id ingredient di tabel ingredients (dipakai encoding biner state), None jika tidak dikenal."""
+        return self._ingredient_ids.get(name)
+
+    def ingredient_mask(self, ingredient_names):
+        """Mask dari nama-nama ingredient; ingredient yang tidak dikenal tidak menambah bit."""
+        # Resep adalah himpunan ingredient (primary key recipe_ingredients), jadi mask mewakili resep secara utuh
+        mask = 0
+        for name in ingredient_names:
+            mask |= self._ingredient_bits.get(name, 0)
+        return mask
+
+    def get_ingredient_name(self, ingredient_id):
+        return self._ingredient_names.get(ingredient_id)
+
+    def get_recipe_id(self, name):
+        return self._recipe_ids_by_name.get(name)
+
+    def get_recipe_by_id(self, recipe_id):
+        recipe = self._recipes_by_id.get(recipe_id)
+        return recipe.copy() if recipe else None
+
     def check_merge(self, ingredients_list):
-        ingredients_to_check = frozenset(ingredients_list)
-        return self._recipes_cache.get(ingredients_to_check)
+        mask = 0
+        for name in ingredients_list:
+            bit = self._ingredient_bits.get(name)
+            if bit is None:
+                return None
+            mask |= bit
+        return self._recipes_cache.get(mask)
+
+    def check_merge_mask(self, mask):
+        """check_merge untuk mask dari ingredient_mask(), tanpa membuat frozenset."""
+        return self._recipes_cache.get(mask)
+
+    def get_reachable_recipes(self, mask):
+        """Resep yang masih bisa dibuat dengan menambah ingredient ke mask (superset dari mask), tanpa copy."""
+        return self._reachable_by_mask.get(mask, [])
 
     def get_recipes_by_ingredient_count(self, max_ingredients=None):
         if max_ingredients is None:
             # Pastikan ini juga mengembalikan 'ingredients'
             return [recipe_data.copy() for recipe_data in self._recipes_cache.values()]
         filtered_recipes = []
-        for ingredients_set, recipe_data in self._recipes_cache.items():
-            if len(ingredients_set) <= max_ingredients:
+        for recipe_data in self._recipes_cache.values():
+            if len(recipe_data['ingredients']) <= max_ingredients:
                 recipe_data_with_ingredients = recipe_data.copy()
                 # recipe_data_with_ingredients['ingredients'] sudah ada berkat modifikasi di atas
                 filtered_recipes.append(recipe_data_with_ingredients)
@@ -0,0 +1,170 @@
+"""
+Compact binary encoding of a /game_state snapshot (application/x-cooked-state)
+Shared by the server (encode) and the client (decode). decode_state returns the
+same dict shape as the JSON snapshot, so GameManager.update_state consumes either.
+
+Layout, little-endian:
+    magic "CKS1"
+    header      version u64, score i32, timer i32, flags u8, doorprize_remaining_time f32
+    stations    enter (x, y) i16 if flags & ENTER, doorprize (x, y) i16 if flags & DOORPRIZE,
+                fusion count u8 + (x, y) i16 each
+    slots       count u8 + per entry: flags u8, id (u8 length + UTF-8), username (u8 length + UTF-8)
+                every id in players or clients_info gets a slot; its index is the slot id
+    players     count u8 + (slot u8, ingredient id u8, x f32, y f32) each
+    orders      count u8 + recipe id u8 each
+    extras      u32 length + JSON object holding every other field (events, last_event_id, ...)
+Ingredient and recipe ids are the ids of the ingredients and recipes tables in recipes.db.
+"""
+
+import json
+import struct
+
+from src.shared.recipe_manager import recipe_manager
+
+CONTENT_TYPE = "application/x-cooked-state"
+MAGIC = b"CKS1"
+
+_HEADER = struct.Struct('<QiiBf')
+_POS = struct.Struct('<hh')
+_PLAYER = struct.Struct('<BBff')
+_U8 = struct.Struct('<B')
+_U32 = struct.Struct('<I')
+
+FLAG_GAME_STARTED = 0x01
+FLAG_ENTER = 0x02
+FLAG_DOORPRIZE = 0x04
+
+SLOT_CLIENT = 0x01  # the slot has a clients_info entry
+SLOT_READY = 0x02
+
+# Fields written in the binary sections; everything else goes to the JSON extras
+_BINARY_FIELDS = {"version", "score", "timer", "game_started", "doorprize_remaining_time", "enter_station",
+                  "doorprize_station", "fusion_stations", "clients_info", "players", "orders"}
+
+
+def _short_string(value):
+    data = str(value).encode('utf-8')
+    if len(data) > 255:
+        raise ValueError("string too long for the binary state encoding")
+    return _U8.pack(len(data)) + data
+
+
+def encode_state(state):
+    """Encode a snapshot dict; raises ValueError if it holds something the format cannot express"""
+    players = state.get("players", {})
+    clients = state.get("clients_info", {})
+    fusion = state.get("fusion_stations", [])
+    orders = state.get("orders", [])
+    enter, doorprize = state.get("enter_station"), state.get("doorprize_station")
+    slot_ids = list(clients) + [pid for pid in players if pid not in clients]
+    if max(len(slot_ids), len(fusion), len(orders)) > 255:
+        raise ValueError("too many entries for the binary state encoding")
+
+    flags = (FLAG_GAME_STARTED if state.get("game_started") else 0) | \
+            (FLAG_ENTER if enter else 0) | (FLAG_DOORPRIZE if doorprize else 0)
+    out = [MAGIC, _HEADER.pack(state.get("version", 0), state.get("score", 0), state.get("timer", 0), flags,
+                               state.get("doorprize_remaining_time", 0))]
+    if enter:
+        out.append(_POS.pack(*enter))
+    if doorprize:
+        out.append(_POS.pack(*doorprize))
+    out.append(_U8.pack(len(fusion)))
+    out.extend(_POS.pack(*pos) for pos in fusion)
+
+    out.append(_U8.pack(len(slot_ids)))
+    slots = {}
+    for slot, client_id in enumerate(slot_ids):
+        slots[client_id] = slot
+        info = clients.get(client_id)
+        slot_flags = 0 if info is None else SLOT_CLIENT | (SLOT_READY if info.get("ready") else 0)
+        out.append(_U8.pack(slot_flags) + _short_string(client_id) +
+                   _short_string(info.get("username", "") if info else ""))
+
+    out.append(_U8.pack(len(players)))
+    for player_id, player in players.items():
+        ingredient_id = recipe_manager.get_ingredient_id(player["ingredient"])
+        if ingredient_id is None:
+            raise ValueError(f"unknown ingredient {player['ingredient']!r}")
+        out.append(_PLAYER.pack(slots[player_id], ingredient_id, *player["pos"]))
+
+    out.append(_U8.pack(len(orders)))
+    for order in orders:
+        recipe_id = recipe_manager.get_recipe_id(order["name"])
+        if recipe_id is None:
+            raise ValueError(f"unknown recipe {order['name']!r}")
+        out.append(_U8.pack(recipe_id))
+
+    extras = json.dumps({k: v for k, v in state.items() if k not in _BINARY_FIELDS}).encode()
+    out.append(_U32.pack(len(extras)))
+    out.append(extras)
+    return b"".join(out)
+
+
+def decode_state(data):
+    """Decode encode_state output back into a snapshot dict (target_pos is set to pos)"""
+    if data[:4] != MAGIC:
+        raise ValueError("not an x-cooked-state body")
+    offset = 4
+    version, score, timer, flags, doorprize_remaining = _HEADER.unpack_from(data, offset)
+    offset += _HEADER.size
+    enter = doorprize = None
+    if flags & FLAG_ENTER:
+        enter = list(_POS.unpack_from(data, offset))
+        offset += _POS.size
+    if flags & FLAG_DOORPRIZE:
+        doorprize = list(_POS.unpack_from(data, offset))
+        offset += _POS.size
+    count = data[offset]
+    offset += 1
+    fusion = [list(_POS.unpack_from(data, offset + i * _POS.size)) for i in range(count)]
+    offset += count * _POS.size
+
+    count = data[offset]
+    offset += 1
+    slot_ids = []
+    clients = {}
+    for _ in range(count):
+        slot_flags = data[offset]
+        n = data[offset + 1]
+        client_id = data[offset + 2:offset + 2 + n].decode('utf-8')
+        offset += 2 + n
+        n = data[offset]
+        username = data[offset + 1:offset + 1 + n].decode('utf-8')
+        offset += 1 + n
+        slot_ids.append(client_id)
+        if slot_flags & SLOT_CLIENT:
+            clients[client_id] = {"username": username, "ready": bool(slot_flags & SLOT_READY)}
+
+    count = data[offset]
+    offset += 1
+    players = {}
+    for slot, ingredient_id, x, y in _PLAYER.iter_unpack(data[offset:offset + count * _PLAYER.size]):
+        pos = [x, y]
+        players[slot_ids[slot]] = {"ingredient": recipe_manager.get_ingredient_name(ingredient_id),
+                                   "pos": pos, "target_pos": pos}
+    offset += count * _PLAYER.size
+
+    count = data[offset]
+    offset += 1
+    orders = []
+    for recipe_id in data[offset:offset + count]:
+        recipe = recipe_manager.get_recipe_by_id(recipe_id)
+        orders.append({"name": recipe["name"], "price": recipe["price"], "ingredients": recipe["ingredients"]})
+    offset += count
+
+    (length,) = _U32.unpack_from(data, offset)
+    state = json.loads(data[offset + 4:offset + 4 + length]) if length else {}
+    state.update({
+        "players": players,
+        "orders": orders,
+        "score": score,
+        "timer": timer,
+        "fusion_stations": fusion,
+        "enter_station": enter,
+        "doorprize_station": doorprize,
+        "doorprize_remaining_time": doorprize_remaining,
+        "clients_info": clients,
+        "game_started": bool(flags & FLAG_GAME_STARTED),
+        "version": version,
+    })
+    return state
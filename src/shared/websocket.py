@@ -0,0 +1,150 @@
+"""
+Minimal RFC 6455 WebSocket framing shared by the game server and client
+Only what the game needs: text/binary messages, fragmentation, ping/pong and close
+"""
+
+import os
+import struct
+import base64
+import hashlib
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_UNSUPPORTED_DATA = 1003
+CLOSE_TOO_BIG = 1009
+
+
+class WebSocketError(Exception):
+    """Protocol violation; `code` is the close status to send back"""
+
+    def __init__(self, code, reason=""):
+        super().__init__(reason)
+        self.code = code
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a handshake's Sec-WebSocket-Key"""
+    return base64.b64encode(hashlib.sha1((key.strip() + GUID).encode()).digest()).decode()
+
+
+def apply_mask(data, key):
+    """XOR payload bytes with the 4-byte masking key (masking and unmasking are the same)"""
+    n = len(data)
+    if not n:
+        return b""
+    # One big-integer XOR instead of a Python loop over every byte
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(n, 'big')
+
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    """Encode one unfragmented frame; clients must mask, servers must not"""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    n = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        header = struct.pack('>BB', 0x80 | opcode, mask_bit | n)
+    elif n < 65536:
+        header = struct.pack('>BBH', 0x80 | opcode, mask_bit | 126, n)
+    else:
+        header = struct.pack('>BBQ', 0x80 | opcode, mask_bit | 127, n)
+    if mask:
+        key = os.urandom(4)
+        return header + key + apply_mask(payload, key)
+    return header + payload
+
+
+def close_frame(code=CLOSE_NORMAL, reason="", mask=False):
+    return encode_frame(struct.pack('>H', code) + reason.encode('utf-8'), OP_CLOSE, mask)
+
+
+class FrameParser:
+    """Incremental frame decoder; feed() returns the complete messages seen so far"""
+
+    def __init__(self, max_message_size=65536, require_mask=True):
+        self.max_message_size = max_message_size
+        self.require_mask = require_mask
+        self.buffer = bytearray()
+        self._fragments = []
+        self._fragment_opcode = None
+        self._fragment_size = 0
+
+    def feed(self, data):
+        """Return [(opcode, payload)] for every complete message; raises WebSocketError on bad input"""
+        self.buffer += data
+        messages = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return messages
+            fin, opcode, payload = frame
+            if opcode >= OP_CLOSE:
+                # Control frames may arrive between the fragments of a data message
+                if not fin or len(payload) > 125:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, "bad control frame")
+                messages.append((opcode, payload))
+                continue
+            if opcode == OP_CONTINUATION:
+                if self._fragment_opcode is None:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, "unexpected continuation")
+            elif self._fragment_opcode is not None:
+                raise WebSocketError(CLOSE_PROTOCOL_ERROR, "expected continuation")
+            else:
+                self._fragment_opcode = opcode
+            self._fragment_size += len(payload)
+            if self._fragment_size > self.max_message_size:
+                raise WebSocketError(CLOSE_TOO_BIG, "message too big")
+            self._fragments.append(payload)
+            if fin:
+                messages.append((self._fragment_opcode, b"".join(self._fragments)))
+                self._fragments = []
+                self._fragment_opcode = None
+                self._fragment_size = 0
+
+    def _next_frame(self):
+        buf = self.buffer
+        if len(buf) < 2:
+            return None
+        b0, b1 = buf[0], buf[1]
+        if b0 & 0x70:
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, "reserved bits set")
+        masked = b1 & 0x80
+        if self.require_mask and not masked:
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, "client frames must be masked")
+        length = b1 & 0x7F
+        offset = 2
+        if length == 126:
+            if len(buf) < 4:
+                return None
+            length = struct.unpack_from('>H', buf, 2)[0]
+            offset = 4
+        elif length == 127:
+            if len(buf) < 10:
+                return None
+            length = struct.unpack_from('>Q', buf, 2)[0]
+            offset = 10
+        if length > self.max_message_size:
+            raise WebSocketError(CLOSE_TOO_BIG, "frame too big")
+        key = None
+        if masked:
+            if len(buf) < offset + 4:
+                return None
+            key = bytes(buf[offset:offset + 4])
+            offset += 4
+        if len(buf) < offset + length:
+            return None
+        payload = bytes(buf[offset:offset + length])
+        del buf[:offset + length]
+        if key is not None:
+            payload = apply_mask(payload, key)
+        return bool(b0 & 0x80), b0 & 0x0F, payload
@@ -0,0 +1,61 @@
+"""
+Shared helpers for the server tests: build raw requests, run them through
+HttpServer.proses, and read responses off real sockets
+"""
+
+import json
+
+
+def build_request(method, path, body=None, headers=None):
+    """Encode a minimal HTTP/1.1 request"""
+    lines = [f"{method} {path} HTTP/1.1", "Host: test"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    payload = b""
+    if body is not None:
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        lines.append(f"Content-Length: {len(payload)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+
+def parse_head(head):
+    """(status, {lower-case header: value}) of a response header block"""
+    lines = head.decode().split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return int(lines[0].split(" ")[1]), headers
+
+
+def call(server, method, path, body=None, headers=None):
+    """Run one request through server.proses; (status, headers, body) or the LongPoll/PushStream it returned"""
+    result = server.proses(build_request(method, path, body, headers).decode())
+    if not isinstance(result, tuple):
+        return result
+    head, payload = result
+    return (*parse_head(head), payload)
+
+
+def call_json(server, method, path, body=None, headers=None):
+    status, _, payload = call(server, method, path, body, headers)
+    return status, json.loads(payload) if payload else None
+
+
+def read_response(sock, buffered=b""):
+    """Read one Content-Length framed response from a blocking socket; (status, headers, body, leftover)"""
+    data = buffered
+    while b"\r\n\r\n" not in data:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed mid-response")
+        data += chunk
+    head, _, rest = data.partition(b"\r\n\r\n")
+    status, headers = parse_head(head)
+    length = int(headers.get("content-length", 0))
+    while len(rest) < length:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed mid-body")
+        rest += chunk
+    return status, headers, rest[:length], rest[length:]
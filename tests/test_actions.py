@@ -0,0 +1,31 @@
+from src.server.http import HttpServer
+
+
+def test_out_of_order_batch_is_applied_in_seq_order():
+    server = HttpServer()
+    try:
+        server.register_client("chef")
+        batch = [
+            {"seq": 3, "action": "set_username", "username": "third"},
+            {"seq": 1, "action": "set_username", "username": "first"},
+            {"seq": 2, "action": "toggle_ready"},
+            {"seq": 2, "action": "toggle_ready"},  # repeated seq: applied once
+        ]
+        assert server.apply_actions("chef", batch) == 3
+        assert server.clients_info["chef"] == {"username": "third", "ready": True}
+
+        # A retried batch only applies the actions above the last applied seq
+        retry = [{"seq": 2, "action": "toggle_ready"}, {"seq": 4, "action": "set_username", "username": "fourth"}]
+        assert server.apply_actions("chef", retry) == 4
+        assert server.clients_info["chef"] == {"username": "fourth", "ready": True}
+        assert server.apply_actions("chef", []) == 4
+    finally:
+        server.close()
+
+
+def test_batch_from_unknown_client_is_rejected():
+    server = HttpServer()
+    try:
+        assert server.apply_actions("nobody", [{"seq": 1, "action": "toggle_ready"}]) is False
+    finally:
+        server.close()
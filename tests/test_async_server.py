@@ -0,0 +1,63 @@
+import asyncio
+
+from src.server.async_server import AsyncHttpServer
+from src.shared import config
+from tests.helpers import build_request, parse_head
+
+
+async def read_response(reader):
+    status, headers = parse_head((await reader.readuntil(b"\r\n\r\n"))[:-4])
+    return status, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+def serve(test):
+    """Run test(server, reader, writer) against an AsyncHttpServer on a local port"""
+    async def main():
+        server = AsyncHttpServer()
+        listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0, limit=config.MAX_HEADER_SIZE)
+        reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        try:
+            return await test(server, reader, writer)
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            server.rooms.close()
+            if server.timer_task is not None:
+                server.timer_task.cancel()
+    return asyncio.run(main())
+
+
+def test_keep_alive_requests_share_one_connection():
+    async def test(server, reader, writer):
+        writer.write(build_request("GET", "/health") + build_request("POST", "/connect", {}))
+        return [(await read_response(reader))[0] for _ in range(2)]
+
+    assert serve(test) == [200, 200]
+
+
+def test_long_poll_waits_on_the_loop_until_the_state_changes():
+    async def test(server, reader, writer):
+        writer.write(build_request("GET", f"/game_state?since={server.state_version}"))
+        pending = asyncio.ensure_future(read_response(reader))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        server.register_client("chef")
+        return await asyncio.wait_for(pending, 5)
+
+    status, body = serve(test)
+    assert status == 200 and b'"chef"' in body
+
+
+def test_game_ticks_run_as_a_task_on_the_serving_loop():
+    async def test(server, reader, writer):
+        server.register_client("chef")
+        server.restart_game()
+        for _ in range(100):
+            if server.tick_scheduler.stats.stats()["ticks"] >= 3:
+                break
+            await asyncio.sleep(0.01)
+        return server.timer_task, server.tick_scheduler.stats.stats()["ticks"]
+
+    task, ticks = serve(test)
+    assert task is not None and ticks >= 3
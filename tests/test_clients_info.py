@@ -0,0 +1,58 @@
+import json
+import sys
+import threading
+
+from src.server.http import HttpServer
+
+
+def test_snapshots_survive_concurrent_joins_and_leaves():
+    server = HttpServer()
+    server.clients_info = {f"idle-{i}": {"username": "idle", "ready": False} for i in range(2000)}  # long iterations
+    errors = []
+    running = threading.Event()
+    running.set()
+
+    def churn(worker):
+        for i in range(100):
+            client_id = f"{worker}-{i}"
+            server.register_client(client_id)
+            server.cleanup_disconnected_players([client_id])
+
+    def snapshot():
+        while running.is_set():
+            try:
+                server._state_dict()
+                json.dumps(server.clients_info)
+            except RuntimeError as e:
+                errors.append(e)
+                return
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to hit a write mid-iteration
+    reader = threading.Thread(target=snapshot)
+    reader.start()
+    writers = [threading.Thread(target=churn, args=(w,)) for w in range(4)]
+    try:
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+    finally:
+        running.clear()
+        reader.join()
+        sys.setswitchinterval(switch_interval)
+        server.close()
+    assert errors == []
+    assert len(server.clients_info) == 2000
+
+
+def test_connect_answers_from_the_published_snapshot():
+    server = HttpServer()
+    try:
+        head, body = server.proses("POST /connect HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+        reply = json.loads(body)
+        assert reply["clients_info"] == server.current_snapshot.state["clients_info"]
+        assert reply["client_id"] in reply["clients_info"]
+        assert reply["version"] == server.current_snapshot.version
+    finally:
+        server.close()
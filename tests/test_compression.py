@@ -0,0 +1,58 @@
+import gzip
+import zlib
+
+import pytest
+
+from src.server.http import HttpServer, negotiate_encoding
+from src.shared import config
+from tests.helpers import call
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0.5, deflate;q=0.8", "deflate"),
+    ("gzip;q=0, deflate;q=0", None),
+    ("*", "gzip"),
+    ("*;q=0.1, gzip;q=0", "deflate"),
+    ("br, identity", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.fixture
+def server():
+    server = HttpServer()
+    # Enough players to push the state body past COMPRESSION_MIN_SIZE
+    for i in range(40):
+        server.register_client(f"client-{i:02d}")
+    yield server
+    server.close()
+
+
+def test_large_state_is_compressed_once_per_version(server, monkeypatch):
+    plain = call(server, "GET", "/game_state")[2]
+    assert len(plain) >= config.COMPRESSION_MIN_SIZE
+
+    status, headers, compressed = call(server, "GET", "/game_state", headers={"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert headers["content-encoding"] == "gzip" and headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(compressed) < len(plain)
+    assert gzip.decompress(compressed) == plain
+
+    status, headers, body = call(server, "GET", "/game_state", headers={"Accept-Encoding": "deflate"})
+    assert headers["content-encoding"] == "deflate" and zlib.decompress(body) == plain
+
+    # Every later gzip reader of this version gets the cached bytes
+    monkeypatch.setattr(gzip, "compress", lambda *args, **kwargs: pytest.fail("recompressed"))
+    assert call(server, "GET", "/game_state", headers={"Accept-Encoding": "gzip"})[2] == compressed
+
+
+def test_small_bodies_stay_uncompressed(server):
+    status, headers, body = call(server, "GET", "/events", headers={"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert len(body) < config.COMPRESSION_MIN_SIZE
+    assert "content-encoding" not in headers
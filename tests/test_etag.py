@@ -0,0 +1,43 @@
+import pytest
+
+from src.server.http import HttpServer, etag_matches
+from tests.helpers import call
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('W/"a-1"', True),
+    ('"a-1"', True),
+    ('W/"a-0", W/"a-1"', True),
+    ('W/"a-2"', False),
+    ('*', True),
+])
+def test_etag_matches_weakly(header, expected):
+    assert etag_matches(header, 'W/"a-1"') is expected
+
+
+def test_unchanged_state_answers_304_until_the_version_moves():
+    server = HttpServer()
+    try:
+        status, headers, body = call(server, "GET", "/game_state")
+        etag = headers["etag"]
+        assert status == 200 and etag.startswith('W/"')
+
+        status, headers, body = call(server, "GET", "/game_state", headers={"If-None-Match": etag})
+        assert status == 304 and body == b""
+        assert headers["etag"] == etag and "content-length" not in headers
+
+        server.register_client("chef")
+        status, headers, body = call(server, "GET", "/game_state", headers={"If-None-Match": etag})
+        assert status == 200 and headers["etag"] != etag and b"chef" in body
+    finally:
+        server.close()
+
+
+def test_etags_differ_between_server_instances():
+    first, second = HttpServer(), HttpServer()
+    try:
+        assert first.etag(1) != second.etag(1)
+    finally:
+        first.close()
+        second.close()
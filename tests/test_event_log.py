@@ -0,0 +1,43 @@
+from src.client.game_manager import GameManager
+from src.server.http import HttpServer
+from src.shared.event_log import EventLog
+from tests.helpers import call_json
+
+
+def test_readers_keep_their_own_cursors():
+    log = EventLog(capacity=3)
+    for i in range(5):
+        log.append("tick", {"n": i})
+    assert [e["id"] for e in log.since(0)] == [3, 4, 5]  # only the oldest fell off
+    assert [e["id"] for e in log.since(3)] == [4, 5]
+    assert [e["id"] for e in log.since(3)] == [4, 5]  # reading does not consume
+    assert log.since(5) == [] and log.since(9) == []
+
+
+def test_events_endpoint_and_snapshot_events():
+    server = HttpServer()
+    try:
+        first = server.event_log.append("recipe_fusion", {"recipe": "Onigiri"})
+        server.register_client("remy")  # publishes a snapshot carrying the new event
+        state = server.current_snapshot.state
+        assert state["events"] == [first] and state["last_event_id"] == first["id"]
+
+        second = server.event_log.append("doorprize", {})
+        status, body = call_json(server, "GET", f"/events?after={first['id']}")
+        assert status == 200 and body == {"events": [second], "last_event_id": second["id"]}
+        assert call_json(server, "GET", f"/events?after={second['id']}")[1] == {"events": [], "last_event_id": second["id"]}
+        assert call_json(server, "GET", "/events?after=x")[0] == 400
+    finally:
+        server.close()
+
+
+def test_client_fills_skipped_events_in_order():
+    manager = GameManager()
+    manager.update_state({"version": 1, "players": {}, "events": [{"id": 1, "type": "a", "data": {}}], "last_event_id": 1})
+    # Version 2 (event 2) was never seen; version 3 announces event 3
+    manager.update_state({"version": 3, "players": {}, "events": [{"id": 3, "type": "c", "data": {}}], "last_event_id": 3})
+    assert manager.missing_events() and [e["id"] for e in manager.pending_events] == [1]
+
+    manager.add_events([{"id": 2, "type": "b", "data": {}}, {"id": 3, "type": "c", "data": {}}])
+    assert not manager.missing_events()
+    assert [e["id"] for e in manager.pending_events] == [1, 2, 3]
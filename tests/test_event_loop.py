@@ -0,0 +1,50 @@
+import socket
+import threading
+
+import pytest
+
+from src.server.event_loop import EventLoopServer
+from src.server.http import HttpServer
+from tests.helpers import build_request, read_response
+
+
+@pytest.fixture
+def loop_server():
+    server = HttpServer()
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    loop = EventLoopServer(server, listener)
+    thread = threading.Thread(target=loop.serve_forever)
+    thread.start()
+    yield server, listener.getsockname()
+    loop.stop()
+    loop._wake()
+    thread.join()
+    loop.close()
+    listener.close()
+    server.close()
+
+
+def test_pipelined_requests_are_answered_in_order(loop_server):
+    _, address = loop_server
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(build_request("GET", "/health") + build_request("GET", "/nope") + build_request("GET", "/health"))
+        statuses, rest = [], b""
+        for _ in range(3):
+            status, _, _, rest = read_response(sock, rest)
+            statuses.append(status)
+    assert statuses == [200, 404, 200]
+
+
+def test_parked_long_poll_does_not_block_other_connections(loop_server):
+    server, address = loop_server
+    with socket.create_connection(address, timeout=5) as waiting, \
+            socket.create_connection(address, timeout=5) as other:
+        waiting.sendall(build_request("GET", f"/game_state?since={server.state_version}"))
+        other.sendall(build_request("GET", "/health"))
+        assert read_response(other)[0] == 200  # served while the long-poll is parked on the same thread
+
+        server.register_client("chef")  # publishes a new version and wakes the loop
+        status, _, body, _ = read_response(waiting)
+    assert status == 200 and b'"chef"' in body
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from src.shared import config
+from src.shared.game_state import GameState
+
+
+@pytest.fixture(autouse=True)
+def merge_in_place(monkeypatch, capsys):
+    # Fused players keep their tile and get a different ingredient, which shows who was merged
+    monkeypatch.setattr(config, "POST_FUSION_RELOCATION", False)
+    monkeypatch.setattr(config, "POST_FUSION_INGREDIENT_CHANGE", True)
+
+
+def state_with_one_order(seed=7):
+    random.seed(seed)
+    gs = GameState()
+    gs.initialize_stations()
+    gs.generate_orders(2)  # one open order for a two-ingredient recipe
+    return gs, gs.orders[0]['ingredients']
+
+
+def fusion_tiles(gs):
+    return sorted((sx + dx, sy + dy) for sx, sy in gs.fusion_stations
+                  for dx in range(config.STATION_SIZE) for dy in range(config.STATION_SIZE))
+
+
+def centre(tile):
+    return tile[0] + 0.5, tile[1] + 0.5
+
+
+def merge(gs):
+    gs.check_for_merge()
+    gs.process_fusion_events()
+    return [event["data"] for event in gs.events.since(0) if event["type"] == "recipe_fusion"]
+
+
+@pytest.mark.parametrize("first_filled", ["high", "low"])
+def test_two_candidate_tiles_merge_on_the_lowest(first_filled):
+    gs, ingredients = state_with_one_order()
+    tiles = fusion_tiles(gs)
+    low, high = tiles[0], tiles[-1]
+    for tile in ((high, low) if first_filled == "high" else (low, high)):
+        for ing in ingredients:
+            gs.add_player(f"{ing}@{tile}", ing, centre(tile))
+
+    fusions = merge(gs)
+
+    assert [tuple(f["pos"]) for f in fusions] == [low]
+    for ing in ingredients:
+        assert gs.players[f"{ing}@{low}"].ingredient != ing
+        assert gs.players[f"{ing}@{high}"].ingredient == ing
+    assert gs.orders == []
+
+
+def test_same_ingredient_players_are_picked_by_id():
+    gs, (first, second) = state_with_one_order()
+    tile = next(t for t in fusion_tiles(gs) if t[0] >= 1)
+    for pid in ("c", "a", "b"):
+        gs.add_player(pid, first, centre(tile))
+    # The last chef walks onto the tile from the one to its left
+    gs.add_player("z", second, (tile[0] - 0.5, tile[1] + 0.5))
+    assert merge(gs) == []
+    for _ in range(int(1 / config.PLAYER_SPEED)):
+        gs.move_player("z", "RIGHT")
+
+    assert len(merge(gs)) == 1
+    assert [pid for pid in ("a", "b", "c") if gs.players[pid].ingredient != first] == ["a"]
+    assert gs.players["z"].ingredient != second
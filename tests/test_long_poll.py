@@ -0,0 +1,42 @@
+import json
+import threading
+import time
+
+from src.server.http import HttpServer, LongPoll
+from src.shared import config
+from tests.helpers import call, parse_head
+
+
+def test_older_since_is_answered_at_once():
+    server = HttpServer()
+    try:
+        status, _, body = call(server, "GET", f"/game_state?since={server.state_version - 1}")
+        assert status == 200 and json.loads(body)["version"] == server.state_version
+        assert call(server, "GET", "/game_state?since=abc")[0] == 400
+    finally:
+        server.close()
+
+
+def test_wait_returns_when_the_version_passes_since():
+    server = HttpServer()
+    try:
+        poll = call(server, "GET", f"/game_state?since={server.state_version}")
+        assert isinstance(poll, LongPoll) and not poll.ready()
+        threading.Timer(0.05, server.register_client, args=("chef",)).start()
+        head, body = poll.wait()
+        assert parse_head(head)[0] == 200 and "chef" in json.loads(body)["clients_info"]
+    finally:
+        server.close()
+
+
+def test_wait_gives_up_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(config, "LONG_POLL_TIMEOUT", 0.1)
+    server = HttpServer()
+    try:
+        version = server.state_version
+        start = time.monotonic()
+        head, body = call(server, "GET", f"/game_state?since={version}").wait()
+        assert 0.1 <= time.monotonic() - start < 1.0
+        assert json.loads(body)["version"] == version  # the unchanged state
+    finally:
+        server.close()
@@ -0,0 +1,22 @@
+import socket
+
+import pytest
+
+from src.server import multiprocess
+from src.server.multiprocess import room_from_request, run_multiprocess_server
+from src.shared import config
+
+
+def test_room_is_taken_from_path_header_or_query():
+    assert room_from_request(b"GET /rooms/kitchen/game_state HTTP/1.1\r\nX-Room: other") == "kitchen"
+    assert room_from_request(b"GET /game_state HTTP/1.1\r\n%s: kitchen" % config.ROOM_HEADER.encode()) == "kitchen"
+    assert room_from_request(b"GET /game_state?room=kitchen HTTP/1.1\r\nHost: x") == "kitchen"
+    assert room_from_request(b"GET /game_state HTTP/1.1\r\nHost: x") == config.DEFAULT_ROOM
+
+
+def test_mode_refuses_to_start_without_send_fds(monkeypatch):
+    monkeypatch.delattr(socket, "send_fds", raising=False)
+    monkeypatch.setattr(multiprocess.multiprocessing, "get_context",
+                        lambda *args: pytest.fail("workers spawned without fd passing"))
+    with pytest.raises(RuntimeError, match="Python 3.9"):
+        run_multiprocess_server(port=0, processes=1)
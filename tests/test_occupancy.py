@@ -0,0 +1,46 @@
+import random
+
+from src.shared import config
+from src.shared.game_state import GameState
+
+
+def occupancy_from_players(gs):
+    expected = {}
+    for player_id, p in gs.players.items():
+        expected.setdefault((int(p.pos[0]), int(p.pos[1])), set()).add(player_id)
+    return expected
+
+
+def test_index_follows_adds_moves_and_removes():
+    rng = random.Random(3)
+    gs = GameState(backend="objects")
+    ids = [f"p{i}" for i in range(12)]
+    for step in range(2000):
+        player_id = rng.choice(ids)
+        roll = rng.random()
+        if roll < 0.05:
+            gs.remove_player(player_id)
+        elif roll < 0.15:
+            gs.add_player(player_id, "Rice", (rng.randrange(config.GRID_WIDTH), rng.randrange(config.GRID_HEIGHT)))
+        else:
+            gs.move_player(player_id, rng.choice(["UP", "DOWN", "LEFT", "RIGHT"]))
+        assert gs.occupancy == occupancy_from_players(gs), f"index out of step after step {step}"
+
+
+def test_only_tile_changes_mark_tiles_dirty():
+    gs = GameState(backend="objects")
+    gs.add_player("a", "Rice", (2.0, 2.0))
+    gs.add_player("b", "Tuna", (2.5, 2.5))
+    assert gs.occupancy == {(2, 2): {"a", "b"}}
+
+    gs.dirty_tiles.clear()
+    gs.move_player("a", "LEFT")
+    assert gs.occupancy == {(2, 2): {"b"}, (int(2.0 - config.PLAYER_SPEED), 2): {"a"}}
+    assert gs.dirty_tiles == {(2, 2), (int(2.0 - config.PLAYER_SPEED), 2)}
+
+    gs.dirty_tiles.clear()
+    gs.move_player("b", "RIGHT")  # 2.5 -> 2.75 stays on its tile
+    assert gs.occupancy[(2, 2)] == {"b"} and not gs.dirty_tiles
+
+    gs.remove_player("b")
+    assert (2, 2) not in gs.occupancy and gs.dirty_tiles == {(2, 2)}
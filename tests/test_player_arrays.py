@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from src.shared import config
+from src.shared.game_state import GameState
+
+pytest.importorskip("numpy")
+
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+
+
+@pytest.fixture(autouse=True)
+def merge_in_place(monkeypatch, capsys):
+    monkeypatch.setattr(config, "POST_FUSION_RELOCATION", False)
+    monkeypatch.setattr(config, "POST_FUSION_INGREDIENT_CHANGE", True)
+
+
+def new_state(backend, seed):
+    random.seed(seed)
+    gs = GameState(backend=backend)
+    gs.initialize_stations()
+    gs.generate_orders(8)
+    return gs
+
+
+def test_arrays_backend_matches_objects_backend():
+    states = [new_state("objects", 11), new_state("arrays", 11)]
+    rng = random.Random(5)
+    ids = [f"bot{i}" for i in range(40)]
+    # Everyone starts on a fusion station holding an ingredient some order needs, so merges happen
+    ingredients = sorted({name for order in states[0].orders for name in order["ingredients"]})
+    tiles = sorted((sx + dx, sy + dy) for sx, sy in states[0].fusion_stations
+                   for dx in range(config.STATION_SIZE) for dy in range(config.STATION_SIZE))
+    for player_id in ids:
+        spawn = tuple(float(c) for c in rng.choice(tiles))
+        ingredient = rng.choice(ingredients)
+        for gs in states:
+            gs.add_player(player_id, ingredient, spawn)
+
+    for tick in range(200):
+        # Several moves per player in one batch, so border clamping happens mid-batch too
+        moves = [(rng.choice(ids), rng.choice(DIRECTIONS)) for _ in range(60)]
+        if tick % 50 == 49:
+            leaving = rng.choice(ids)
+            for gs in states:
+                gs.remove_player(leaving)
+            ids.remove(leaving)
+        seed = rng.random()
+        for gs in states:
+            gs.move_players(moves)
+            random.seed(seed)
+            gs.check_for_merge()
+            gs.process_fusion_events()
+
+        objects, arrays = (gs.to_dict() for gs in states)
+        assert arrays["players"] == objects["players"], f"players differ after tick {tick}"
+        assert arrays["score"] == objects["score"] and arrays["orders"] == objects["orders"]
+
+    fusions = [e for e in states[0].events.since(0) if e["type"] == "recipe_fusion"]
+    assert fusions and states[1].events.since(0) == states[0].events.since(0)
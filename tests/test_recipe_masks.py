@@ -0,0 +1,48 @@
+import itertools
+import sqlite3
+
+from src.shared.recipe_manager import recipe_manager
+
+
+def recipes_from_db():
+    """{recipe name: ingredient set}, read straight from recipes.db
+
+    Recipes are looked up by ingredient set, so of two recipes with the same set
+    only the later one is reachable (Tekka Maki and Tuna Salad Gunkan share one).
+    """
+    conn = sqlite3.connect(recipe_manager.db_path)
+    try:
+        rows = conn.execute("SELECT r.id, r.name, i.name FROM recipes r "
+                            "JOIN recipe_ingredients ri ON r.id = ri.recipe_id "
+                            "JOIN ingredients i ON ri.ingredient_id = i.id ORDER BY r.id").fetchall()
+    finally:
+        conn.close()
+    ingredients = {}
+    for _, recipe, ingredient in rows:
+        ingredients.setdefault(recipe, set()).add(ingredient)
+    by_set = {frozenset(needed): recipe for recipe, needed in ingredients.items()}
+    return {recipe: set(needed) for needed, recipe in by_set.items()}
+
+
+def test_merge_lookup_matches_the_database():
+    for name, ingredients in recipes_from_db().items():
+        for order in itertools.permutations(sorted(ingredients)):
+            assert recipe_manager.check_merge(list(order))["name"] == name
+        assert recipe_manager.check_merge_mask(recipe_manager.ingredient_mask(ingredients))["name"] == name
+    assert recipe_manager.check_merge(["Rice", "Not an ingredient"]) is None
+    assert recipe_manager.check_merge_mask(0) is None
+
+
+def test_reachable_recipes_are_exactly_the_supersets():
+    recipes = recipes_from_db()
+    ingredients = sorted(set().union(*recipes.values()))
+    for size in range(3):
+        for held in itertools.combinations(ingredients, size):
+            expected = {name for name, needed in recipes.items() if set(held) <= needed}
+            reachable = recipe_manager.get_reachable_recipes(recipe_manager.ingredient_mask(held))
+            assert {recipe["name"] for recipe in reachable} == expected, held
+
+
+def test_unknown_ingredients_add_no_bits():
+    assert recipe_manager.ingredient_mask(["Rice", "Not an ingredient"]) == recipe_manager.ingredient_mask(["Rice"])
+    assert recipe_manager.ingredient_mask([]) == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from src.server.request_reader import RequestReader, parse_content_length
+from src.shared import config
+
+
+def post(length, body=b""):
+    return b"POST /actions HTTP/1.1\r\nHost: test\r\nContent-Length: %d\r\n\r\n" % length + body
+
+
+def test_pipelined_requests_are_split():
+    reader = RequestReader()
+    reader.feed(post(2, b"{}") + b"GET /health HTTP/1.1\r\n\r\n")
+    assert reader.next_request() == post(2, b"{}")
+    assert reader.next_request() == b"GET /health HTTP/1.1\r\n\r\n"
+    assert reader.next_request() is None
+
+
+def test_body_up_to_the_limit_is_buffered(monkeypatch):
+    monkeypatch.setattr(config, "MAX_BODY_SIZE", 16)
+    reader = RequestReader()
+    reader.feed(post(16, b"x" * 10))
+    assert reader.next_request() is None
+    reader.feed(b"x" * 6)
+    assert reader.next_request() == post(16, b"x" * 16)
+
+
+def test_oversized_body_is_rejected_before_buffering(monkeypatch):
+    monkeypatch.setattr(config, "MAX_BODY_SIZE", 16)
+    reader = RequestReader()
+    reader.feed(post(17))
+    with pytest.raises(ConnectionAbortedError):
+        reader.next_request()
+    with pytest.raises(ConnectionAbortedError):  # the asyncio front end shares the check
+        parse_content_length(post(10 ** 12))
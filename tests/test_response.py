@@ -0,0 +1,44 @@
+from src.server.http import HttpServer, send_response
+from tests.helpers import parse_head
+
+
+class TrickleSocket:
+    """sendmsg that accepts at most `limit` bytes per call, like a full socket buffer"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.sent = b""
+        self.calls = 0
+
+    def sendmsg(self, buffers):
+        self.calls += 1
+        data = b"".join(bytes(b) for b in buffers)[:self.limit]
+        self.sent += data
+        return len(data)
+
+
+def test_response_header_lines():
+    server = HttpServer()
+    try:
+        head, body = server.response(200, 'OK', '{"a": 1}', {'Content-Type': 'application/json'})
+        status, headers = parse_head(head)
+        assert (status, body) == (200, b'{"a": 1}')
+        assert headers["content-length"] == "8"
+        assert headers["connection"] == "keep-alive" and "keep-alive" in headers
+        assert headers["content-type"] == "application/json" and "date" in headers
+
+        head, _ = server.response(503, 'Service Unavailable', '', {'Connection': 'close'})
+        status, headers = parse_head(head)
+        assert status == 503 and headers["connection"] == "close" and "keep-alive" not in headers
+
+        head, body = server.response(304, 'Not Modified', b'', {'ETag': 'W/"x"'})
+        assert "content-length" not in parse_head(head)[1] and body == b""
+    finally:
+        server.close()
+
+
+def test_send_response_finishes_partial_scatter_gather_writes():
+    sock = TrickleSocket(limit=5)
+    send_response(sock, [b"HTTP/1.1 200 OK\r\n\r\n", b"", b"hello world"])
+    assert sock.sent == b"HTTP/1.1 200 OK\r\n\r\nhello world"
+    assert sock.calls == 6
@@ -0,0 +1,54 @@
+import time
+
+from src.server.http import HttpServer
+from src.shared import config
+from tests.helpers import call_json
+
+
+def test_destroyed_room_stays_gone_for_header_requests():
+    server = HttpServer()
+    try:
+        assert call_json(server, "POST", "/rooms", {"room": "kitchen"})[0] == 201
+        assert call_json(server, "GET", "/health", headers={config.ROOM_HEADER: "kitchen"})[0] == 200
+        assert call_json(server, "DELETE", "/rooms/kitchen")[0] == 200
+
+        assert call_json(server, "POST", "/connect", {}, headers={config.ROOM_HEADER: "kitchen"})[0] == 404
+        assert call_json(server, "GET", "/game_state?room=kitchen")[0] == 404
+        assert call_json(server, "GET", "/rooms/kitchen")[0] == 404
+        assert server.rooms.get("kitchen") is None
+    finally:
+        server.close()
+
+
+def test_unknown_room_is_not_created_by_requests():
+    server = HttpServer()
+    try:
+        for i in range(config.MAX_ROOMS + 1):
+            assert call_json(server, "GET", "/game_state", headers={config.ROOM_HEADER: f"room{i}"})[0] == 404
+        assert len(server.rooms) == 1  # only the default room
+        assert call_json(server, "POST", "/rooms", {"room": "kitchen"})[0] == 201
+    finally:
+        server.close()
+
+
+def test_failing_room_tick_stops_only_that_room():
+    server = HttpServer()
+    try:
+        broken, healthy = server.rooms.create("broken"), server.rooms.create("healthy")
+        healthy_ticks = []
+        game_tick = healthy._game_tick
+        healthy._game_tick = lambda *args: healthy_ticks.append(args) or game_tick(*args)
+        broken.restart_game()
+        broken.game_state.check_for_merge = lambda: 1 / 0
+        healthy.restart_game()
+
+        deadline = time.monotonic() + 2
+        while len(healthy_ticks) < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(healthy_ticks) >= 10
+        assert broken._scheduled_tick not in server.tick_scheduler._ticks
+        assert healthy._scheduled_tick in server.tick_scheduler._ticks
+        assert call_json(server, "GET", "/rooms/broken")[1]["tick_error"].startswith("ZeroDivisionError")
+        assert call_json(server, "GET", "/rooms/healthy")[1]["tick_error"] is None
+    finally:
+        server.rooms.close()
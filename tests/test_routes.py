@@ -0,0 +1,43 @@
+import json
+
+from src.server.http import HttpServer
+from tests.helpers import call
+
+
+def test_unknown_path_is_404_and_wrong_method_is_405():
+    server = HttpServer()
+    try:
+        assert call(server, "GET", "/nope")[0] == 404
+        assert call(server, "POST", "/game_state", {})[0] == 405
+        assert call(server, "PUT", "/nope")[0] == 405
+        assert call(server, "OPTIONS", "/game_state")[0] == 200
+    finally:
+        server.close()
+
+
+def test_added_route_is_dispatched_with_the_parsed_request():
+    server = HttpServer()
+    seen = []
+
+    def handle_echo(request):
+        seen.append((request.path, request.query.get("x"), request.json()))
+        return server.response(200, 'OK', json.dumps({"ok": True}), {'Content-Type': 'application/json'})
+
+    server.add_route('POST', '/echo', handle_echo)
+    try:
+        status, _, body = call(server, "POST", "/echo?x=1", {"y": 2})
+        assert (status, json.loads(body)) == (200, {"ok": True})
+        assert seen == [("/echo", ["1"], {"y": 2})]
+        assert call(server, "GET", "/echo")[0] == 405
+    finally:
+        server.close()
+
+
+def test_handler_errors_become_400_or_500():
+    server = HttpServer()
+    server.add_route('GET', '/boom', lambda request: 1 / 0)
+    try:
+        assert call(server, "POST", "/action", b"{not json")[0] == 400
+        assert call(server, "GET", "/boom")[0] == 500
+    finally:
+        server.close()
@@ -0,0 +1,40 @@
+import pytest
+
+from src.server.http import HttpServer
+from tests.helpers import build_request
+
+
+def test_pollers_share_one_body_per_version(monkeypatch):
+    server = HttpServer()
+    try:
+        server.register_client("remy")
+        request = build_request("GET", "/game_state").decode()
+        # Serving a published version never goes back to the game state
+        monkeypatch.setattr(server.game_state, "to_dict", lambda: pytest.fail("re-serialized"))
+        bodies = [server.proses(request)[1] for _ in range(20)]
+        assert all(body is server.current_snapshot.body for body in bodies)
+        monkeypatch.undo()
+
+        server.register_client("colette")
+        body = server.proses(request)[1]
+        assert body is not bodies[0] and b"colette" in body
+    finally:
+        server.close()
+
+
+def test_stream_frames_are_encoded_once_per_version():
+    server = HttpServer()
+    try:
+        calls = []
+
+        def encode(version, body):
+            calls.append(version)
+            return b"frame-%d" % version
+
+        server.register_client("remy")
+        first = server.stream_frames_since(0, encode)
+        second = server.stream_frames_since(0, encode)
+        assert first == second and all(a[1] is b[1] for a, b in zip(first, second))
+        assert sorted(calls) == [version for version, _ in first]
+    finally:
+        server.close()
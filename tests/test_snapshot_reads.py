@@ -0,0 +1,31 @@
+import threading
+
+from src.server.http import HttpServer
+from tests.helpers import call
+
+
+def test_reads_do_not_wait_for_the_publisher_or_the_game_lock():
+    server = HttpServer()
+    try:
+        for i in range(40):
+            server.register_client(f"client-{i:02d}")
+        server.restart_game()
+        base = server.current_snapshot.version - 1
+        results = []
+
+        def read():
+            # Cache misses too: first gzip body, first delta and first binary body of this version
+            results.append(call(server, "GET", "/game_state", headers={"Accept-Encoding": "gzip"})[0])
+            results.append(call(server, "GET", f"/game_state?base={base}")[0])
+            results.append(call(server, "GET", "/game_state", headers={"Accept": "application/x-cooked-state"})[0])
+            results.append(call(server, "POST", "/connect", {"client_id": "client-00"})[0])
+
+        # A publisher mid-capture holds _stream_lock; a mover holds GameState._lock
+        with server._stream_lock, server.game_state._lock:
+            reader = threading.Thread(target=read, daemon=True)
+            reader.start()
+            reader.join(5)
+            assert not reader.is_alive(), "a read blocked on a writer's lock"
+        assert results == [200, 200, 200, 200]
+    finally:
+        server.close()
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from src.server.http import HttpServer
+from src.shared import state_codec
+from tests.helpers import call
+
+
+@pytest.fixture
+def server():
+    server = HttpServer()
+    server.register_client("remy")
+    server.register_client("colette")
+    server.apply_action({"action": "toggle_ready", "client_id": "remy"})
+    server.restart_game()
+    yield server
+    server.close()
+
+
+def test_match_snapshot_round_trips(server):
+    snapshot = server.current_snapshot
+    state = snapshot.state
+    assert state["players"] and state["orders"] and state["fusion_stations"]
+    encoded = state_codec.encode_state(state)
+    assert len(encoded) < len(json.dumps(state))
+    # Decodes to what a JSON client sees (lists for positions)
+    assert state_codec.decode_state(encoded) == json.loads(snapshot.body)
+
+
+def test_binary_is_served_only_when_accepted(server):
+    status, headers, body = call(server, "GET", "/game_state", headers={"Accept": state_codec.CONTENT_TYPE})
+    assert status == 200 and headers["content-type"] == state_codec.CONTENT_TYPE
+    assert set(state_codec.decode_state(body)["players"]) == {"remy", "colette"}
+
+    status, headers, body = call(server, "GET", "/game_state")
+    assert headers["content-type"] == "application/json" and json.loads(body)["players"]
+
+
+def test_unencodable_state_falls_back_to_json(server):
+    server.register_client("x" * 300)  # ids longer than 255 bytes have no binary form
+    with pytest.raises(ValueError):
+        state_codec.encode_state(server.current_snapshot.state)
+    status, headers, body = call(server, "GET", "/game_state", headers={"Accept": state_codec.CONTENT_TYPE})
+    assert status == 200 and headers["content-type"] == "application/json"
+
+
+def test_decode_rejects_other_bodies():
+    with pytest.raises(ValueError):
+        state_codec.decode_state(b'{"version": 1}')
@@ -0,0 +1,59 @@
+import json
+
+from src.client.game_manager import GameManager
+from src.server.http import HttpServer
+from tests.helpers import call_json
+
+
+def test_client_rebuilds_the_full_state_from_a_delta():
+    server = HttpServer()
+    try:
+        server.register_client("remy")
+        server.register_client("linguini")
+        _, base = call_json(server, "GET", "/game_state")
+
+        server.register_client("colette")
+        server.apply_action({"action": "toggle_ready", "client_id": "remy"})
+        server.cleanup_disconnected_players(["linguini"])
+        _, delta = call_json(server, "GET", f"/game_state?base={base['version']}")
+        _, full = call_json(server, "GET", "/game_state")
+
+        assert delta["base"] == base["version"] and delta["version"] == full["version"]
+        clients = delta["entities"]["clients_info"]
+        assert set(clients["upsert"]) == {"remy", "colette"} and clients["remove"] == ["linguini"]
+
+        manager = GameManager()
+        manager.update_state(base)
+        manager.update_state(delta)
+        assert manager.current_state == full
+    finally:
+        server.close()
+
+
+def test_unknown_base_gets_the_full_state():
+    server = HttpServer()
+    try:
+        _, state = call_json(server, "GET", "/game_state?base=999")
+        assert "base" not in state and "clients_info" in state
+    finally:
+        server.close()
+
+
+def test_delta_on_another_base_is_ignored_by_the_client():
+    manager = GameManager()
+    manager.update_state({"version": 5, "players": {}, "clients_info": {}})
+    manager.update_state({"base": 4, "version": 6, "changed": {"timer": 1}, "entities": {}})
+    assert manager.current_state["version"] == 5
+
+
+def test_delta_body_is_built_once_per_base():
+    server = HttpServer()
+    try:
+        _, base = call_json(server, "GET", "/game_state")
+        server.register_client("remy")
+        request = f"GET /game_state?base={base['version']} HTTP/1.1\r\n\r\n"
+        first = server.proses(request)[1]
+        assert server.proses(request)[1] is first
+        assert json.loads(first)["base"] == base["version"]
+    finally:
+        server.close()
@@ -0,0 +1,31 @@
+import pytest
+
+from src.server.http import EventStream, HttpServer, PushStream, WebSocketSession
+from src.server.tcp_push import FramedSession
+
+
+def test_push_stream_needs_a_framing_function():
+    server = HttpServer()
+    try:
+        with pytest.raises(TypeError):
+            PushStream(server, 0)
+    finally:
+        server.close()
+
+
+def test_streams_share_one_frame_per_version():
+    server = HttpServer()
+    try:
+        before = server.state_version - 1
+        sse = [EventStream(server, before), EventStream(server, before)]
+        first, second = sse[0].frames(), sse[1].frames()
+        assert first and first[-1] is second[-1]
+        assert b"event: state" in first[-1]
+
+        ws = WebSocketSession(server, before, "dGhlIHNhbXBsZSBub25jZQ==")
+        framed = FramedSession(server)
+        framed.last_id = before
+        assert ws.frames()[-1] is not first[-1]
+        assert framed.frames()[-1].endswith(server.current_snapshot.body)
+    finally:
+        server.close()
@@ -0,0 +1,57 @@
+import json
+
+from src.server.http import HttpServer
+from src.server.tcp_push import FRAME_HEADER, FramedSession, encode_message
+from src.shared import config
+
+
+def decode_messages(data):
+    messages = []
+    while data:
+        length = FRAME_HEADER.unpack_from(data)[0]
+        messages.append(json.loads(data[FRAME_HEADER.size:FRAME_HEADER.size + length]))
+        data = data[FRAME_HEADER.size + length:]
+    return messages
+
+
+def test_session_registers_and_sends_its_client_id_first():
+    server = HttpServer()
+    try:
+        session = FramedSession(server)
+        assert session.client_id in server.clients_info
+        initial, = decode_messages(session.header)
+        assert initial["client_id"] == session.client_id
+        assert session.client_id in initial["clients_info"]
+
+        session.on_close()
+        assert session.client_id not in server.clients_info
+    finally:
+        server.close()
+
+
+def test_framed_actions_split_across_reads():
+    server = HttpServer()
+    try:
+        session = FramedSession(server)
+        data = (encode_message(json.dumps({"action": "set_username", "username": "remy"}).encode())
+                + encode_message(json.dumps({"actions": [{"seq": 1, "action": "toggle_ready"}]}).encode()))
+        for i in range(len(data)):
+            assert session.receive(data[i:i + 1]) == []
+        info = server.clients_info[session.client_id]
+        assert info["username"] == "remy" and info["ready"] is True
+
+        state = decode_messages(b"".join(session.frames()))[-1]
+        assert state["clients_info"][session.client_id]["ready"] is True
+        assert not session.closed
+    finally:
+        server.close()
+
+
+def test_oversized_message_closes_the_session():
+    server = HttpServer()
+    try:
+        session = FramedSession(server)
+        session.receive(FRAME_HEADER.pack(config.TCP_PUSH_MAX_MESSAGE_SIZE + 1))
+        assert session.closed
+    finally:
+        server.close()
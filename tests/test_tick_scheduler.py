@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from src.server.tick_scheduler import TickScheduler
+
+
+class Counter:
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def __call__(self, deadline):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("tick failed")
+        return True
+
+
+def wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < end:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_raising_tick_is_dropped_while_others_keep_running():
+    scheduler = TickScheduler(rate=200)
+    healthy, failing = Counter(), Counter(fail_on=2)
+    scheduler.add(healthy)
+    scheduler.add(failing)
+    try:
+        assert wait_for(lambda: healthy.calls >= 20)
+        assert failing.calls == 2
+        assert scheduler.running and len(scheduler) == 1
+        assert scheduler.stats.stats()["failures"] == 1
+    finally:
+        scheduler.discard(healthy)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_add_restarts_a_loop_that_died():
+    scheduler = TickScheduler(rate=200)
+    scheduler.advance = lambda now: 1 / 0  # the loop itself fails, not a tick
+    scheduler.add(Counter())
+    assert wait_for(lambda: not scheduler.running)
+
+    del scheduler.advance
+    tick = Counter()
+    scheduler.add(tick)
+    try:
+        assert wait_for(lambda: tick.calls >= 5)
+    finally:
+        scheduler.discard(tick)
+
+
+def test_async_loop_survives_a_raising_tick():
+    async def main():
+        scheduler = TickScheduler(rate=200, spawn=lambda: asyncio.get_running_loop().create_task(scheduler.run_async()))
+        healthy, failing = Counter(), Counter(fail_on=1)
+        scheduler.add(failing)
+        scheduler.add(healthy)
+        for _ in range(200):
+            if healthy.calls >= 10:
+                break
+            await asyncio.sleep(0.005)
+        scheduler.discard(healthy)
+        return healthy.calls, failing.calls
+
+    healthy_calls, failing_calls = asyncio.run(main())
+    assert healthy_calls >= 10 and failing_calls == 1
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from src.server.http import HttpServer, WebSocketSession
+from src.shared import websocket as ws
+
+
+def test_accept_key_matches_rfc_6455_example():
+    assert ws.accept_key("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+
+@pytest.mark.parametrize("size", [0, 125, 126, 65535, 65536])
+def test_masked_frames_round_trip_byte_by_byte(size):
+    payload = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    frame = ws.encode_frame(payload, ws.OP_BINARY, mask=True)
+    parser = ws.FrameParser(max_message_size=1 << 20)
+    messages = []
+    for i in range(0, len(frame), 997):
+        messages += parser.feed(frame[i:i + 997])
+    assert messages == [(ws.OP_BINARY, payload)]
+
+
+def test_fragments_are_joined_around_control_frames():
+    first = bytearray(ws.encode_frame(b"hel", ws.OP_TEXT, mask=True))
+    first[0] &= 0x7F  # FIN cleared: more fragments follow
+    last = ws.encode_frame(b"lo", ws.OP_CONTINUATION, mask=True)
+    ping = ws.encode_frame(b"", ws.OP_PING, mask=True)
+    assert ws.FrameParser().feed(bytes(first) + ping + last) == [(ws.OP_PING, b""), (ws.OP_TEXT, b"hello")]
+
+
+def test_protocol_violations_carry_their_close_code():
+    with pytest.raises(ws.WebSocketError) as unmasked:
+        ws.FrameParser().feed(ws.encode_frame(b"hi"))
+    assert unmasked.value.code == ws.CLOSE_PROTOCOL_ERROR
+    with pytest.raises(ws.WebSocketError) as too_big:
+        ws.FrameParser(max_message_size=10).feed(ws.encode_frame(b"x" * 11, mask=True))
+    assert too_big.value.code == ws.CLOSE_TOO_BIG
+
+
+def test_upgrade_and_actions_over_the_session():
+    server = HttpServer()
+    try:
+        server.register_client("chef")
+        session = server.proses(
+            "GET /ws?client_id=chef HTTP/1.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        assert isinstance(session, WebSocketSession)
+        assert b"101 Switching Protocols" in session.header and b"s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in session.header
+
+        # The session is bound to the client that opened it, whatever the message claims
+        action = json.dumps({"action": "toggle_ready", "client_id": "someone-else"})
+        replies = session.receive(ws.encode_frame(action, mask=True) + ws.encode_frame(b"hi", ws.OP_PING, mask=True))
+        assert server.clients_info["chef"]["ready"] is True
+        assert replies == [ws.encode_frame(b"hi", ws.OP_PONG)]
+
+        state = ws.FrameParser(require_mask=False).feed(b"".join(session.frames()))
+        assert json.loads(state[-1][1])["clients_info"]["chef"]["ready"] is True
+    finally:
+        server.close()
+
+
+def test_upgrade_needs_the_websocket_headers():
+    server = HttpServer()
+    try:
+        head, _ = server.proses("GET /ws HTTP/1.1\r\nHost: test\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 426 ")
+    finally:
+        server.close()
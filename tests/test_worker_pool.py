@@ -0,0 +1,94 @@
+import socket
+import threading
+import time
+
+from src.server.http import HttpServer
+from src.server.worker_pool import PooledServer, _Connection
+from src.shared import config
+
+
+def shed_one(pooled):
+    """Dispatch a connection to a full pool and return the 503 the client receives"""
+    client, server_side = socket.socketpair()
+    try:
+        conn = _Connection(server_side, ("test", 0))
+        pooled.connections[server_side.fileno()] = conn
+        pooled._dispatch(conn, registered=False)
+        return client.recv(4096)
+    finally:
+        client.close()
+
+
+def date_of(response):
+    return next(line for line in response.split(b"\r\n") if line.startswith(b"Date: "))
+
+
+def test_shed_requests_get_a_current_date(monkeypatch):
+    server = HttpServer()
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    pooled = PooledServer(server, listener, workers=1, queue_depth=1)
+    monkeypatch.setattr(pooled.pool, "submit", lambda job: False)
+    try:
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        first = shed_one(pooled)
+        monkeypatch.setattr(time, "time", lambda: now + 5)
+        later = shed_one(pooled)
+        assert first.startswith(b"HTTP/1.1 503 ") and later.startswith(b"HTTP/1.1 503 ")
+        assert date_of(first) != date_of(later)
+    finally:
+        monkeypatch.undo()
+        pooled.close()
+        listener.close()
+        server.close()
+
+
+def read_until_closed(sock):
+    data = b""
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def test_overloaded_pool_delivers_a_complete_503(monkeypatch):
+    monkeypatch.setattr(config, "KEEP_ALIVE_TIMEOUT", 2.0)
+    server = HttpServer()
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    address = listener.getsockname()
+    pooled = PooledServer(server, listener, workers=1, queue_depth=1)
+    loop = threading.Thread(target=pooled.serve_forever)
+    loop.start()
+    clients = []
+    try:
+        # The only worker blocks on an unfinished request and the one queue slot holds another
+        for _ in range(2):
+            clients.append(socket.create_connection(address))
+            clients[-1].sendall(b"GET /health HTTP/1.1\r\n")
+            time.sleep(0.1)
+
+        rejected = socket.create_connection(address, timeout=5)
+        clients.append(rejected)
+        rejected.sendall(b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n" + b"x" * 65536)  # more than the server reads
+        response = read_until_closed(rejected)
+
+        head, _, body = response.partition(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 503 ")
+        assert b"Retry-After: %d" % config.POOL_RETRY_AFTER in head
+        assert b"Content-Length: %d" % len(body) in head
+        assert body == b'{"error": "Server busy"}'
+        assert pooled.pool.stats()["rejected"] == 1
+    finally:
+        for client in clients:
+            client.close()
+        pooled.running = False
+        pooled._wake()
+        loop.join()
+        pooled.close()
+        listener.close()
+        server.close()